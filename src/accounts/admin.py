@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from core.paginator import EstimatedCountPaginator
 from accounts.models import UserAction, Profile
 
 # Register your models here.
@@ -31,11 +32,18 @@ class UserActionAdmin(admin.ModelAdmin):
             fields (tuple): Specifies the fields to be displayed in the model form.
             readonly_fields (tuple): Specifies the fields that are read-only.
             list_display (tuple): Specifies the fields to be displayed in the model list view.
+            list_select_related (tuple): Relations joined by the list view query, so the user column costs no query per row.
+            paginator (Paginator): Uses the planner estimate instead of counting the unfiltered table, see
+            core.paginator.EstimatedCountPaginator.
+            show_full_result_count (bool): Disabled, it would count the whole table once more when filtering.
     """
 
     fields = ('user', 'action')
     readonly_fields = ('write_date', )
     list_display = ('user', 'write_date', 'action')
+    list_select_related = ('user', )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(Profile, ProfileAdmin)
@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class AccountCursorPagination(CursorPagination):
+    """
+        Keyset pagination over the users, ordered by id. Fetching a page costs the same on every position of the list and
+        does not count the users, unlike offset pagination.
+
+        Attributes:
+            ordering (tuple): Fields the cursor is built on.
+            page_size (int): Default number of users per page.
+            page_size_query_param (str): Query parameter to request another page size.
+            max_page_size (int): Upper limit for the requested page size.
+    """
+
+    ordering = ('id', )
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
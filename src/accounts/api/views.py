@@ -1,10 +1,14 @@
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 
+from accounts.forms import AccountSearchForm
 from accounts.models import User
+from accounts.api.pagination import AccountCursorPagination
 from accounts.api.serializers import RegistrationSerializer, AccountSerializer
+from accounts.search import filter_accounts
 
 
 class RegistrationView(generics.CreateAPIView):
@@ -42,12 +46,27 @@ class AccountView(generics.ListAPIView):
     """
 
     This view provides a read-only endpoint for listing user accounts.
+    The users are paginated with a cursor over their id and filtered with the ``first_name``, ``last_name``, ``email``
+    and ``birth_date`` query parameters of AccountSearchForm, see accounts.search.filter_accounts.
 
     Attributes:
         queryset: The queryset containing all User instances to be serialized.
         serializer_class: The serializer class to be used for serializing the User instances.
+        pagination_class: Cursor pagination over the users.
     """
 
     queryset = User.objects.all()
     serializer_class = AccountSerializer
     permission_classes = [AllowAny]
+    pagination_class = AccountCursorPagination
+
+    def get_queryset(self):
+        """
+            :return: The users filtered with the query parameters.
+            :raises ValidationError: If a filter is invalid, e.g. a malformed birth date.
+        """
+
+        form = AccountSearchForm(self.request.query_params)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        return filter_accounts(super().get_queryset(), **form.cleaned_data)
@@ -112,3 +112,20 @@ class ContactUsForm(forms.Form):
 
     subject = forms.CharField(max_length=256, initial="Message from Smart_Test")
     message = forms.CharField(widget=forms.Textarea)
+
+
+class AccountSearchForm(forms.Form):
+    """
+        Filter form of the user list, used by the list page and the users API, see accounts.search.filter_accounts.
+
+        Fields:
+            first_name: Text searched in the first name.
+            last_name: Text searched in the last name.
+            email: Text searched in the email.
+            birth_date: The exact birth date.
+    """
+
+    first_name = forms.CharField(max_length=150, required=False)
+    last_name = forms.CharField(max_length=150, required=False)
+    email = forms.CharField(max_length=254, required=False)
+    birth_date = forms.DateField(required=False)
@@ -0,0 +1,44 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db.migrations import AddIndex
+from django.db.models import Index
+from django.db.models.functions import Lower, Upper
+
+
+class SearchIndex(Index):
+    """
+        Index of a text field searched by accounts.search.search_field(). It is declared on the model like any index, so
+        migrations and table rebuilds of SQLite keep it, but its SQL depends on the database:
+
+        - PostgreSQL: a pg_trgm GIN index on UPPER(field), the expression of the SQL of the icontains lookup,
+          UPPER("accounts_user"."<field>"::text) LIKE UPPER(%s), so the planner can use it.
+        - Other databases: an index on LOWER(field), which serves the prefix range of SQLite.
+
+        The index covers a single field, given in ``fields``.
+    """
+
+    def _database_index(self, schema_editor):
+        field, = self.fields
+        if schema_editor.connection.vendor == 'postgresql':
+            return GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=self.name)
+        return Index(Lower(field), name=self.name)
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        return self._database_index(schema_editor).create_sql(model, schema_editor, using=using, **kwargs)
+
+
+class AddSearchIndex(AddIndexConcurrently):
+    """
+        Adds an index with CREATE INDEX CONCURRENTLY on PostgreSQL, which keeps a large user table writable while it is
+        indexed, and with a plain CREATE INDEX on other databases. The migration must set ``atomic = False``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_remove_user_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-17 21:02
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+import accounts.indexes
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction.
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0005_profile_renditions'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        accounts.indexes.AddSearchIndex(
+            model_name='user',
+            index=accounts.indexes.SearchIndex(fields=['first_name'], name='user_first_name_search_idx'),
+        ),
+        accounts.indexes.AddSearchIndex(
+            model_name='user',
+            index=accounts.indexes.SearchIndex(fields=['last_name'], name='user_last_name_search_idx'),
+        ),
+        accounts.indexes.AddSearchIndex(
+            model_name='user',
+            index=accounts.indexes.SearchIndex(fields=['email'], name='user_email_search_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='rating_runs',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 
+from accounts.indexes import SearchIndex
+
 # Create your models here.
 
 
@@ -25,7 +27,11 @@ class User(AbstractUser):
 
         rating : decimal.Decimal
             The rating of the user. Default value is 0.0. The rating has a maximum of 5 digits, with 2 decimal places,
-            and is validated to ensure it is between 0 and 100.
+            and is validated to ensure it is between 0 and 100. It is computed from the finished tests of the user, see
+            smart_test.rating.
+
+        rating_runs : int
+            The number of finished tests the rating is computed from.
     """
 
     school = models.CharField(max_length=255, blank=True)
@@ -34,6 +40,15 @@ class User(AbstractUser):
     birth_date = models.DateField(null=True, blank=True)
     rating = models.DecimalField(default=0.0, decimal_places=2, max_digits=5,
                                  validators=[MinValueValidator(0), MaxValueValidator(100)])
+    rating_runs = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        # The fields searched by the user list and the users API, see accounts.search.
+        indexes = [
+            SearchIndex(fields=['first_name'], name='user_first_name_search_idx'),
+            SearchIndex(fields=['last_name'], name='user_last_name_search_idx'),
+            SearchIndex(fields=['email'], name='user_email_search_idx'),
+        ]
 
 
 class UserAction(models.Model):
@@ -75,16 +90,22 @@ class Profile(models.Model):
         It associates additional information with a user, including an image and a list of interests.
 
         Attributes:
+            IMAGE_RENDITION_SIZES (tuple): Edge lengths of the renditions of the image.
             user (OneToOneField): A one-to-one relationship to the User model, which ensures that each user
                                   has only one associated profile. The profile is deleted if the user is
                                   removed.
             image (ImageField): An optional image associated with the user profile. If no image is provided,
                                 a default image ('pictures/default.jpg') is used. The images are uploaded to
                                 the 'pictures/' directory.
+            renditions (JSONField): Resized variants of the image in IMAGE_RENDITION_SIZES (for the header and the profile
+                                    page at 1x and 2x), see core.renditions, generated by accounts.tasks.
             interests (CharField): An optional text field to store the user's interests, with a maximum length
                                    of 128 characters.
     """
 
+    IMAGE_RENDITION_SIZES = (35, 70, 150, 300)
+
     user = models.OneToOneField(to=User, on_delete=models.CASCADE, related_name='profile')
     image = models.ImageField(null=True, default='pictures/default.jpg', upload_to='pictures/')
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     interests = models.CharField(max_length=128, null=True)
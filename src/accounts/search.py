@@ -0,0 +1,59 @@
+from django.db import connection
+from django.db.models.functions import Lower
+
+
+SEARCH_FIELDS = ('first_name', 'last_name', 'email')
+
+
+def _prefix_range(prefix):
+    # Strings starting with the prefix sort between the prefix and the prefix with its last character incremented.
+    last = ord(prefix[-1])
+    if last >= 0x10ffff:
+        return prefix, None
+    return prefix, prefix[:-1] + chr(last + 1)
+
+
+def search_field(queryset, field, value):
+    """
+        Matches a text field of the users with an indexed lookup, see accounts.indexes.SearchIndex.
+
+        On PostgreSQL the value may appear anywhere in the field, case-insensitively: the icontains lookup is served by a
+        pg_trgm GIN index on UPPER(field). On SQLite the field must start with the value: the lowercased field is compared
+        with a range, served by an index on lower(field). SQLite folds the case of ASCII letters only, as its LIKE does.
+        Other databases use icontains.
+
+        :param queryset: A queryset of User objects.
+        :param field: One of SEARCH_FIELDS.
+        :param value: The searched text.
+        :return: The filtered queryset.
+    """
+
+    if connection.vendor != 'sqlite':
+        return queryset.filter(**{f'{field}__icontains': value})
+
+    alias = f'{field}_lower'
+    lower, upper = _prefix_range(value.lower())
+    queryset = queryset.alias(**{alias: Lower(field)}).filter(**{f'{alias}__gte': lower})
+    if upper is not None:
+        queryset = queryset.filter(**{f'{alias}__lt': upper})
+    return queryset
+
+
+def filter_accounts(queryset, first_name=None, last_name=None, email=None, birth_date=None):
+    """
+        Applies the filters of the user list. All of them are optional and combined.
+
+        :param queryset: A queryset of User objects.
+        :param first_name: Text searched in the first name, see search_field().
+        :param last_name: Text searched in the last name.
+        :param email: Text searched in the email.
+        :param birth_date: The exact birth date.
+        :return: The filtered queryset.
+    """
+
+    for field, value in zip(SEARCH_FIELDS, (first_name, last_name, email)):
+        if value:
+            queryset = search_field(queryset, field, value)
+    if birth_date:
+        queryset = queryset.filter(birth_date=birth_date)
+    return queryset
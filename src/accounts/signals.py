@@ -2,7 +2,9 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from accounts.models import User, Profile
+from accounts.tasks import generate_profile_renditions
 from accounts.views import logger
+from core.renditions import schedule_renditions
 
 
 @receiver(post_save, sender=User)
@@ -15,3 +17,13 @@ def save_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
         logger.info(f"Profile created for user {instance.username}")
+
+
+@receiver(post_save, sender=Profile)
+def generate_profile_image_renditions(sender, instance, raw=False, **kwargs):
+    """
+        Generates the renditions of a profile picture after a new picture is saved.
+    """
+
+    if not raw:
+        schedule_renditions(instance, generate_profile_renditions)
@@ -2,6 +2,9 @@ from celery import shared_task
 from django.core.mail import send_mail
 from django.conf import settings
 
+from accounts.models import Profile
+from core.renditions import update_renditions
+
 
 @shared_task
 def send_contact_email(subject, message, from_email):
@@ -18,3 +21,16 @@ def send_contact_email(subject, message, from_email):
         recipient_list=[settings.EMAIL_HOST_RECIPIENT],
         fail_silently=False,
     )
+
+
+@shared_task
+def generate_profile_renditions(profile_id):
+    """
+        Celery shared task generating the resized variants of a profile picture (see core.renditions) after it was uploaded.
+
+        :param profile_id: The identifier of the profile.
+        :return: True if the renditions were updated.
+    """
+
+    profile = Profile.objects.filter(pk=profile_id).only('pk', 'image', 'renditions').first()
+    return profile is not None and update_renditions(profile)
@@ -0,0 +1,138 @@
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.search import filter_accounts
+
+
+class AccountSearchTests(TestCase):
+    """
+        Tests for the indexed search and the keyset pagination of the user list and the users API.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_search:
+            Checks the case-insensitive search of the first name, the last name and the email, and the birth date filter.
+
+        test_search_uses_index:
+            Checks that the search of the database in use is served by the SearchIndex indexes of the user model.
+
+        test_list_page:
+            Checks the filters and the next and previous links of the list page, which must not count the users.
+
+        test_api:
+            Checks the filters and the cursor pagination of the users API, and the validation of the filters.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Creates 25 users named "Searchable", one of them with another last name, email and birth date.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.users = [
+            User.objects.create(username=f'searchable{index:02}', first_name='Searchable', last_name='Person',
+                                email=f'searchable{index:02}@example.com')
+            for index in range(25)
+        ]
+        self.special = self.users[7]
+        User.objects.filter(pk=self.special.pk).update(last_name='Kowalski', email='kowalski@example.org',
+                                                       birth_date=datetime.date(2001, 2, 3))
+
+    def test_search(self):
+        """
+            Searches each field by a prefix with another case.
+
+            :return: None
+        """
+
+        users = User.objects.all()
+        self.assertEqual(filter_accounts(users, first_name='SEARCHA').count(), 25)
+        self.assertEqual(list(filter_accounts(users, last_name='kowal')), [self.special])
+        self.assertEqual(list(filter_accounts(users, email='Kowalski@')), [self.special])
+        self.assertEqual(list(filter_accounts(users, first_name='searchable', birth_date=datetime.date(2001, 2, 3))), [self.special])
+        self.assertEqual(filter_accounts(users, last_name='kowalskiy').count(), 0)
+
+    def test_search_uses_index(self):
+        """
+            Reads the query plan of a search by first name.
+
+            :return: None
+        """
+
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            self.skipTest('No search index on this database')
+        if connection.vendor == 'postgresql':
+            # The test table is too small for the planner to prefer an index on its own.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+        queryset = filter_accounts(User.objects.all(), first_name='searcha')
+        plan = queryset.explain()
+        self.assertIn('user_first_name_search_idx', plan)
+
+    def test_list_page(self):
+        """
+            Pages forward and back through the users named "Searchable", 20 per page.
+
+            :return: None
+        """
+
+        self.client.force_login(User.objects.get(username='admin'))
+        url = reverse('accounts:list')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'first_name': 'searchable'})
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
+        self.assertEqual(list(response.context['users']), self.users[:20])
+        page = response.context['page_obj']
+        self.assertFalse(page.has_previous())
+        self.assertContains(response, f'?after={self.users[19].id}&first_name=searchable')
+
+        response = self.client.get(url, {'first_name': 'searchable', 'after': page.next_cursor()})
+        self.assertEqual(list(response.context['users']), self.users[20:])
+        page = response.context['page_obj']
+        self.assertFalse(page.has_next())
+        self.assertContains(response, f'?before={self.users[20].id}&first_name=searchable')
+
+        response = self.client.get(url, {'first_name': 'searchable', 'before': page.previous_cursor()})
+        self.assertEqual(list(response.context['users']), self.users[:20])
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+        self.assertEqual(self.client.get(url, {'after': 'x'}).status_code, 404)
+
+    def test_api(self):
+        """
+            Lists the users through the API with filters and a cursor.
+
+            :return: None
+        """
+
+        client = APIClient()
+        url = reverse('api_registration:accounts_list')
+
+        response = client.get(url, {'first_name': 'searchable', 'page_size': 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user['username'] for user in response.data['results']], [user.username for user in self.users[:10]])
+        self.assertIsNone(response.data['previous'])
+
+        response = client.get(response.data['next'])
+        self.assertEqual([user['username'] for user in response.data['results']], [user.username for user in self.users[10:20]])
+
+        response = client.get(url, {'email': 'kowalski'})
+        self.assertEqual([user['username'] for user in response.data['results']], [self.special.username])
+
+        self.assertEqual(client.get(url, {'birth_date': 'yesterday'}).status_code, 400)
@@ -11,8 +11,10 @@ from django.views.generic import ListView
 from django.views.generic.edit import ProcessFormView, FormView
 from django.conf import settings
 
-from accounts.forms import AccountCreateForm, AccountUpdateForm, AccountProfileUpdateForm, ContactUsForm
+from core.paginator import KeysetPaginationMixin
+from accounts.forms import AccountCreateForm, AccountUpdateForm, AccountProfileUpdateForm, ContactUsForm, AccountSearchForm
 from accounts.models import User
+from accounts.search import filter_accounts
 from accounts.tasks import send_contact_email
 
 
@@ -21,12 +23,13 @@ from accounts.tasks import send_contact_email
 logger = logging.getLogger('accounts')
 
 
-class AccountsListView(LoginRequiredMixin, ListView):
+class AccountsListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
         AccountsListView class displays a paginated list of user accounts filtered by query parameters.
 
         Inherits from:
             LoginRequiredMixin: Ensures the viewer is authenticated.
+            KeysetPaginationMixin: Pages through the users by id, without counting them, see core.paginator.
             ListView: Provides a generic view for displaying a list of objects.
 
         Attributes:
@@ -37,7 +40,8 @@ class AccountsListView(LoginRequiredMixin, ListView):
 
         Methods:
             get_queryset:
-                Filters the user list based on query parameters: 'first_name', 'last_name', 'email', and 'birth_date'.
+                Filters the user list based on query parameters: 'first_name', 'last_name', 'email', and 'birth_date', with
+                the indexed search of accounts.search.filter_accounts. Invalid parameters are ignored.
 
                 Returns:
                     QuerySet: A filtered queryset of users.
@@ -49,24 +53,9 @@ class AccountsListView(LoginRequiredMixin, ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        request = self.request
-        params = {
-            "first_name": "__icontains",
-            "last_name": "__icontains",
-            "email": "__icontains",
-
-            "birth_date": "",
-        }
-        for param, lookup in params.items():
-            value = request.GET.get(param)
-            if value:
-                if lookup:
-                    qs = qs.filter(**{f"{param}{lookup}": value})
-                else:
-                    qs = qs.filter(**{param: value})
-
-        return qs
+        form = AccountSearchForm(self.request.GET)
+        form.is_valid()
+        return filter_accounts(super().get_queryset(), **form.cleaned_data)
 
 
 class AccountCreateView(CreateView):
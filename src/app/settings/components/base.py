@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,7 +62,7 @@ ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.templates.InstrumentedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -78,6 +79,44 @@ TEMPLATES = [
 WSGI_APPLICATION = 'app.wsgi.application'
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.InstrumentedLocMemCache',
+    }
+}
+
+
+# Request metrics, see core.middleware.RequestMetricsMiddleware
+
+METRICS_SERVER_TIMING = True
+METRICS_LOG_REQUESTS = True
+
+
+# Prometheus metrics served at /metrics, see core.prometheus. Counters and histograms of all gunicorn and Celery workers
+# are aggregated in the METRICS_CACHE cache, which must be shared between them (Redis) in production. /metrics requires
+# an "Authorization: Bearer <METRICS_TOKEN>" header, and answers 404 while METRICS_TOKEN is not set.
+
+METRICS_CACHE = 'default'
+METRICS_FLUSH_INTERVAL = 10
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+
+# Resized WebP/JPEG variants of uploaded images, see core.renditions. They are generated in a Celery worker when
+# RENDITIONS_ASYNC is set by the Celery settings, otherwise in the request that saved the image.
+
+RENDITIONS_ASYNC = False
+RENDITION_QUALITY = 80
+
+
+# Unfiltered admin changelists of tables with more rows than this, according to the planner statistics, show the
+# estimate instead of counting the rows, see core.paginator.EstimatedCountPaginator.
+
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -0,0 +1,11 @@
+import os
+
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.InstrumentedRedisCache',
+        'LOCATION': 'redis://redis:6379/1',
+    }
+}
+
+# Keeps the progress of test runs in Redis and persists it once a minute (checkpoint_attempt_states), see README.
+SMART_TEST_WRITE_BEHIND = os.environ.get('SMART_TEST_WRITE_BEHIND', '') == '1'
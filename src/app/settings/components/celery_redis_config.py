@@ -12,5 +12,19 @@ CELERY_BEAT_SCHEDULE = {
     'some_task': {
         'task': 'smart_test.tasks.cleanup_outdated_test_results',
         'schedule': crontab(minute='0', hour='*/5')
-    }
+    },
+    'checkpoint_attempt_states': {
+        'task': 'smart_test.tasks.checkpoint_attempt_states',
+        'schedule': crontab(minute='*')
+    },
+    'archive_finished_test_results': {
+        'task': 'smart_test.tasks.archive_finished_test_results_task',
+        'schedule': crontab(minute='30', hour='3')
+    },
+    'recompute_ratings': {
+        'task': 'smart_test.tasks.recompute_ratings_task',
+        'schedule': crontab(minute='30', hour='4', day_of_week='sunday')
+    },
 }
+
+RENDITIONS_ASYNC = True
@@ -1,30 +1,14 @@
 from app.settings.components.base import * # noqa
 from app.settings.components.dev_tools import * # noqa
 from app.settings.components.rest import * # noqa
+from app.settings.components.logging_config import * # noqa
 
 DEBUG = False
 
 ALLOWED_HOSTS = ['*']
 
-LOGGING = {
-    'version': 1,
-    'disable_existing_loggers': False,
-    'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'level': 'INFO',
-        },
-    },
-    'loggers': {
-        'django': {
-            'handlers': ['console'],
-            'level': 'INFO',
-            'propagate': True,
-        },
-        'smart_test': {
-            'handlers': ['console'],
-            'level': 'INFO',
-            'propagate': False,
-        },
-    },
+LOGGING['loggers']['smart_test'] = {  # noqa
+    'handlers': ['console'],
+    'level': 'INFO',
+    'propagate': False,
 }
@@ -5,6 +5,8 @@ from app.settings.components.email import * # noqa
 # from app.settings.components.celery_rabbitmq_config import * # noqa
 from app.settings.components.celery_redis_config import * # noqa
 from app.settings.components.rest import * # noqa
+from app.settings.components.cache import * # noqa
+from app.settings.components.logging_config import * # noqa
 
 DEBUG = False
 
@@ -5,6 +5,8 @@ from app.settings.components.email import * # noqa
 # from app.settings.components.celery_rabbitmq_config import * # noqa
 from app.settings.components.celery_redis_config import * # noqa
 from app.settings.components.rest import * # noqa
+from app.settings.components.logging_config import * # noqa
+from app.settings.components.cache import * # noqa
 
 DEBUG = False
 
@@ -14,25 +16,8 @@ STATIC_ROOT = '/var/www/smart_test/static'
 
 MEDIA_ROOT = '/var/www/smart_test/media'
 
-LOGGING = {
-    'version': 1,
-    'disable_existing_loggers': False,
-    'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'level': 'INFO',
-        },
-    },
-    'loggers': {
-        'django': {
-            'handlers': ['console'],
-            'level': 'INFO',
-            'propagate': True,
-        },
-        'accounts': {
-            'handlers': ['console'],
-            'level': 'INFO',
-            'propagate': False,
-        },
-    },
+LOGGING['loggers']['accounts'] = {  # noqa
+    'handlers': ['console'],
+    'level': 'INFO',
+    'propagate': False,
 }
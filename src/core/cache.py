@@ -0,0 +1,40 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+from core import metrics
+
+
+_missing = object()
+
+
+class InstrumentedCacheMixin:
+    """
+        Cache backend mixin counting hits and misses of get() in the metrics of the current request, see
+        core.metrics.record_cache(). Outside of a request it only adds a context variable lookup per read.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version=version)
+        if value is _missing:
+            metrics.record_cache(misses=1)
+            return default
+        metrics.record_cache(hits=1)
+        return value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    """
+        Local memory cache with hit and miss counting. Its get_many() reads every key with get(), so it is counted there.
+    """
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    """
+        Redis cache with hit and miss counting, get_many() reads all keys with a single command.
+    """
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = super().get_many(keys, version=version)
+        metrics.record_cache(hits=len(values), misses=len(keys) - len(values))
+        return values
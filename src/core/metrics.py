@@ -0,0 +1,174 @@
+import contextlib
+import time
+from contextvars import ContextVar
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+        Performance figures of a single request, collected by core.middleware.RequestMetricsMiddleware.
+
+        Attributes:
+            started (float): Value of time.perf_counter() when the request started.
+            view_name (str): The resolved view name, e.g. 'tests:next', set once the URL is resolved.
+            db_queries (int): Number of executed database queries.
+            db_time (float): Time spent in database queries, in seconds.
+            cache_hits (int): Number of cache reads that found a value.
+            cache_misses (int): Number of cache reads that found nothing.
+            template_time (float): Time spent rendering templates, in seconds.
+            timings (dict): Further named durations in seconds, see timed().
+
+        Methods:
+            duration(): Returns the time since the request started.
+            server_timing(): Returns the value of the Server-Timing header.
+            log_fields(): Returns the figures as a flat dictionary for structured logging.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_name = None
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.timings = {}
+
+    def duration(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """
+            :return: The value of a Server-Timing header, see https://www.w3.org/TR/server-timing/.
+        """
+
+        entries = [
+            f'total;dur={self.duration() * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f'cache;desc="hits={self.cache_hits} misses={self.cache_misses}"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+        ]
+        entries.extend(f'{name};dur={duration * 1000:.1f}' for name, duration in self.timings.items())
+        return ', '.join(entries)
+
+    def log_fields(self):
+        """
+            :return: A dictionary with the view name and the figures of the request, durations in milliseconds.
+        """
+
+        fields = {
+            'view': self.view_name,
+            'duration_ms': round(self.duration() * 1000, 2),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'template_ms': round(self.template_time * 1000, 2),
+        }
+        fields.update({f'{name}_ms': round(duration * 1000, 2) for name, duration in self.timings.items()})
+        return fields
+
+
+def start():
+    """
+        Starts collecting the figures of a request in the current context.
+
+        :return: A tuple (RequestMetrics, token), the token is passed to finish().
+    """
+
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish(token):
+    """
+        Stops collecting the figures of the request started with the given token.
+
+        :param token: The token returned by start().
+        :return: None
+    """
+
+    _current.reset(token)
+
+
+def current():
+    """
+        :return: The RequestMetrics of the request being handled, or None outside of a request (e.g. in Celery tasks).
+    """
+
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+        Database execute wrapper (see connection.execute_wrapper()) counting and timing the queries of the current request.
+    """
+
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def record_cache(hits=0, misses=0):
+    """
+        Counts cache reads of the current request, called by the backends of core.cache.
+
+        :param hits: Number of keys that were found.
+        :param misses: Number of keys that were not found.
+        :return: None
+    """
+
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+@contextlib.contextmanager
+def template_render():
+    """
+        Context manager timing a template render of the current request. Templates rendered while another one is rendered,
+        e.g. by template tags, are part of the outer render and are not counted twice.
+    """
+
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+
+    metrics.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.template_depth -= 1
+        if metrics.template_depth == 0:
+            metrics.template_time += time.perf_counter() - started
+
+
+@contextlib.contextmanager
+def timed(name):
+    """
+        Context manager adding the duration of a block to the named timings of the current request, so that it shows up in
+        the Server-Timing header and in the request log, e.g. ``with metrics.timed('scoring'): ...``.
+
+        :param name: Name of the timing, a token without spaces.
+    """
+
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.timings[name] = metrics.timings.get(name, 0.0) + time.perf_counter() - started
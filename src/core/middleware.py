@@ -0,0 +1,61 @@
+import contextlib
+import logging
+
+from django.conf import settings
+from django.db import connections
+
+from core import metrics, prometheus
+
+
+logger = logging.getLogger('core.metrics')
+
+
+class RequestMetricsMiddleware:
+    """
+        Middleware measuring every request: wall time, number and time of database queries, cache hits and misses and
+        template render time, see core.metrics.
+
+        The figures are sent in a Server-Timing header (METRICS_SERVER_TIMING, True by default) and logged to the
+        'core.metrics' logger with the resolved view name, both as the message and as structured ``extra`` fields
+        (METRICS_LOG_REQUESTS, True by default). Queries are counted with a database execute wrapper and cache reads by
+        the backends of core.cache, so no per-query data is kept and the middleware can stay enabled in production.
+
+        The duration of every request is also observed in the http_request_duration_seconds histogram of core.prometheus,
+        by view name, method and status code.
+
+        It should be the first middleware, so that it measures the others as well.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', True)
+        self.log_requests = getattr(settings, 'METRICS_LOG_REQUESTS', True)
+
+    def __call__(self, request):
+        request_metrics, token = metrics.start()
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.record_query))
+                response = self.get_response(request)
+
+            resolver_match = getattr(request, 'resolver_match', None)
+            request_metrics.view_name = resolver_match.view_name if resolver_match else None
+
+            prometheus.HTTP_REQUEST_DURATION.observe(
+                request_metrics.duration(),
+                view=request_metrics.view_name or 'unresolved',
+                method=request.method,
+                status=response.status_code,
+            )
+            prometheus.flush()
+
+            if self.server_timing:
+                response['Server-Timing'] = request_metrics.server_timing()
+            if self.log_requests:
+                fields = request_metrics.log_fields()
+                fields.update(method=request.method, status=response.status_code)
+                logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra=fields)
+            return response
+        finally:
+            metrics.finish(token)
@@ -0,0 +1,290 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """
+        Reads the number of rows of the table of an unfiltered queryset from the planner statistics, instead of counting
+        them: pg_class.reltuples on PostgreSQL, sqlite_stat1 (written by ANALYZE) on SQLite. The statistics are refreshed
+        by (auto)vacuum and ANALYZE, so the estimate may be off by the rows changed since.
+
+        :param queryset: A queryset.
+        :return: The estimated number of rows, or None if the queryset is filtered, sliced or distinct, or if the database
+        has no statistics of the table.
+    """
+
+    query = queryset.query
+    if query.where or query.is_sliced or query.distinct or query.combinator:
+        return None
+
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql, params = 'SELECT reltuples FROM pg_class WHERE oid = %s::regclass', (connection.ops.quote_name(table), )
+    elif connection.vendor == 'sqlite':
+        sql, params = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', (table, )
+    else:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        # SQLite has no sqlite_stat1 table before the first ANALYZE.
+        return None
+
+    if row is None:
+        return None
+    # reltuples is -1 for a table that was never analyzed, sqlite_stat1 holds "<rows> <rows per key> ...".
+    estimate = int(float(str(row[0]).split()[0]))
+    return estimate if estimate >= 0 else None
+
+
+def _validate_page_number(number):
+    # Paginator.validate_number without the upper bound, which needs the count.
+    try:
+        number = int(number)
+    except (TypeError, ValueError):
+        raise PageNotAnInteger('That page number is not an integer')
+    if number < 1:
+        raise EmptyPage('That page number is less than 1')
+    return number
+
+
+class CountlessPage(Page):
+    """
+        A page of CountlessPaginator or of an estimated EstimatedCountPaginator, which knows whether a next page exists from
+        the extra row it read.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def start_index(self):
+        return (self.number - 1) * self.paginator.per_page + 1 if self.object_list else 0
+
+    def end_index(self):
+        return (self.number - 1) * self.paginator.per_page + len(self.object_list)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+        A Paginator that does not count the rows of large unfiltered querysets: above ESTIMATED_COUNT_THRESHOLD rows it
+        uses the planner estimate of estimated_count(), so the total and the number of pages are approximate. Filtered
+        querysets and small tables are counted exactly. Pages past an estimate that is short of the real number of rows are
+        still served. Meant for the admin changelists, together with ``show_full_result_count = False``.
+
+        Attributes:
+            threshold (int): Estimates from this number of rows are used as the count, ESTIMATED_COUNT_THRESHOLD by
+            default.
+            estimated (bool): Whether the count is an estimate.
+    """
+
+    threshold = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._estimated = False
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            threshold = self.threshold if self.threshold is not None else settings.ESTIMATED_COUNT_THRESHOLD
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate >= threshold:
+                self._estimated = True
+                return estimate
+        return super().count
+
+    @property
+    def estimated(self):
+        # Only known once the count is read.
+        return self.count is not None and self._estimated
+
+    def validate_number(self, number):
+        # An estimate may be short of the real number of rows: the pages past it are still served, see page().
+        if not self.estimated:
+            return super().validate_number(number)
+        return _validate_page_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+
+        # Paginator.page() would cut the page off at the estimated count: read the rows of the page and one more, as
+        # CountlessPaginator does, to know whether there is a next page.
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return CountlessPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+class CountlessPaginator(Paginator):
+    """
+        A Paginator with numbered pages that never counts the rows: a page reads one row more than it shows, to know
+        whether there is a next page. The total and the number of pages are unknown (count and num_pages are None), so
+        the links only lead to the first, the previous and the next page, see includes/countless_pagination.html.
+    """
+
+    count = None
+    num_pages = None
+
+    def validate_number(self, number):
+        return _validate_page_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return CountlessPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+class KeysetPage:
+    """
+        A page of KeysetPaginator. It has the interface of django.core.paginator.Page that list templates use, except the
+        page numbers: the links to the neighbour pages carry the key of the boundary rows instead.
+
+        Attributes:
+            object_list (list): The rows of the page.
+            paginator (KeysetPaginator): The paginator of the page.
+
+        Methods:
+            has_next, has_previous, has_other_pages:
+                Whether there are rows after, before, or around the page.
+
+            next_cursor, previous_cursor:
+                The values of the ``after`` and ``before`` query parameters of the links to the neighbour pages.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self.object_list)} rows>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_cursor(self):
+        return self.paginator.key_of(self.object_list[-1]) if self._has_next and self.object_list else None
+
+    def previous_cursor(self):
+        return self.paginator.key_of(self.object_list[0]) if self._has_previous and self.object_list else None
+
+
+class KeysetPaginator:
+    """
+        Keyset (seek) pagination over a unique, indexed field: a page is read with ``WHERE key > cursor ORDER BY key LIMIT
+        n``, so it costs the same on every position of the list, and no COUNT of the whole list is run. The price is that
+        pages have no numbers: a page only links to the next and the previous one.
+
+        Attributes:
+            queryset (QuerySet): The rows to paginate.
+            per_page (int): Number of rows per page.
+            key (str): Name of the field the rows are ordered by, unique and indexed, the primary key by default.
+
+        Methods:
+            page(after=None, before=None):
+                Returns the KeysetPage following the ``after`` key, preceding the ``before`` key, or the first page.
+                Raises ValueError if the key is not a valid value of the field.
+
+            key_of(obj):
+                Returns the key of a row, as it is sent in the links.
+    """
+
+    def __init__(self, queryset, per_page, key='pk'):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key = key
+        model = queryset.model
+        self.field = model._meta.pk if key == 'pk' else model._meta.get_field(key)
+
+    def _to_python(self, value):
+        try:
+            return self.field.to_python(value)
+        except ValidationError as error:
+            raise ValueError(f'Invalid cursor {value!r}') from error
+
+    def key_of(self, obj):
+        return getattr(obj, self.field.attname)
+
+    def page(self, after=None, before=None):
+        """
+            :param after: Key of the last row of the previous page, the page starts right after it.
+            :param before: Key of the first row of the next page, the page ends right before it.
+            :return: The KeysetPage.
+        """
+
+        # One row more than the page tells whether there is another page in that direction.
+        if before:
+            rows = list(self.queryset.filter(**{f'{self.key}__lt': self._to_python(before)}).order_by(f'-{self.key}')[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            return KeysetPage(rows[:self.per_page][::-1], self, has_next=True, has_previous=has_more)
+
+        queryset = self.queryset.order_by(self.key)
+        if after:
+            queryset = queryset.filter(**{f'{self.key}__gt': self._to_python(after)})
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], self, has_next=has_more, has_previous=bool(after))
+
+
+class KeysetPaginationMixin:
+    """
+        Replaces the offset pagination of a ListView with KeysetPaginator: ``?after=<key>`` and ``?before=<key>`` select
+        the page instead of ``?page=<number>``. Templates render the links with includes/keyset_pagination.html.
+
+        Attributes:
+            keyset_field (str): The field the rows are ordered by, unique and indexed.
+    """
+
+    keyset_field = 'pk'
+    cursor_params = ('after', 'before')
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, key=self.keyset_field)
+        try:
+            page = paginator.page(after=self.request.GET.get('after'), before=self.request.GET.get('before'))
+        except ValueError as error:
+            raise Http404(str(error)) from error
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query_params = self.request.GET.copy()
+        for param in self.cursor_params:
+            query_params.pop(param, None)
+        context['query_params'] = query_params.urlencode()
+        return context
@@ -0,0 +1,309 @@
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+INDEX_KEY = 'metrics:index'
+PROCESSES_KEY = 'metrics:processes'
+PROCESS_TIMEOUT = 300
+SUM_SCALE = 1000000
+
+_lock = threading.Lock()
+_pending = {}
+_series = {}
+_new_series = {}
+_gauges = {}
+_collectors = []
+_state = {'last_flush': 0.0}
+
+
+def _cache():
+    return caches[getattr(settings, 'METRICS_CACHE', 'default')]
+
+
+def _labels(labelnames, labels):
+    return tuple((name, str(labels.get(name, ''))) for name in labelnames)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _value_key(name, labels):
+    return f'metrics:value:{name}{_format_labels(labels)}'
+
+
+class Metric:
+    """
+        Base class of the metrics exported by the /metrics endpoint.
+
+        Counters and histograms are aggregated over all processes sharing the METRICS_CACHE cache (gunicorn and Celery
+        workers): every process buffers its increments in memory and adds them to the cache with incr() at most every
+        METRICS_FLUSH_INTERVAL seconds, so a request costs no cache round trip. Gauges describe the state of a process and
+        are summed over the processes that reported within PROCESS_TIMEOUT seconds.
+
+        :param name: Name of the metric in the Prometheus exposition format.
+        :type name: str
+        :param documentation: Text of the HELP line.
+        :type documentation: str
+        :param labelnames: Names of the labels of the metric.
+        :type labelnames: tuple
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _meta(self):
+        return {'kind': self.kind, 'help': self.documentation}
+
+    def _add(self, labels, key, amount):
+        with _lock:
+            _pending[key] = _pending.get(key, 0) + amount
+            known = _series.setdefault(self.name, (self._meta(), set()))[1]
+            if labels not in known:
+                known.add(labels)
+                _new_series.setdefault(self.name, (self._meta(), set()))[1].add(labels)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """
+            :param amount: Positive integer added to the counter.
+            :param labels: Values of the labels of the metric.
+            :return: None
+        """
+
+        labels = _labels(self.labelnames, labels)
+        self._add(labels, _value_key(self.name, labels), amount)
+
+
+class Histogram(Metric):
+    """
+        Histogram of observed values, see Metric.
+
+        :param buckets: Upper bounds of the buckets, DEFAULT_BUCKETS by default.
+        :type buckets: tuple
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _meta(self):
+        return dict(super()._meta(), buckets=self.buckets)
+
+    def observe(self, value, **labels):
+        """
+            :param value: The observed value, e.g. a duration in seconds.
+            :param labels: Values of the labels of the metric.
+            :return: None
+        """
+
+        labels = _labels(self.labelnames, labels)
+        bucket = next((bound for bound in self.buckets if value <= bound), '+Inf')
+        self._add(labels, _value_key(f'{self.name}_bucket', labels + (('le', str(bucket)), )), 1)
+        self._add(labels, _value_key(f'{self.name}_sum', labels), int(value * SUM_SCALE))
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        """
+            :param value: The current value in this process.
+            :param labels: Values of the labels of the metric.
+            :return: None
+        """
+
+        with _lock:
+            _gauges[(self.name, _labels(self.labelnames, labels))] = (self.documentation, value)
+
+
+def register_collector(collector):
+    """
+        Registers a function called before the gauges of the process are reported, to update them.
+
+        :param collector: A callable without arguments.
+        :return: The collector, so that the function can be used as a decorator.
+    """
+
+    _collectors.append(collector)
+    return collector
+
+
+def _update_index(cache, key, changes, merge):
+    # Read-modify-write, repeated while a concurrent writer replaced the value in between. Returns whether the changes
+    # are stored.
+    for _ in range(3):
+        current = cache.get(key) or {}
+        updated = merge(dict(current), changes)
+        if updated != current:
+            cache.set(key, updated, timeout=None)
+        stored = cache.get(key) or {}
+        if merge(dict(stored), changes) == stored:
+            return True
+    return False
+
+
+def _merge_series(index, new_series):
+    for name, (meta, series) in new_series.items():
+        known_meta, known_series = index.get(name, (meta, frozenset()))
+        index[name] = (known_meta, frozenset(known_series) | frozenset(series))
+    return index
+
+
+def _process_key():
+    return f'metrics:process:{socket.gethostname()}:{os.getpid()}'
+
+
+def flush(force=False):
+    """
+        Adds the increments buffered by this process to the shared cache and reports its gauges. Without ``force`` it does
+        nothing if the last flush was less than METRICS_FLUSH_INTERVAL (10 by default) seconds ago.
+
+        :param force: Flush regardless of the interval.
+        :return: None
+    """
+
+    now = time.monotonic()
+    if not force and now - _state['last_flush'] < getattr(settings, 'METRICS_FLUSH_INTERVAL', 10):
+        return
+    _state['last_flush'] = now
+
+    for collector in _collectors:
+        collector()
+
+    with _lock:
+        pending, new_series, gauges = dict(_pending), dict(_new_series), dict(_gauges)
+        _pending.clear()
+        _new_series.clear()
+
+    cache = _cache()
+    if INDEX_KEY not in cache:
+        # The index was lost, e.g. the cache was cleared or evicted it: register all series of the process again.
+        with _lock:
+            new_series = {name: (meta, set(series)) for name, (meta, series) in _series.items()}
+    if new_series and not _update_index(cache, INDEX_KEY, new_series, _merge_series):
+        # Lost the race against other processes every time: register the series with the next flush.
+        with _lock:
+            for name, (meta, series) in new_series.items():
+                _new_series.setdefault(name, (meta, set()))[1].update(series)
+
+    for key, amount in pending.items():
+        if not amount:
+            continue
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            if not cache.add(key, amount, timeout=None):
+                cache.incr(key, amount)
+
+    process_key = _process_key()
+    cache.set(process_key, gauges, timeout=PROCESS_TIMEOUT)
+    if process_key not in (cache.get(PROCESSES_KEY) or {}):
+        _update_index(cache, PROCESSES_KEY, {process_key: True}, lambda index, changes: dict(index, **changes))
+
+
+def render():
+    """
+        :return: All metrics in the Prometheus text exposition format, version 0.0.4.
+    """
+
+    flush(force=True)
+    cache = _cache()
+    index = cache.get(INDEX_KEY) or {}
+    lines = []
+
+    keys = []
+    for name, (meta, series) in index.items():
+        for labels in series:
+            keys.append(_value_key(f'{name}_sum', labels) if meta['kind'] == 'histogram' else _value_key(name, labels))
+            if meta['kind'] == 'histogram':
+                keys.extend(_value_key(f'{name}_bucket', labels + (('le', str(bound)), )) for bound in meta['buckets'] + ('+Inf', ))
+    values = cache.get_many(keys)
+
+    for name, (meta, series) in sorted(index.items()):
+        lines.append(f'# HELP {name} {meta["help"]}')
+        lines.append(f'# TYPE {name} {meta["kind"]}')
+        for labels in sorted(series):
+            if meta['kind'] != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {values.get(_value_key(name, labels), 0)}')
+                continue
+
+            cumulative = 0
+            for bound in meta['buckets'] + ('+Inf', ):
+                cumulative += values.get(_value_key(f'{name}_bucket', labels + (('le', str(bound)), )), 0)
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)), ))} {cumulative}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {values.get(_value_key(f"{name}_sum", labels), 0) / SUM_SCALE}')
+
+    processes = cache.get(PROCESSES_KEY) or {}
+    snapshots = cache.get_many(list(processes))
+    if len(snapshots) < len(processes):
+        # Processes that stopped reporting, they register again on their next flush.
+        cache.set(PROCESSES_KEY, {key: True for key in snapshots}, timeout=None)
+
+    gauges = {}
+    for snapshot in snapshots.values():
+        for (name, labels), (documentation, value) in snapshot.items():
+            gauge = gauges.setdefault(name, (documentation, {}))
+            gauge[1][labels] = gauge[1].get(labels, 0) + value
+
+    for name, (documentation, series) in sorted(gauges.items()):
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} gauge')
+        for labels, value in sorted(series.items()):
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Duration of HTTP requests by resolved view.', ('view', 'method', 'status'))
+DB_CONNECTIONS = Gauge('db_connections_open', 'Open database connections by alias.', ('alias', ))
+DB_POOL_CONNECTIONS = Gauge('db_pool_connections', 'Connections of the database connection pools by alias and state.', ('alias', 'state'))
+CELERY_TASK_DURATION = Histogram(
+    'celery_task_duration_seconds', 'Run time of Celery tasks by task and state.', ('task', 'state'),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0))
+CELERY_TASK_FAILURES = Counter('celery_task_failures_total', 'Failed Celery tasks by task.', ('task', ))
+CELERY_TASK_QUEUE_LAG = Histogram(
+    'celery_task_queue_lag_seconds', 'Time Celery tasks waited in the queue by task.', ('task', ),
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0))
+
+
+@register_collector
+def collect_db_connections():
+    """
+        Reports the open database connections of the process and, for backends with a connection pool (e.g. PostgreSQL
+        with the "pool" option), the size and available connections of the pool.
+    """
+
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        DB_CONNECTIONS.set(int(connection.connection is not None), alias=connection.alias)
+        pool = getattr(connection, 'pool', None)
+        if pool is not None and hasattr(pool, 'get_stats'):
+            stats = pool.get_stats()
+            DB_POOL_CONNECTIONS.set(stats.get('pool_size', 0), alias=connection.alias, state='size')
+            DB_POOL_CONNECTIONS.set(stats.get('pool_available', 0), alias=connection.alias, state='available')
@@ -0,0 +1,180 @@
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger('core.renditions')
+
+RENDITIONS_DIR = 'renditions'
+WEBP = 'webp'
+FALLBACK = 'fallback'
+
+
+def is_current(field_file, renditions):
+    """
+        :param field_file: The image FieldFile, e.g. test.image.
+        :param renditions: The renditions stored with it.
+        :return: Whether the renditions were made from the current image.
+    """
+
+    return bool(field_file) and bool(renditions) and renditions.get('source') == field_file.name
+
+
+def _save(storage, name, image, image_format, **options):
+    # Names are derived from the hash of the source, so an existing file is the same rendition.
+    if not storage.exists(name):
+        buffer = io.BytesIO()
+        image.save(buffer, image_format, **options)
+        storage.save(name, ContentFile(buffer.getvalue()))
+    return name
+
+
+def render_renditions(field_file, sizes):
+    """
+        Generates square, resized and recompressed variants of an image: a WebP file and a fallback (JPEG, or PNG for images
+        with transparency) for every size. The variants are stored next to the media under content-hashed names, so they
+        can be cached forever, and images shared by many rows (e.g. the default cover) are rendered once.
+
+        :param field_file: The image FieldFile, e.g. test.image.
+        :param sizes: The edge lengths in pixels, e.g. (100, 200).
+        :return: A dictionary {'source': name of the image, '<size>': {'webp': name, 'fallback': name}, ...}, or None if
+        the image cannot be read.
+    """
+
+    storage = field_file.storage
+    try:
+        with storage.open(field_file.name, 'rb') as source:
+            content = source.read()
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(content)))
+    except (OSError, UnidentifiedImageError) as error:
+        logger.warning(f'Renditions of {field_file.name} skipped: {error}')
+        return None
+
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    quality = getattr(settings, 'RENDITION_QUALITY', 80)
+    transparent = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if transparent else 'RGB')
+
+    renditions = {'source': field_file.name}
+    for size in sizes:
+        # Never upscale, a small source is only cropped to a square.
+        edge = min(size, *image.size)
+        resized = ImageOps.fit(image, (edge, edge), Image.Resampling.LANCZOS)
+        name = f'{RENDITIONS_DIR}/{digest[:2]}/{digest}-{size}'
+        renditions[str(size)] = {
+            WEBP: _save(storage, f'{name}.webp', resized, 'WEBP', quality=quality),
+            FALLBACK: (
+                _save(storage, f'{name}.png', resized, 'PNG', optimize=True) if transparent
+                else _save(storage, f'{name}.jpg', resized, 'JPEG', quality=quality, optimize=True, progressive=True)
+            ),
+        }
+    return renditions
+
+
+def update_renditions(instance, field_name='image', force=False):
+    """
+        Generates the renditions of the image of a model instance, in the sizes of its IMAGE_RENDITION_SIZES, and stores
+        them in its ``renditions`` field. The row is only updated if it still has the same image, so a rendition task
+        that overtook a later upload does not overwrite newer renditions.
+
+        :param instance: A model instance with an image field and a renditions JSONField.
+        :param field_name: Name of the image field.
+        :param force: Generate the renditions even if they are current.
+        :return: True if the renditions were updated.
+    """
+
+    field_file = getattr(instance, field_name)
+    if not field_file or (not force and is_current(field_file, instance.renditions)):
+        return False
+
+    renditions = render_renditions(field_file, instance.IMAGE_RENDITION_SIZES)
+    if renditions is None:
+        return False
+
+    instance.renditions = renditions
+    return bool(type(instance).objects.filter(pk=instance.pk, **{field_name: field_file.name}).update(renditions=renditions))
+
+
+def schedule_renditions(instance, task, field_name='image'):
+    """
+        Generates the renditions of an instance whose image changed, once the current transaction commits: in a Celery
+        worker with RENDITIONS_ASYNC, otherwise right away.
+
+        :param instance: The saved model instance.
+        :param task: The Celery task generating the renditions, called with the primary key of the instance.
+        :param field_name: Name of the image field.
+        :return: None
+    """
+
+    if is_current(getattr(instance, field_name), instance.renditions):
+        return
+
+    pk = instance.pk
+    if getattr(settings, 'RENDITIONS_ASYNC', False):
+        transaction.on_commit(lambda: task.delay(pk))
+    else:
+        transaction.on_commit(lambda: task(pk))
+
+
+def backfill_renditions(queryset, field_name='image', batch_size=500, force=False):
+    """
+        Generates the missing or outdated renditions of all rows of a queryset, writing them with one bulk UPDATE per batch.
+        Every distinct image is rendered once per run.
+
+        :param queryset: A queryset of a model with an image field and a renditions JSONField.
+        :param field_name: Name of the image field.
+        :param batch_size: Number of rows read and updated at once.
+        :param force: Regenerate current renditions as well.
+        :return: The number of updated rows.
+    """
+
+    rendered = {}
+    updated = 0
+    batch = []
+
+    def write(batch):
+        with transaction.atomic():
+            queryset.model.objects.bulk_update(batch, ['renditions'], batch_size=batch_size)
+        return len(batch)
+
+    for instance in queryset.only('pk', field_name, 'renditions').order_by('pk').iterator(chunk_size=batch_size):
+        field_file = getattr(instance, field_name)
+        if not field_file or (not force and is_current(field_file, instance.renditions)):
+            continue
+
+        if field_file.name not in rendered:
+            rendered[field_file.name] = render_renditions(field_file, instance.IMAGE_RENDITION_SIZES)
+        if rendered[field_file.name] is None:
+            continue
+
+        instance.renditions = rendered[field_file.name]
+        batch.append(instance)
+        if len(batch) >= batch_size:
+            updated += write(batch)
+            batch = []
+
+    if batch:
+        updated += write(batch)
+    return updated
+
+
+def rendition_url(field_file, renditions, size, image_format=WEBP):
+    """
+        :param field_file: The image FieldFile, e.g. test.image.
+        :param renditions: The renditions stored with it.
+        :param size: The edge length in pixels.
+        :param image_format: WEBP or FALLBACK.
+        :return: The URL of the rendition, or None if there is no current rendition of that size.
+    """
+
+    if not is_current(field_file, renditions):
+        return None
+    rendition = renditions.get(str(size))
+    if not rendition:
+        return None
+    return field_file.storage.url(rendition[image_format])
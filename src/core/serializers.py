@@ -0,0 +1,38 @@
+from rest_framework import serializers
+
+from core.renditions import is_current, WEBP, FALLBACK
+
+
+class RenditionsField(serializers.Field):
+    """
+        Read-only field serializing the renditions of an image (see core.renditions) as a dictionary mapping each size to
+        the absolute URLs of its WebP and fallback variants, e.g. ``{"100": {"webp": "...", "fallback": "..."}}``, so that
+        clients can pick the size they display instead of downloading the original. It is empty until the renditions of
+        the current image are generated.
+
+        :param image_field: Name of the image field of the model.
+        :type image_field: str
+    """
+
+    def __init__(self, image_field='image', **kwargs):
+        self.image_field = image_field
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        field_file = getattr(instance, self.image_field)
+        renditions = instance.renditions
+        if not is_current(field_file, renditions):
+            return {}
+
+        request = self.context.get('request')
+
+        def url(name):
+            url = field_file.storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return {
+            size: {WEBP: url(rendition[WEBP]), FALLBACK: url(rendition[FALLBACK])}
+            for size, rendition in renditions.items()
+            if size != 'source'
+        }
@@ -0,0 +1,61 @@
+import time
+
+from celery.signals import before_task_publish, task_prerun, task_postrun, task_failure, worker_process_shutdown, worker_shutdown
+
+from core import prometheus
+
+
+_started = {}
+
+
+@before_task_publish.connect
+def stamp_published_at(sender=None, headers=None, **kwargs):
+    """
+        Adds the time a task is sent to the message headers, to measure how long it waits in the queue.
+    """
+
+    if headers is not None:
+        headers.setdefault('published_at', time.time())
+
+
+@task_prerun.connect
+def record_task_start(sender=None, task_id=None, task=None, **kwargs):
+    """
+        Observes the queue lag of a task (the time between publishing and running it) and notes the time it started.
+    """
+
+    published_at = getattr(task.request, 'published_at', None) if task is not None else None
+    if published_at is not None:
+        prometheus.CELERY_TASK_QUEUE_LAG.observe(max(0.0, time.time() - published_at), task=task.name)
+    _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_duration(sender=None, task_id=None, task=None, state=None, **kwargs):
+    """
+        Observes the run time of a task by its final state, e.g. SUCCESS or FAILURE.
+    """
+
+    started = _started.pop(task_id, None)
+    if started is not None and task is not None:
+        prometheus.CELERY_TASK_DURATION.observe(time.perf_counter() - started, task=task.name, state=state or 'UNKNOWN')
+    prometheus.flush()
+
+
+@task_failure.connect
+def record_task_failure(sender=None, **kwargs):
+    """
+        Counts a task that raised an exception.
+    """
+
+    prometheus.CELERY_TASK_FAILURES.inc(task=getattr(sender, 'name', str(sender)))
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_metrics(**kwargs):
+    """
+        Sends the metrics buffered by a worker process before it exits.
+    """
+
+    prometheus.flush(force=True)
@@ -0,0 +1,27 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from core import metrics
+
+
+class TimedTemplate(Template):
+    """
+        Template of the Django template language whose render time is added to the metrics of the current request.
+    """
+
+    def render(self, context=None, request=None):
+        with metrics.template_render():
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+        DjangoTemplates backend returning TimedTemplate objects, so that template render time is part of the request
+        metrics collected by core.middleware.RequestMetricsMiddleware.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
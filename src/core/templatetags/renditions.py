@@ -0,0 +1,58 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from core.renditions import rendition_url, WEBP, FALLBACK
+
+register = template.Library()
+
+
+def _srcset(field_file, renditions, size, image_format):
+    candidates = ((rendition_url(field_file, renditions, size * density, image_format), density) for density in (1, 2))
+    return ', '.join(f'{url} {density}x' for url, density in candidates if url)
+
+
+@register.simple_tag(name='rendition_url')
+def rendition_url_tag(field_file, renditions, size, image_format=WEBP):
+    """
+        :param field_file: The image FieldFile, e.g. test.image.
+        :param renditions: The renditions stored with it, e.g. test.renditions.
+        :param size: The edge length in pixels.
+        :param image_format: 'webp' or 'fallback'.
+        :return: The URL of the rendition, or of the original image if there is no current rendition of that size.
+    """
+
+    return rendition_url(field_file, renditions, size, image_format) or field_file.url
+
+
+@register.simple_tag
+def picture(field_file, renditions, size, **attributes):
+    """
+        Renders a square image of the given size as a <picture> element with a WebP source and a JPEG or PNG fallback,
+        both with a 2x variant for high density screens if there is one, e.g.
+        ``{% picture test.image test.renditions 100 alt="Test Image" class="rounded-circle" %}``.
+        Without current renditions, e.g. right after an upload, the original image is used.
+
+        :param field_file: The image FieldFile.
+        :param renditions: The renditions stored with it.
+        :param size: The displayed edge length in pixels.
+        :param attributes: Further attributes of the <img> element, loading="lazy" unless given.
+        :return: The HTML of the element.
+    """
+
+    if not field_file:
+        return ''
+
+    attributes.setdefault('loading', 'lazy')
+    attributes = format_html_join('', ' {}="{}"', sorted(attributes.items()))
+    if rendition_url(field_file, renditions, size) is None:
+        return format_html('<img src="{}" width="{}" height="{}"{}>', field_file.url, size, size, attributes)
+
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}"><img src="{}" srcset="{}" width="{}" height="{}"{}></picture>',
+        _srcset(field_file, renditions, size, WEBP),
+        rendition_url(field_file, renditions, size, FALLBACK),
+        _srcset(field_file, renditions, size, FALLBACK),
+        size,
+        size,
+        attributes,
+    )
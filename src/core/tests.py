@@ -1,3 +1,399 @@
-from django.test import TestCase # noqa
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from core import metrics, prometheus
+from core.paginator import CountlessPaginator, EstimatedCountPaginator, estimated_count
+from smart_test.cache import get_compiled_test
+from smart_test.models import Question, Test, TestResult
+from smart_test.seeding import DatasetSeeder
+from smart_test.services import submit_test
+from smart_test.tasks import cleanup_outdated_test_results
+
+
+class RequestMetricsTests(TestCase):
+    """
+        Tests for the per-request performance instrumentation.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_server_timing_header:
+            Checks that a rendered page carries a Server-Timing header with its database queries and render time.
+
+        test_request_log:
+            Checks that every request is logged with its resolved view name and figures.
+
+        test_cache_reads_counted:
+            Checks that cache hits and misses of a request are counted, and that nothing is recorded outside of a request.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Clears the shared cache and logs in with the credentials of the 'admin' user.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.client = Client()
+        self.client.login(username='admin', password='admin')
+
+    def test_server_timing_header(self):
+        """
+            Renders the test list and parses its Server-Timing header.
+
+            :return: None
+        """
+
+        response = self.client.get(reverse('tests:list'))
+
+        entries = {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+        self.assertEqual(set(entries), {'total', 'db', 'cache', 'tpl'})
+        self.assertNotIn('"0 queries"', entries['db'])
+        self.assertNotEqual(entries['tpl'], 'tpl;dur=0.0')
+
+    def test_request_log(self):
+        """
+            Loads the details of a test and checks the structured fields of the log record.
+
+            :return: None
+        """
+
+        with self.assertLogs('core.metrics', level='INFO') as logs:
+            self.client.get(reverse('tests:details', kwargs={'id': 1}))
+
+        record = logs.records[-1]
+        self.assertEqual(record.view, 'tests:details')
+        self.assertEqual(record.status, 200)
+        self.assertGreater(record.db_queries, 0)
+        self.assertIn('view=tests:details', record.getMessage())
+
+    def test_cache_reads_counted(self):
+        """
+            Reads a missing and a present key inside a request context and outside of it.
+
+            :return: None
+        """
+
+        cache.set('present', 1)
+        request_metrics, token = metrics.start()
+        try:
+            cache.get('missing')
+            cache.get('present')
+            cache.get_many(['present', 'missing'])
+        finally:
+            metrics.finish(token)
+
+        self.assertEqual((request_metrics.cache_hits, request_metrics.cache_misses), (2, 2))
+        self.assertIsNone(metrics.current())
+        self.assertEqual(cache.get('missing', 'default'), 'default')
+
+
+class PrometheusMetricsTests(TestCase):
+    """
+        Tests for the metrics served at /metrics.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_request_histogram:
+            Checks that requests are counted in the latency histogram of their view.
+
+        test_aggregation:
+            Checks that counters are added up in the cache and gauges are summed over the processes.
+
+        test_test_flow_counted:
+            Checks that started and finished tests and their answers are counted.
+
+        test_celery_task_metrics:
+            Checks that the run time of a Celery task is observed through the task signals.
+
+        test_token_required:
+            Checks that the endpoint requires the METRICS_TOKEN bearer token, and is disabled without a token.
+
+        test_series_registered_after_lost_race:
+            Checks that new series are registered by the next flush if updating the index failed.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Sends the increments buffered by earlier tests and clears the shared cache, so that every test starts from zero.
+
+            :return: None
+        """
+
+        prometheus.flush(force=True)
+        cache.clear()
+        self.client = Client()
+        self.client.login(username='admin', password='admin')
+
+    def test_request_histogram(self):
+        """
+            Loads the test list twice and reads the histogram of its view.
+
+            :return: None
+        """
+
+        self.client.get(reverse('tests:list'))
+        self.client.get(reverse('tests:list'))
+        with self.settings(METRICS_TOKEN='secret'):
+            response = self.client.get(reverse('core:metrics'), headers={'Authorization': 'Bearer secret'})
+
+        self.assertEqual(response['Content-Type'], prometheus.CONTENT_TYPE)
+        content = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', content)
+        self.assertIn('http_request_duration_seconds_bucket{view="tests:list",method="GET",status="200",le="+Inf"} 2', content)
+        self.assertIn('http_request_duration_seconds_count{view="tests:list",method="GET",status="200"} 2', content)
+
+    def test_aggregation(self):
+        """
+            Flushes a counter twice and adds the gauge snapshot of another process.
+
+            :return: None
+        """
+
+        counter = prometheus.Counter('test_events_total', 'Events.', ('kind', ))
+        counter.inc(kind='a')
+        prometheus.flush(force=True)
+        counter.inc(2, kind='a')
+        gauge = prometheus.Gauge('test_workers', 'Workers.')
+        gauge.set(1)
+        prometheus.flush(force=True)
+        cache.set('metrics:process:other:1', {('test_workers', ()): ('Workers.', 2)})
+        cache.set(prometheus.PROCESSES_KEY, dict(cache.get(prometheus.PROCESSES_KEY), **{'metrics:process:other:1': True}))
+
+        content = prometheus.render()
+
+        self.assertIn('test_events_total{kind="a"} 3', content)
+        self.assertIn('test_workers 3', content)
+
+    def test_test_flow_counted(self):
+        """
+            Submits a whole test at once.
+
+            :return: None
+        """
+
+        plan = get_compiled_test(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            submit_test(User.objects.get(username='admin'), plan, {}, started_at=timezone.now())
+
+        content = prometheus.render()
+
+        self.assertIn('smart_test_tests_started_total 1', content)
+        self.assertIn('smart_test_tests_finished_total 1', content)
+        self.assertIn(f'smart_test_answers_total{{correct="False"}} {plan.question_count}', content)
+
+    def test_celery_task_metrics(self):
+        """
+            Runs the cleanup task locally, which sends the same signals as a worker.
+
+            :return: None
+        """
+
+        cleanup_outdated_test_results.apply()
+
+        content = prometheus.render()
+
+        self.assertIn(
+            'celery_task_duration_seconds_count{task="smart_test.tasks.cleanup_outdated_test_results",state="SUCCESS"} 1', content)
+
+    def test_token_required(self):
+        """
+            Requests the metrics without a configured token, then without and with the configured token.
+
+            :return: None
+        """
+
+        with self.settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get(reverse('core:metrics'), headers={'Authorization': 'Bearer '}).status_code, 404)
+
+        with self.settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get(reverse('core:metrics')).status_code, 403)
+            response = self.client.get(reverse('core:metrics'), headers={'Authorization': 'Bearer secret'})
+            self.assertEqual(response.status_code, 200)
+
+    def test_series_registered_after_lost_race(self):
+        """
+            Flushes a new series while every update of the index fails, then flushes again.
+
+            :return: None
+        """
+
+        prometheus.flush(force=True)
+        self.assertIsNotNone(cache.get(prometheus.INDEX_KEY))
+        counter = prometheus.Counter('test_races_total', 'Races.')
+        counter.inc()
+        with mock.patch('core.prometheus._update_index', return_value=False):
+            prometheus.flush(force=True)
+        self.assertNotIn('test_races_total', cache.get(prometheus.INDEX_KEY, {}))
+
+        prometheus.flush(force=True)
+        self.assertIn('test_races_total 1', prometheus.render())
+
+
+class PaginatorTests(TestCase):
+    """
+        Tests for the paginators of core.paginator that do not count the rows.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_estimated_count:
+            Checks that the planner estimate is used for unfiltered querysets above the threshold only.
+
+        test_countless_paginator:
+            Checks the pages of CountlessPaginator and that no page counts the rows.
+
+        test_estimated_pages:
+            Checks that the pages past an estimate that is short of the real number of rows are served in full.
+
+        test_admin_changelist:
+            Checks that the test run changelist neither counts the table nor queries the test and user of every row.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Seeds 30 users, tests and finished runs and refreshes the planner statistics.
+
+            :return: None
+        """
+
+        seeder = DatasetSeeder(seed=1)
+        user_ids = seeder.create_users(30)
+        test_ids = seeder.create_tests(30, num_questions=Test.QUESTION_MIN_LIMIT, num_answers=Question.ANSWER_MIN_LIMIT)
+        seeder.create_test_results(30, user_ids, test_ids, num_questions=Test.QUESTION_MIN_LIMIT, active_ratio=0)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_estimated_count(self):
+        """
+            Counts the test runs with a threshold below and above the size of the table, and with a filter.
+
+            :return: None
+        """
+
+        results = TestResult.objects.all()
+        if estimated_count(results) is None:
+            self.skipTest('No planner statistics on this database')
+
+        paginator = EstimatedCountPaginator(results.order_by('id'), 10)
+        paginator.threshold = 0
+        self.assertEqual(paginator.count, estimated_count(results))
+        self.assertTrue(paginator.estimated)
+
+        paginator = EstimatedCountPaginator(results.order_by('id'), 10)
+        paginator.threshold = 10 ** 9
+        self.assertEqual(paginator.count, results.count())
+        self.assertFalse(paginator.estimated)
+
+        self.assertIsNone(estimated_count(results.filter(state=TestResult.STATE.FINISHED)))
+
+    def test_countless_paginator(self):
+        """
+            Reads the first, second and last pages of the tests, and a page past the end.
+
+            :return: None
+        """
+
+        tests = Test.objects.order_by('id')
+        total = tests.count()
+        paginator = CountlessPaginator(tests, 10)
+
+        with CaptureQueriesContext(connection) as queries:
+            first = paginator.page(1)
+            last = paginator.page((total - 1) // 10 + 1)
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
+
+        self.assertEqual(list(first), list(tests[:10]))
+        self.assertTrue(first.has_next())
+        self.assertFalse(first.has_previous())
+        self.assertEqual(list(last), list(tests[(last.number - 1) * 10:]))
+        self.assertFalse(last.has_next())
+        self.assertEqual(last.end_index(), total)
+
+        with self.assertRaises(EmptyPage):
+            paginator.page(last.number + 1)
+
+    def test_estimated_pages(self):
+        """
+            Adds 30 runs after the planner statistics were refreshed and reads every page of all runs by the estimate.
+
+            :return: None
+        """
+
+        results = TestResult.objects.order_by('id')
+        estimate = estimated_count(results)
+        if estimate is None:
+            self.skipTest('No planner statistics on this database')
+
+        seeder = DatasetSeeder(seed=2)
+        seeder.create_test_results(30, list(User.objects.values_list('id', flat=True)), list(Test.objects.values_list('id', flat=True)),
+                                   num_questions=Test.QUESTION_MIN_LIMIT, active_ratio=0)
+        total = results.count()
+        self.assertGreater(total, estimate + 10)
+
+        paginator = EstimatedCountPaginator(results, 10)
+        paginator.threshold = 0
+        self.assertEqual(paginator.count, estimate)
+
+        rows, number = [], 1
+        while True:
+            page = paginator.page(number)
+            self.assertEqual(len(page), min(10, total - len(rows)))
+            rows.extend(page)
+            if not page.has_next():
+                break
+            number += 1
+
+        self.assertEqual(rows, list(results))
+        self.assertEqual(page.end_index(), total)
+        with self.assertRaises(EmptyPage):
+            paginator.page(number + 1)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=0)
+    def test_admin_changelist(self):
+        """
+            Requests the changelist of the test runs with 30 and 60 runs.
+
+            :return: None
+        """
+
+        self.client.login(username='admin', password='admin')
+        url = reverse('admin:smart_test_testresult_changelist')
+
+        counts = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+            if estimated_count(TestResult.objects.all()) is not None:
+                self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper() and 'testresult' in query['sql']])
+
+            seeder = DatasetSeeder(seed=2)
+            seeder.create_test_results(30, list(User.objects.values_list('id', flat=True)[:30]),
+                                       list(Test.objects.values_list('id', flat=True)[:30]), num_questions=Test.QUESTION_MIN_LIMIT,
+                                       active_ratio=0)
+
+        self.assertEqual(counts[0], counts[1])
@@ -19,6 +19,7 @@ from django.urls import path
 
 from core.views import (
     index,
+    metrics,
     error_400,
     error_404,
     error_403,
@@ -32,6 +33,7 @@ app_name = "core"
 urlpatterns = [
 
     path('', index, name='index'),
+    path('metrics', metrics, name='metrics'),
 ]
 
 handler400 = error_400
@@ -1,4 +1,9 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from core import prometheus
 
 # Create your views here.
 
@@ -123,3 +128,22 @@ def error_503(request, exception):
     """
 
     return render(request, "503.html", status=503)
+
+
+def metrics(request):
+    """
+        Serves the metrics of all web and Celery worker processes in the Prometheus text format, see core.prometheus.
+        The request must carry METRICS_TOKEN as a bearer token; without a configured token the endpoint is disabled, as
+        it is reachable from the outside.
+
+        :param request: The HTTP request object.
+        :return: An HTTP response with the metrics, 404 if no token is configured, or 403 if the token is missing or wrong.
+    """
+
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        raise Http404('Metrics are disabled')
+    if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+
+    return HttpResponse(prometheus.render(), content_type=prometheus.CONTENT_TYPE)
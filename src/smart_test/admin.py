@@ -1,7 +1,8 @@
 from django.contrib import admin
 
+from core.paginator import EstimatedCountPaginator
 from smart_test.forms import QuestionsInlineFormSet, AnswerInlineFormSet
-from smart_test.models import TestResult, Answer, Question, Test, Topic
+from smart_test.models import TestResult, Answer, Question, Test, Topic, AnswerLog, TestStats, TestResultArchive
 
 # Register your models here.
 
@@ -68,16 +69,51 @@ class TestAdminModel(admin.ModelAdmin):
         TestAdminModel class customizes the admin interface for a specific model.
 
         Attributes:
+            list_display (tuple): The columns of the admin list view.
+            list_select_related (tuple): Relations joined by the list view query, so the topic column costs no query per row.
             list_per_page (int): Specifies the number of items to display per page in the admin list view.
+            paginator (Paginator): Uses the planner estimate instead of counting a large catalogue, see
+            core.paginator.EstimatedCountPaginator.
+            show_full_result_count (bool): Disabled, it would count the whole table once more when filtering.
             inlines (tuple): Specifies inline models to be displayed within the admin interface for this model.
     """
 
+    list_display = ('title', 'topic', 'level')
+    list_select_related = ('topic', )
     list_per_page = 10
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = (QuestionInline, )
 
 
+class TestResultAdminModel(admin.ModelAdmin):
+    """
+        Admin model for the runs of the tests, the largest table of the application.
+
+        Attributes:
+            list_display (tuple): The columns of the admin list view.
+            list_filter (tuple): The filters of the admin list view.
+            list_select_related (tuple): Relations joined by the list view query, so the test and user columns cost no query
+            per row.
+            raw_id_fields (tuple): Relations edited by id, the change form does not list all users and tests.
+            paginator (Paginator): Uses the planner estimate instead of counting the unfiltered table, see
+            core.paginator.EstimatedCountPaginator.
+            show_full_result_count (bool): Disabled, it would count the whole table once more when filtering.
+    """
+
+    list_display = ('test', 'user', 'state', 'num_correct_answers', 'num_incorrect_answers', 'write_date')
+    list_filter = ('state', )
+    list_select_related = ('test', 'user')
+    raw_id_fields = ('test', 'user')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 admin.site.register(Topic)
 admin.site.register(Test, TestAdminModel)
 admin.site.register(Question, QuestionAdminModel)
 admin.site.register(Answer)
-admin.site.register(TestResult)
+admin.site.register(TestResult, TestResultAdminModel)
+admin.site.register(AnswerLog)
+admin.site.register(TestStats)
+admin.site.register(TestResultArchive)
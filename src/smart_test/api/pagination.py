@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TestCursorPagination(CursorPagination):
+    """
+        Keyset pagination over the test catalogue, ordered like Test.Meta.ordering with the id as a tie breaker, or by
+        relevance with ``?search=`` (see smart_test.search). Fetching a page costs the same on every position of the
+        catalogue, unlike offset pagination.
+
+        Attributes:
+            ordering (tuple): Fields the cursor is built on.
+            page_size (int): Default number of tests per page.
+            page_size_query_param (str): Query parameter to request another page size.
+            max_page_size (int): Upper limit for the requested page size.
+    """
+
+    ordering = ('title', 'id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get('search'):
+            return ('-search_rank', 'id')
+        return super().get_ordering(request, queryset, view)
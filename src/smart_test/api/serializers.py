@@ -1,24 +1,195 @@
 from rest_framework import serializers
 
-from smart_test.models import Test
+from core.serializers import RenditionsField
+from smart_test.importers import IMPORT_FORMATS
+from smart_test.models import Test, Question, Answer, TestResult, Topic
+from smart_test.services import read_start_token
 
 
-class TestSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+        Serializer mixin that limits the serialized fields to the comma separated list given in the ``fields`` query
+        parameter of the request, e.g. ``?fields=id,title``. Unknown field names are ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        requested = request.query_params.get('fields')
+        if requested:
+            allowed = set(requested.split(','))
+            for field_name in set(self.fields) - allowed:
+                self.fields.pop(field_name)
+
+
+class TestSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
         Serializer class for the Test model.
 
         This class provides serialization for the Test model,
-        including fields for 'id', 'topic', 'title', 'description',
-        'level', and 'image'.
+        including fields for 'id', 'topic', 'topic_name', 'title', 'description',
+        'level', 'image' and 'image_renditions', the URLs of the resized variants of the image by size.
+        The fields can be limited with the ``fields`` query parameter.
     """
 
+    topic_name = serializers.CharField(source='topic.name', read_only=True, default=None)
+    image_renditions = RenditionsField()
+
     class Meta:
         model = Test
         fields = (
             'id',
             'topic',
+            'topic_name',
             'title',
             'description',
             'level',
-            'image'
+            'image',
+            'image_renditions',
         )
+
+
+class AnswerPayloadSerializer(serializers.ModelSerializer):
+    """
+        Serializer for an answer inside the full test payload. The correctness of the answer is deliberately left out.
+    """
+
+    class Meta:
+        model = Answer
+        fields = ('id', 'text')
+
+
+class QuestionPayloadSerializer(serializers.ModelSerializer):
+    """
+        Serializer for a question inside the full test payload, including its answers ordered by id.
+    """
+
+    answers = AnswerPayloadSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ('id', 'order_number', 'text', 'answers')
+
+
+class TestPayloadSerializer(serializers.ModelSerializer):
+    """
+        Serializer for a whole test with its questions and answers, used to take a test offline or in one batch.
+        The 'version' field identifies the state of the test and is to be sent back with the submission, together with the
+        'start_token' TestPayloadView adds to every response.
+    """
+
+    version = serializers.IntegerField(read_only=True, source='plan_version')
+    questions = QuestionPayloadSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Test
+        fields = ('id', 'title', 'description', 'level', 'version', 'questions')
+
+
+class QuestionSubmissionSerializer(serializers.Serializer):
+    """
+        Serializer for the answer to a single question in a batch submission.
+
+        Fields:
+            question: Id of the answered question.
+            selected: Ids of the selected answers.
+            latency: Optional number of seconds spent on the question.
+    """
+
+    question = serializers.IntegerField()
+    selected = serializers.ListField(child=serializers.IntegerField(), allow_empty=True)
+    latency = serializers.FloatField(required=False, min_value=0)
+
+
+class TestSubmissionSerializer(serializers.Serializer):
+    """
+        Serializer for a whole test submitted at once.
+
+        Fields:
+            version: Optional version of the test received with the payload. A submission for an outdated version is rejected.
+            start_token: The token received with the payload, see TestPayloadSerializer. The time spent on the test is
+            measured from the time it was issued; it is validated into ``started_at``.
+            answers: The answers, at most one per question.
+    """
+
+    version = serializers.IntegerField(required=False)
+    start_token = serializers.CharField()
+    answers = QuestionSubmissionSerializer(many=True)
+
+    def validate(self, attrs):
+        try:
+            attrs['started_at'] = read_start_token(attrs.pop('start_token'), self.context['user'], self.context['plan'])
+        except ValueError as error:
+            raise serializers.ValidationError({'start_token': str(error)})
+        return attrs
+
+    def validate_answers(self, value):
+        question_ids = [answer['question'] for answer in value]
+        if len(question_ids) != len(set(question_ids)):
+            raise serializers.ValidationError('Every question can be answered only once.')
+
+        plan = self.context['plan']
+        questions = {question.id: question for question in plan.questions}
+        unknown = set(question_ids) - questions.keys()
+        if unknown:
+            raise serializers.ValidationError(f'Unknown questions: {sorted(unknown)}.')
+
+        unknown = {
+            answer_id
+            for answer in value
+            for answer_id in answer['selected']
+            if answer_id not in questions[answer['question']].answer_ids
+        }
+        if unknown:
+            raise serializers.ValidationError(f'Unknown answers: {sorted(unknown)}.')
+        return value
+
+
+class TestResultSerializer(serializers.ModelSerializer):
+    """
+        Serializer for the outcome of a test run, including the derived points and score.
+    """
+
+    points = serializers.IntegerField(read_only=True)
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = TestResult
+        fields = ('id', 'test', 'state', 'num_correct_answers', 'num_incorrect_answers', 'points', 'score')
+
+
+class QuestionBankImportSerializer(serializers.Serializer):
+    """
+        Serializer for an uploaded question bank.
+
+        Fields:
+            file: The question bank file.
+            format: Optional format of the file, guessed from its extension by default.
+            topic: Optional topic of tests that do not name their own topic.
+            title: Optional title of the test for questions outside of a category (GIFT and Moodle XML).
+            dry_run: Only validate the question bank.
+    """
+
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=IMPORT_FORMATS, required=False)
+    topic = serializers.PrimaryKeyRelatedField(queryset=Topic.objects.all(), required=False)
+    title = serializers.CharField(required=False, max_length=128)
+    dry_run = serializers.BooleanField(default=False)
+
+
+class ImportReportSerializer(serializers.Serializer):
+    """
+        Serializer for the outcome of a question bank import, see smart_test.importers.ImportReport.
+    """
+
+    tests = serializers.IntegerField()
+    questions = serializers.IntegerField()
+    answers = serializers.IntegerField()
+    errors = serializers.SerializerMethodField()
+
+    def get_errors(self, report):
+        return [{'source': source, 'message': message} for source, message in report.errors]
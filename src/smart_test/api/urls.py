@@ -1,6 +1,7 @@
 from django.urls import path
 
-from smart_test.api.views import TestListView, TestListCreateView, TestUpdateDeleteView
+from smart_test.api.views import TestListView, TestListCreateView, TestUpdateDeleteView, TestPayloadView, TestSubmitView, \
+    QuestionBankImportView
 
 
 app_name = 'api_smart_test'
@@ -11,4 +12,10 @@ urlpatterns = [
     path('tests/create', TestListCreateView.as_view(), name='test_create'),
 
     path('tests/update/<int:pk>', TestUpdateDeleteView.as_view(), name='test_detail'),
+
+    path('tests/<int:pk>/payload', TestPayloadView.as_view(), name='test_payload'),
+
+    path('tests/<int:pk>/submit', TestSubmitView.as_view(), name='test_submit'),
+
+    path('tests/import', QuestionBankImportView.as_view(), name='test_import'),
 ]
@@ -1,24 +1,80 @@
-from rest_framework import generics
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
+from rest_framework.views import APIView
 
-from smart_test.api.serializers import TestSerializer
-from smart_test.models import Test
+from smart_test.api.pagination import TestCursorPagination
+from smart_test.api.serializers import TestSerializer, TestPayloadSerializer, TestSubmissionSerializer, TestResultSerializer, \
+    QuestionBankImportSerializer, ImportReportSerializer
+from smart_test.cache import catalogue_last_modified, get_compiled_test, PLAN_CACHE_TIMEOUT
+from smart_test.forms import TestSearchForm
+from smart_test.importers import guess_format, import_question_bank, parse_question_bank
+from smart_test.models import Test, Question, Answer
+from smart_test.search import filter_catalogue
+from smart_test.services import issue_start_token, submit_test
 
 
 class TestListView(generics.ListAPIView):
     """
-        Class providing a read-only endpoint that lists Test objects.
+        Class providing a read-only endpoint that lists the test catalogue.
+
+        The catalogue is paginated with a cursor over Test.Meta.ordering and the fields can be limited with ``?fields=``.
+        It is searched and filtered with the ``search``, ``level`` and ``topic`` query parameters of TestSearchForm, search
+        results are ordered by relevance.
+        Every response carries a strong ETag and a Last-Modified header derived from the time the catalogue last changed,
+        so a conditional request for an unchanged catalogue is answered with 304 before the queryset is evaluated.
 
         Attributes:
-            queryset (QuerySet): QuerySet that retrieves all Test objects.
+            queryset (QuerySet): QuerySet that retrieves all Test objects together with their topic.
             serializer_class (Serializer): Serializer class used for the Test objects.
+            pagination_class (Pagination): Cursor pagination over the catalogue.
             throttle_classes (list): List of throttle classes applied to the view, including UserRateThrottle and AnonRateThrottle.
     """
 
-    queryset = Test.objects.all()
+    queryset = Test.objects.select_related('topic')
     serializer_class = TestSerializer
+    pagination_class = TestCursorPagination
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
 
+    def get_queryset(self):
+        """
+            :return: The catalogue filtered with the query parameters.
+            :raises ValidationError: If a filter is invalid, e.g. an unknown topic.
+        """
+
+        form = TestSearchForm(self.request.query_params)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        return filter_catalogue(super().get_queryset(), **form.cleaned_data)
+
+    def list(self, request, *args, **kwargs):
+        """
+            :param request: The HTTP request object.
+            :return: 304 Not Modified if the client holds the current version of the requested page, otherwise the page.
+        """
+
+        last_modified = catalogue_last_modified()
+        fingerprint = f'{last_modified}:{request.accepted_media_type}:{request.get_full_path()}'
+        etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
 
 class TestListCreateView(generics.ListCreateAPIView):
     """
@@ -56,3 +112,113 @@ class TestUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Test.objects.all()
     serializer_class = TestSerializer
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
+
+
+class TestPayloadView(generics.RetrieveAPIView):
+    """
+        Read-only endpoint returning a whole test with its questions and answers, without their correctness, so that a client
+        can take the test offline and submit it at once with TestSubmitView.
+
+        The serialized payload is cached per version of the compiled test plan, so it is rebuilt only after the test,
+        its questions or answers change. Every response carries a new start token, see issue_start_token().
+
+        Attributes:
+            queryset (QuerySet): Tests with their questions and answers prefetched in order.
+            serializer_class (Serializer): Serializer class used for the payload.
+            throttle_classes (list): List of throttle classes applied to the view, including UserRateThrottle and AnonRateThrottle.
+    """
+
+    queryset = Test.objects.prefetch_related(
+        Prefetch('questions', queryset=Question.objects.order_by('order_number').prefetch_related(
+            Prefetch('answers', queryset=Answer.objects.order_by('id'))))
+    )
+    serializer_class = TestPayloadSerializer
+    throttle_classes = [UserRateThrottle, AnonRateThrottle]
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+            :param request: The HTTP request object.
+            :return: The payload of the test with a start token.
+        """
+
+        plan = get_compiled_test(self.kwargs['pk'])
+        key = f'smart_test:test_payload:{plan.id}:{plan.version}'
+
+        data = cache.get(key)
+        if data is None:
+            test = self.get_object()
+            test.plan_version = plan.version
+            data = self.get_serializer(test).data
+            cache.set(key, data, timeout=PLAN_CACHE_TIMEOUT)
+
+        return Response({**data, 'start_token': issue_start_token(request.user, plan)})
+
+
+class TestSubmitView(APIView):
+    """
+        Endpoint accepting all answers of a test at once. The answers are scored server-side against the compiled test plan
+        and stored as a finished run with its answer log in one transaction. The time spent on the test is measured from
+        the start token of the payload, see TestPayloadView.
+
+        Methods:
+            post(request, pk):
+                Validates the submission with TestSubmissionSerializer and returns the created result with status 201,
+                or 409 if the submission was made for an outdated version of the test.
+    """
+
+    throttle_classes = [UserRateThrottle, AnonRateThrottle]
+
+    def post(self, request, pk):
+        plan = get_compiled_test(pk)
+        if not plan.questions:
+            raise NotFound('Test not found')
+
+        serializer = TestSubmissionSerializer(data=request.data, context={'plan': plan, 'user': request.user})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if data.get('version', plan.version) != plan.version:
+            return Response({'detail': 'The test has changed, please reload it.'}, status=status.HTTP_409_CONFLICT)
+
+        test_result = submit_test(
+            user=request.user,
+            plan=plan,
+            selections={answer['question']: answer['selected'] for answer in data['answers']},
+            started_at=data['started_at'],
+            latencies={answer['question']: answer['latency'] for answer in data['answers'] if 'latency' in answer},
+        )
+
+        return Response(TestResultSerializer(test_result).data, status=status.HTTP_201_CREATED)
+
+
+class QuestionBankImportView(APIView):
+    """
+        Endpoint importing tests with their questions and answers from an uploaded question bank (JSON lines, GIFT or Moodle
+        XML). The file is parsed as a stream and every test is saved with batched inserts in its own transaction; invalid
+        tests are skipped and listed in the response.
+
+        Attributes:
+            permission_classes (list): Only staff users may import tests.
+            parser_classes (list): The question bank is uploaded as multipart form data.
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        serializer = QuestionBankImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        import_format = data.get('format') or guess_format(data['file'].name)
+        if import_format is None:
+            raise ValidationError({'format': 'Cannot guess the format of the question bank.'})
+
+        report = import_question_bank(
+            parse_question_bank(data['file'], import_format, data.get('title')),
+            topic=data.get('topic'),
+            dry_run=data['dry_run'],
+        )
+
+        response_status = status.HTTP_200_OK if data['dry_run'] or not report.tests else status.HTTP_201_CREATED
+        return Response(ImportReportSerializer(report).data, status=response_status)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SmartTestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'smart_test'
+
+    def ready(self):
+        import smart_test.signals # noqa
@@ -0,0 +1,60 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from smart_test.models import TestResult, TestResultArchive
+
+
+logger = logging.getLogger('smart_test')
+
+
+def archive_finished_test_results(archive_after=None, chunk_size=None):
+    """
+        Moves finished test runs into the TestResultArchive table. Each chunk of runs is written with one bulk_create and
+        deleted, together with its answer log, in the same transaction, so a run is never lost or archived twice.
+
+        The statistics of the tests are not changed: TestStats already counts the runs, and rebuild_stats() takes the archive
+        into account.
+
+        :param archive_after: Age (timedelta) after which a finished run is archived, SMART_TEST_ARCHIVE_AFTER or 90 days
+        by default.
+        :param chunk_size: Number of runs moved per transaction, SMART_TEST_ARCHIVE_CHUNK_SIZE or 1000 by default.
+        :return: The number of archived runs.
+    """
+
+    if archive_after is None:
+        archive_after = getattr(settings, 'SMART_TEST_ARCHIVE_AFTER', datetime.timedelta(days=90))
+    chunk_size = chunk_size or getattr(settings, 'SMART_TEST_ARCHIVE_CHUNK_SIZE', 1000)
+
+    finished = TestResult.objects.filter(state=TestResult.STATE.FINISHED, write_date__lte=timezone.now() - archive_after)
+    archived = 0
+
+    while True:
+        with transaction.atomic():
+            rows = list(finished.order_by('pk').values_list(
+                'pk', 'user_id', 'test_id', 'num_correct_answers', 'num_incorrect_answers', 'create_date', 'write_date'
+            )[:chunk_size])
+            if not rows:
+                break
+
+            TestResultArchive.objects.bulk_create([
+                TestResultArchive(
+                    user_id=user_id,
+                    test_id=test_id,
+                    points=num_correct_answers - num_incorrect_answers,
+                    duration=write_date - create_date,
+                    finished_at=write_date,
+                )
+                for _, user_id, test_id, num_correct_answers, num_incorrect_answers, create_date, write_date in rows
+            ])
+            TestResult.objects.filter(pk__in=[row[0] for row in rows]).delete()
+
+        archived += len(rows)
+        logger.info(f'Archived {archived} finished test results so far')
+        if len(rows) < chunk_size:
+            break
+
+    return archived
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from smart_test.models import TestResult
+
+
+STATE_TIMEOUT = 7 * 24 * 3600
+CLAIM_TIMEOUT = 30
+
+
+def enabled():
+    """
+        :return: True if the progress of test runs is kept in the cache and written to the database behind, see
+        SMART_TEST_WRITE_BEHIND.
+    """
+
+    return getattr(settings, 'SMART_TEST_WRITE_BEHIND', False)
+
+
+def _cache():
+    return caches[getattr(settings, 'SMART_TEST_ATTEMPT_STATE_CACHE', 'default')]
+
+
+def _key(test_result):
+    # The creation time keeps the key unique even where the database reuses the primary keys of deleted rows.
+    return f'smart_test:attempt_state:{test_result.pk}:{test_result.create_date.timestamp():.6f}'
+
+
+def apply(test_result):
+    """
+        Overlays the progress kept in the cache onto a TestResult loaded from the database.
+
+        :param test_result: A NEW TestResult.
+        :return: The same TestResult.
+    """
+
+    state = _cache().get(_key(test_result))
+    if state is not None:
+        (test_result.current_order_number, test_result.num_correct_answers,
+         test_result.num_incorrect_answers, test_result.write_date) = state
+    return test_result
+
+
+def claim(test_result):
+    """
+        Claims the answer to the current question of a run. Only the first of several parallel submissions of the same
+        question gets the claim; the claim expires after CLAIM_TIMEOUT seconds in case its request fails.
+
+        :param test_result: A NEW TestResult with the cached progress applied.
+        :return: True if the answer may be applied.
+    """
+
+    return _cache().add(f'{_key(test_result)}:{test_result.current_order_number}', 1, timeout=CLAIM_TIMEOUT)
+
+
+def save(test_result):
+    """
+        Stores the progress of a run in the cache instead of the database.
+
+        :param test_result: A NEW TestResult.
+        :return: None
+    """
+
+    state = (test_result.current_order_number, test_result.num_correct_answers,
+             test_result.num_incorrect_answers, test_result.write_date)
+    _cache().set(_key(test_result), state, timeout=STATE_TIMEOUT)
+
+
+def discard(test_result):
+    """
+        Drops the cached progress of a run once it has been persisted as finished.
+
+        :param test_result: The TestResult.
+        :return: None
+    """
+
+    _cache().delete(_key(test_result))
+
+
+def checkpoint(batch_size=500):
+    """
+        Writes the cached progress of all NEW runs to the database with bulk_update, so that it survives a cache restart.
+
+        :param batch_size: Number of runs loaded and updated at once.
+        :return: The number of updated runs.
+    """
+
+    state_cache = _cache()
+    updated = 0
+    last_pk = 0
+
+    while True:
+        test_results = list(
+            TestResult.objects.filter(state=TestResult.STATE.NEW, pk__gt=last_pk).order_by('pk').only(
+                'pk', 'create_date', 'current_order_number', 'num_correct_answers', 'num_incorrect_answers', 'write_date')[:batch_size]
+        )
+        if not test_results:
+            return updated
+        last_pk = test_results[-1].pk
+
+        states = state_cache.get_many([_key(test_result) for test_result in test_results])
+        changed = []
+        for test_result in test_results:
+            state = states.get(_key(test_result))
+            if state is None or state[0] == test_result.current_order_number:
+                continue
+            (test_result.current_order_number, test_result.num_correct_answers,
+             test_result.num_incorrect_answers, test_result.write_date) = state
+            changed.append(test_result)
+
+        if changed:
+            updated += TestResult.objects.filter(state=TestResult.STATE.NEW).bulk_update(
+                changed, ['current_order_number', 'num_correct_answers', 'num_incorrect_answers', 'write_date'])
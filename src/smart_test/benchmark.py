@@ -0,0 +1,280 @@
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from faker import Faker
+
+from accounts.models import User
+from smart_test.cache import get_compiled_test
+from smart_test.models import Test, Question, Answer, TestResult
+
+
+BENCHMARK_PREFIX = 'benchmark_'
+BENCHMARK_VIEWS = ('start', 'question', 'answer', 'finish')
+
+
+def seed_benchmark_data(num_users, num_tests, num_questions=10, num_answers=4, seed=None):
+    """
+        Creates users and tests for a benchmark run with Faker. The usernames and test titles start with BENCHMARK_PREFIX,
+        so that the data can be told apart from real data and removed by cleanup_benchmark_data().
+
+        :param num_users: Number of users taking the tests.
+        :param num_tests: Number of tests.
+        :param num_questions: Number of questions per test, within the limits of Test.
+        :param num_answers: Number of answers per question, within the limits of Question.
+        :param seed: Optional seed of Faker and of the random choices, for repeatable runs.
+        :return: A tuple (users, tests).
+    """
+
+    fake = Faker()
+    if seed is not None:
+        Faker.seed(seed)
+    rng = random.Random(seed)
+
+    password = make_password(None)
+    with transaction.atomic():
+        users = [
+            User.objects.create(
+                username=f'{BENCHMARK_PREFIX}{index}_{fake.user_name()}'[:150],
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                email=fake.email(),
+                school=fake.company()[:255],
+                password=password,
+            )
+            for index in range(num_users)
+        ]
+
+        tests = []
+        for index in range(num_tests):
+            test = Test.objects.create(title=f'{BENCHMARK_PREFIX}{index} {fake.catch_phrase()}'[:128], description=fake.text(200))
+            for order_number in range(1, num_questions + 1):
+                question = Question.objects.create(test=test, order_number=order_number, text=fake.sentence()[:512])
+                correct = rng.randrange(num_answers)
+                for answer_index in range(num_answers):
+                    Answer.objects.create(question=question, text=fake.word()[:128], is_correct=answer_index == correct)
+            tests.append(test)
+
+    return users, tests
+
+
+def cleanup_benchmark_data():
+    """
+        Deletes the users and tests created by seed_benchmark_data(), with their test runs.
+
+        :return: None
+    """
+
+    with transaction.atomic():
+        Test.objects.filter(title__startswith=BENCHMARK_PREFIX).delete()
+        User.objects.filter(username__startswith=BENCHMARK_PREFIX).delete()
+
+
+def percentile(values, percent):
+    """
+        :param values: A sorted list of numbers.
+        :param percent: The percentile, between 0 and 100.
+        :return: The nearest-rank percentile of the values, or None for an empty list.
+    """
+
+    if not values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+class BenchmarkRecorder:
+    """
+        Thread-safe collection of the latencies and query counts of the requests made during a benchmark, grouped by view.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {view: [] for view in BENCHMARK_VIEWS}
+        self.errors = {view: 0 for view in BENCHMARK_VIEWS}
+
+    def request(self, view, method, *args, **kwargs):
+        """
+            Sends a request with the given client method and records its latency and the number of database queries it made.
+
+            :param view: The name the request is reported under, one of BENCHMARK_VIEWS.
+            :param method: A bound method of a test Client, e.g. client.get.
+            :return: The response, or None if the request raised an exception.
+        """
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            try:
+                response = method(*args, **kwargs)
+            except Exception:
+                response = None
+            latency = time.perf_counter() - started
+
+        with self.lock:
+            if response is None or response.status_code >= 400:
+                self.errors[view] += 1
+            else:
+                self.samples[view].append((latency, len(queries)))
+        return response
+
+    def error(self, view):
+        """
+            Counts an error of a view that was not a failed request, e.g. a rejected answer.
+
+            :param view: One of BENCHMARK_VIEWS.
+            :return: None
+        """
+
+        with self.lock:
+            self.errors[view] += 1
+
+    def report(self, wall_time):
+        """
+            :param wall_time: Duration of the whole benchmark in seconds.
+            :return: A dictionary mapping view names to their request count, errors, requests per second, latency percentiles
+            in milliseconds and average number of queries.
+        """
+
+        views = {}
+        for view, samples in self.samples.items():
+            latencies = sorted(latency * 1000 for latency, _ in samples)
+            views[view] = {
+                'requests': len(samples),
+                'errors': self.errors[view],
+                'rps': round(len(samples) / wall_time, 2) if wall_time else None,
+                'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+                'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+                'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+                'queries': round(sum(count for _, count in samples) / len(samples), 2) if samples else None,
+            }
+        return views
+
+
+def take_test(recorder, user, test_id, accuracy=0.7, rng=None):
+    """
+        Takes a test like a browser would: starts it, then loads and answers every question until the finish page. A run
+        that is not finished in the end, e.g. because an answer was rejected, is counted as an error of the finish view.
+
+        :param recorder: The BenchmarkRecorder.
+        :param user: The user taking the test.
+        :param test_id: The identifier of the test.
+        :param accuracy: Probability of answering a question correctly.
+        :param rng: Optional random.Random instance.
+        :return: True if the run was finished.
+    """
+
+    rng = rng or random.Random()
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(user)
+    plan = get_compiled_test(test_id)
+
+    try:
+        recorder.request('start', client.get, reverse('tests:start', kwargs={'id': test_id}))
+        for question in plan.questions:
+            url = reverse('tests:next', kwargs={'id': test_id})
+            recorder.request('question', client.get, url)
+
+            answer_count = len(question.answer_ids)
+            mask = question.correct_mask
+            if rng.random() > accuracy or mask == 0:
+                mask = rng.randrange(1, (1 << answer_count) - 1)
+            data = {
+                'form-TOTAL_FORMS': str(answer_count),
+                'form-INITIAL_FORMS': str(answer_count),
+                'form-MIN_NUM_FORMS': '0',
+                'form-MAX_NUM_FORMS': '1000',
+            }
+            # The page identifies the answers by id, the bits of the mask follow the order of answer_ids.
+            data.update({f'form-{index}-id': str(answer_id) for index, answer_id in enumerate(question.answer_ids)})
+            data.update({f'form-{index}-is_selected': 'on' for index in range(answer_count) if mask & (1 << index)})
+
+            view = 'finish' if question.order_number == plan.question_count else 'answer'
+            recorder.request(view, client.post, url, data)
+
+        finished = not TestResult.objects.filter(user=user, test_id=test_id, state=TestResult.STATE.NEW).exists()
+        if not finished:
+            recorder.error('finish')
+        return finished
+    finally:
+        connection.close()
+
+
+def run_benchmark(users, tests, concurrency=4, runs_per_user=1, accuracy=0.7, seed=None):
+    """
+        Lets the users take the tests from a pool of threads, each thread acting as one browser at a time.
+
+        :param users: The users taking the tests.
+        :param tests: The tests, every user takes them in turn.
+        :param concurrency: Number of simultaneous takers.
+        :param runs_per_user: Number of tests taken by every user.
+        :param accuracy: Probability of answering a question correctly.
+        :param seed: Optional seed of the random choices.
+        :return: A dictionary with the settings of the run, its wall time and the report of BenchmarkRecorder.report().
+    """
+
+    recorder = BenchmarkRecorder()
+    rng = random.Random(seed)
+    jobs = [
+        (user, tests[(index + run) % len(tests)].id, random.Random(rng.random()))
+        for run in range(runs_per_user)
+        for index, user in enumerate(users)
+    ]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(take_test, recorder, user, test_id, accuracy, job_rng) for user, test_id, job_rng in jobs]:
+            future.result()
+    wall_time = time.perf_counter() - started
+
+    return {
+        'settings': {
+            'users': len(users),
+            'tests': len(tests),
+            'concurrency': concurrency,
+            'runs_per_user': runs_per_user,
+            'database': connection.vendor,
+        },
+        'wall_time_s': round(wall_time, 3),
+        'views': recorder.report(wall_time),
+    }
+
+
+def compare_with_baseline(result, baseline, max_regression=20):
+    """
+        Compares the results of a benchmark with a stored baseline.
+
+        :param result: The dictionary returned by run_benchmark().
+        :param baseline: A dictionary returned by run_benchmark() for an earlier version.
+        :param max_regression: Allowed increase of the p95 latency in percent. Any increase of the number of queries per
+        request is a regression.
+        :return: A list of messages describing the regressions, empty if there are none.
+    """
+
+    regressions = []
+    for view, current in result['views'].items():
+        previous = baseline.get('views', {}).get(view)
+        if not previous or not current['requests']:
+            continue
+
+        if previous.get('queries') is not None and current['queries'] > previous['queries']:
+            regressions.append(f'{view}: {current["queries"]} queries per request, baseline {previous["queries"]}')
+
+        if previous.get('p95_ms') and current['p95_ms'] > previous['p95_ms'] * (1 + max_regression / 100):
+            regressions.append(f'{view}: p95 latency {current["p95_ms"]} ms, baseline {previous["p95_ms"]} ms')
+
+    return regressions
+
+
+def unfinished_runs():
+    """
+        :return: The number of NEW runs of benchmark users, i.e. runs that failed before they were finished.
+    """
+
+    return TestResult.objects.filter(user__username__startswith=BENCHMARK_PREFIX, state=TestResult.STATE.NEW).count()
@@ -0,0 +1,82 @@
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from smart_test.models import AnswerLog
+
+
+ANSWER_LOG_BUFFER_TIMEOUT = 7 * 24 * 3600
+
+
+class AnswerLogBuffer:
+    """
+        Buffers the AnswerLog rows of a single test run in the shared cache and writes them with one bulk_create.
+
+        The buffer is flushed when it holds ``batch_size`` rows or when the test run is finished, so answering a question
+        adds no INSERT of its own. Keeping the buffer in the shared cache rather than in process memory lets consecutive
+        answers of one run be served by different workers.
+
+        :param test_result: The test run the answers belong to.
+        :type test_result: TestResult
+        :param batch_size: Number of buffered rows that triggers a flush, SMART_TEST_ANSWER_LOG_BATCH_SIZE by default.
+        :type batch_size: int, optional
+    """
+
+    def __init__(self, test_result, batch_size=None):
+        self.test_result = test_result
+        self.batch_size = batch_size or getattr(settings, 'SMART_TEST_ANSWER_LOG_BATCH_SIZE', 10)
+        self.key = f'smart_test:answer_log:{test_result.pk}'
+
+    def _load(self):
+        return cache.get(self.key) or {'last': self.test_result.create_date, 'rows': []}
+
+    def add(self, question_id, selected_mask, is_correct):
+        """
+            :param question_id: The identifier of the answered question.
+            :param selected_mask: The bitmask of the selected answers.
+            :param is_correct: Whether the question was answered correctly.
+            :return: None
+        """
+
+        buffer = self._load()
+        now = timezone.now()
+        latency = (now - buffer['last']).total_seconds() if buffer['last'] else None
+        buffer['rows'].append((question_id, selected_mask, is_correct, latency, now))
+        buffer['last'] = now
+
+        if len(buffer['rows']) >= self.batch_size:
+            self._write(buffer['rows'])
+            buffer['rows'] = []
+
+        cache.set(self.key, buffer, timeout=ANSWER_LOG_BUFFER_TIMEOUT)
+
+    def flush(self):
+        """
+            Writes all buffered rows and drops the buffer. Called when the test run is finished.
+
+            :return: The number of written rows.
+        """
+
+        buffer = cache.get(self.key)
+        cache.delete(self.key)
+        if not buffer:
+            return 0
+        return self._write(buffer['rows'])
+
+    def _write(self, rows):
+        if not rows:
+            return 0
+        AnswerLog.objects.bulk_create([
+            AnswerLog(
+                test_result_id=self.test_result.pk,
+                question_id=question_id,
+                selected_mask=selected_mask,
+                is_correct=is_correct,
+                latency=datetime.timedelta(seconds=latency) if latency is not None else None,
+                answered_at=answered_at,
+            )
+            for question_id, selected_mask, is_correct, latency, answered_at in rows
+        ], batch_size=self.batch_size)
+        return len(rows)
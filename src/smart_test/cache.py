@@ -0,0 +1,180 @@
+import time
+from typing import NamedTuple
+
+from django.core.cache import cache
+
+from smart_test.models import Question
+
+
+PLAN_CACHE_TIMEOUT = 24 * 3600
+CATALOGUE_MODIFIED_KEY = 'smart_test:catalogue_modified'
+
+_local_plans = {}
+
+
+class CompiledQuestion(NamedTuple):
+    """
+        Immutable, query-free representation of a single question of a test.
+
+        Attributes:
+            id (int): Primary key of the question.
+            order_number (int): Position of the question inside the test.
+            answer_ids (tuple): Primary keys of the answers, ordered by id.
+            correct_mask (int): Bitmask where bit ``i`` is set if ``answer_ids[i]`` is a correct answer.
+    """
+
+    id: int
+    order_number: int
+    answer_ids: tuple
+    correct_mask: int
+
+
+class CompiledTest(NamedTuple):
+    """
+        Immutable, compact structure describing a whole test, used to run and score attempts without queries.
+
+        Attributes:
+            id (int): Primary key of the test.
+            version (int): Version of the plan, bumped every time the test, its questions or answers change.
+            questions (tuple): CompiledQuestion items ordered by order_number.
+    """
+
+    id: int
+    version: int
+    questions: tuple
+
+    @property
+    def question_count(self):
+        return len(self.questions)
+
+    def question(self, order_number):
+        """
+            :param order_number: The order number of the question within the test.
+            :return: The CompiledQuestion with the given order number.
+            :raises KeyError: If the test has no question with this order number.
+        """
+
+        for question in self.questions:
+            if question.order_number == order_number:
+                return question
+        raise KeyError(order_number)
+
+
+def _version_key(test_id):
+    return f'smart_test:test_plan_version:{test_id}'
+
+
+def _plan_key(test_id, version):
+    return f'smart_test:test_plan:{test_id}:{version}'
+
+
+def _current_version(test_id):
+    """
+        :param test_id: The identifier of the test.
+        :return: The current plan version from the shared cache. A missing version (first use or eviction) is initialised with the
+        current time in milliseconds, so it never collides with versions used before.
+    """
+
+    key = _version_key(test_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def compile_test(test_id, version):
+    """
+        Builds the CompiledTest for the given test with a single query.
+
+        :param test_id: The identifier of the test to compile.
+        :param version: The version number stored in the compiled plan.
+        :return: A CompiledTest instance.
+    """
+
+    rows = Question.objects.filter(test_id=test_id).order_by('order_number', 'id', 'answers__id').values_list(
+        'id', 'order_number', 'answers__id', 'answers__is_correct')
+
+    questions = []
+    current = None
+    answer_ids = []
+    correct_mask = 0
+    for question_id, order_number, answer_id, is_correct in rows:
+        if current is None or current[0] != question_id:
+            if current is not None:
+                questions.append(CompiledQuestion(current[0], current[1], tuple(answer_ids), correct_mask))
+            current = (question_id, order_number)
+            answer_ids = []
+            correct_mask = 0
+        if answer_id is not None:
+            if is_correct:
+                correct_mask |= 1 << len(answer_ids)
+            answer_ids.append(answer_id)
+    if current is not None:
+        questions.append(CompiledQuestion(current[0], current[1], tuple(answer_ids), correct_mask))
+
+    return CompiledTest(test_id, version, tuple(questions))
+
+
+def get_compiled_test(test_id):
+    """
+        Returns the compiled plan for a test. The plan is looked up in process memory first, then in the shared cache backend,
+        and is only compiled from the database when neither holds the current version.
+
+        :param test_id: The identifier of the test.
+        :return: A CompiledTest instance.
+    """
+
+    version = _current_version(test_id)
+
+    plan = _local_plans.get(test_id)
+    if plan is not None and plan.version == version:
+        return plan
+
+    plan = cache.get(_plan_key(test_id, version))
+    if plan is None:
+        plan = compile_test(test_id, version)
+        cache.set(_plan_key(test_id, version), plan, timeout=PLAN_CACHE_TIMEOUT)
+
+    _local_plans[test_id] = plan
+    return plan
+
+
+def invalidate_test(test_id):
+    """
+        Bumps the plan version of a test so that every process recompiles it on the next access.
+
+        :param test_id: The identifier of the test whose plan is outdated.
+        :return: None
+    """
+
+    _local_plans.pop(test_id, None)
+    key = _version_key(test_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def catalogue_last_modified():
+    """
+        :return: The time (seconds since the epoch) the test catalogue was last changed. A missing value (first use or
+        eviction) is initialised with the current time, so clients revalidate rather than keep stale data.
+    """
+
+    modified = cache.get(CATALOGUE_MODIFIED_KEY)
+    if modified is None:
+        cache.add(CATALOGUE_MODIFIED_KEY, int(time.time()), timeout=None)
+        modified = cache.get(CATALOGUE_MODIFIED_KEY)
+    return modified
+
+
+def invalidate_catalogue():
+    """
+        Marks the test catalogue as changed, so that cached catalogue pages are served again in full.
+
+        :return: None
+    """
+
+    modified = max(int(time.time()), (cache.get(CATALOGUE_MODIFIED_KEY) or 0) + 1)
+    cache.set(CATALOGUE_MODIFIED_KEY, modified, timeout=None)
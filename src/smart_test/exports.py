@@ -0,0 +1,140 @@
+import csv
+import datetime
+import json
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from smart_test.models import TestResult
+
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = (
+    'id', 'username', 'school', 'user_class', 'test_id', 'test', 'state', 'num_correct_answers', 'num_incorrect_answers',
+    'points', 'score', 'started_at', 'updated_at', 'duration',
+)
+
+
+class _Echo:
+    """
+        File-like object whose write() returns the written value, so that csv.writer produces lines to stream instead of
+        writing them to a buffer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _parse_moment(value, end=False):
+    """
+        :param value: A date (YYYY-MM-DD) or a date and time in ISO 8601 format.
+        :param end: Whether a bare date stands for the end of the day rather than its start.
+        :return: An aware datetime.
+        :raises ValueError: If the value is neither a date nor a date and time.
+    """
+
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        moment = datetime.datetime.combine(day, datetime.time.max if end else datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_test_results(test=None, topic=None, school=None, date_from=None, date_to=None):
+    """
+        Builds the queryset of test results to export. All filters are optional and combined.
+
+        :param test: Identifier of the test.
+        :param topic: Identifier of the topic of the tests.
+        :param school: School of the users, matched exactly.
+        :param date_from: Only results last updated at or after this date (string, see _parse_moment).
+        :param date_to: Only results last updated at or before this date, a bare date includes the whole day.
+        :return: A QuerySet of TestResult objects with their user and test, ordered by id.
+        :raises ValueError: If a date cannot be parsed.
+    """
+
+    test_results = TestResult.objects.select_related('user', 'test').order_by('id')
+    if test:
+        test_results = test_results.filter(test_id=test)
+    if topic:
+        test_results = test_results.filter(test__topic_id=topic)
+    if school:
+        test_results = test_results.filter(user__school=school)
+    if date_from:
+        test_results = test_results.filter(write_date__gte=_parse_moment(date_from))
+    if date_to:
+        test_results = test_results.filter(write_date__lte=_parse_moment(date_to, end=True))
+    return test_results
+
+
+def export_rows(test_results, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+        Iterates over the test results in chunks, so memory use does not grow with the number of rows.
+
+        :param test_results: A QuerySet from filter_test_results().
+        :param chunk_size: Number of rows fetched from the database at once.
+        :return: A generator of tuples with the values of EXPORT_FIELDS.
+    """
+
+    for test_result in test_results.iterator(chunk_size=chunk_size):
+        yield (
+            test_result.id,
+            test_result.user.username,
+            test_result.user.school,
+            test_result.user.user_class,
+            test_result.test_id,
+            test_result.test.title,
+            TestResult.STATE(test_result.state).label,
+            test_result.num_correct_answers,
+            test_result.num_incorrect_answers,
+            test_result.points(),
+            round(test_result.score(), 2) if test_result.test.question_count else 0,
+            test_result.create_date.isoformat(),
+            test_result.write_date.isoformat(),
+            (test_result.write_date - test_result.create_date).total_seconds(),
+        )
+
+
+def stream_csv(test_results, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+        :param test_results: A QuerySet from filter_test_results().
+        :param chunk_size: Number of rows fetched from the database at once.
+        :return: A generator of CSV lines, starting with the header.
+    """
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in export_rows(test_results, chunk_size):
+        yield writer.writerow(row)
+
+
+def stream_ndjson(test_results, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+        :param test_results: A QuerySet from filter_test_results().
+        :param chunk_size: Number of rows fetched from the database at once.
+        :return: A generator of lines, each a JSON object with the EXPORT_FIELDS keys.
+    """
+
+    for row in export_rows(test_results, chunk_size):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + '\n'
+
+
+def stream_export(test_results, export_format='csv', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+        :param test_results: A QuerySet from filter_test_results().
+        :param export_format: One of EXPORT_FORMATS.
+        :param chunk_size: Number of rows fetched from the database at once.
+        :return: A generator of lines in the requested format.
+        :raises ValueError: If the format is not supported.
+    """
+
+    if export_format == 'csv':
+        return stream_csv(test_results, chunk_size)
+    if export_format == 'ndjson':
+        return stream_ndjson(test_results, chunk_size)
+    raise ValueError(f'Unsupported export format: {export_format}')
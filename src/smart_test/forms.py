@@ -2,7 +2,7 @@ from django.forms import BaseInlineFormSet, modelformset_factory, inlineformset_
 from django.core.exceptions import ValidationError
 from django import forms
 
-from smart_test.models import Answer, Test, Question
+from smart_test.models import Answer, Test, Question, Topic
 
 
 class TestForm(forms.ModelForm):
@@ -22,6 +22,25 @@ class TestForm(forms.ModelForm):
         fields = ['title', 'description', 'topic', 'level', 'image']
 
 
+class TestSearchForm(forms.Form):
+    """
+        Search and filter form of the test catalogue, used by the list page and the catalogue API, see
+        smart_test.search.filter_catalogue.
+
+        Fields:
+            search: Words to search in the title, description and topic of the tests.
+            level: One of Test.LEVEL_CHOICES.
+            topic: The topic of the tests.
+    """
+
+    search = forms.CharField(max_length=128, required=False,
+                             widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Search tests'}))
+    level = forms.TypedChoiceField(choices=[('', 'Any level')] + Test.LEVEL_CHOICES.choices, coerce=int, empty_value=None,
+                                   required=False, widget=forms.Select(attrs={'class': 'form-select'}))
+    topic = forms.ModelChoiceField(queryset=Topic.objects.order_by('name'), empty_label='Any topic', required=False,
+                                   widget=forms.Select(attrs={'class': 'form-select'}))
+
+
 class QuestionForm(forms.ModelForm):
     """
         QuestionForm is a ModelForm representing the Question model. It provides form fields corresponding to the model's `order_number` and `text` attributes.
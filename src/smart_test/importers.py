@@ -0,0 +1,447 @@
+import html
+import json
+import re
+import xml.etree.ElementTree as ElementTree
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.html import strip_tags
+
+from smart_test.models import Test, Question, Answer, Topic
+
+
+IMPORT_FORMATS = ('jsonl', 'gift', 'xml')
+
+
+class ImportedAnswer(NamedTuple):
+    text: str
+    is_correct: bool
+
+
+class ImportedQuestion(NamedTuple):
+    text: str
+    answers: tuple
+
+
+class ImportedTest(NamedTuple):
+    """
+        A test read from a question bank, before it is validated and saved.
+
+        Attributes:
+            title (str): Title of the test.
+            questions (tuple): ImportedQuestion items in their order within the test.
+            description (str): Optional description of the test.
+            topic (str): Optional name of the topic of the test.
+            level: Optional level of the test, a Test.LEVEL_CHOICES value or label.
+            source (str): Position of the test in the source, used in error messages.
+            errors (tuple): Errors found while parsing the test.
+    """
+
+    title: Optional[str]
+    questions: tuple
+    description: Optional[str] = None
+    topic: Optional[str] = None
+    level: object = None
+    source: str = ''
+    errors: tuple = ()
+
+
+class ImportReport(NamedTuple):
+    """
+        Outcome of an import.
+
+        Attributes:
+            tests (int): Number of imported tests.
+            questions (int): Number of imported questions.
+            answers (int): Number of imported answers.
+            errors (list): (source, message) pairs of the rejected tests.
+    """
+
+    tests: int
+    questions: int
+    answers: int
+    errors: list
+
+
+def parse_jsonl(stream):
+    """
+        Reads one test per line, as a JSON object like
+        ``{"title": ..., "description": ..., "topic": ..., "level": ..., "questions": [{"text": ..., "answers": [{"text": ...,
+        "is_correct": true}, ...]}, ...]}``.
+
+        :param stream: A text stream or an iterable of lines.
+        :return: A generator of ImportedTest items.
+    """
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+
+        source = f'line {line_number}'
+        try:
+            data = json.loads(line)
+            questions = tuple(
+                ImportedQuestion(question['text'], tuple(
+                    ImportedAnswer(answer['text'], bool(answer.get('is_correct')))
+                    for answer in question['answers']
+                ))
+                for question in data.get('questions', ())
+            )
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            yield ImportedTest(None, (), source=source, errors=(f'Malformed test: {error!r}', ))
+            continue
+
+        yield ImportedTest(data.get('title'), questions, data.get('description'), data.get('topic'), data.get('level'), source)
+
+
+_GIFT_ANSWER = re.compile(r'(?<!\\)([=~])')
+_GIFT_WEIGHT = re.compile(r'^%(-?[\d.]+)%')
+_GIFT_ESCAPE = re.compile(r'\\([~=#{}:])')
+
+
+def _gift_text(text):
+    return _GIFT_ESCAPE.sub(r'\1', text).strip()
+
+
+def _parse_gift_question(block):
+    """
+        :param block: A GIFT question such as ``::Name:: Question text {=right ~wrong ~%50%partially right}``.
+        :return: An ImportedQuestion. Answers with a positive weight count as correct ones.
+        :raises ValueError: If the block has no answer list or an answer weight is not a number.
+    """
+
+    match = re.match(r'^(?:::(?P<name>.*?)::)?(?P<text>.*?)(?<!\\)\{(?P<answers>.*)(?<!\\)\}\s*$', block, re.DOTALL)
+    if match is None:
+        raise ValueError('missing answer list')
+
+    text = re.sub(r'^\[\w+\]', '', match.group('text').strip())
+    answers = []
+    parts = _GIFT_ANSWER.split(match.group('answers'))
+    for mark, answer in zip(parts[1::2], parts[2::2]):
+        answer = re.split(r'(?<!\\)#', answer, maxsplit=1)[0].strip()
+        weight = _GIFT_WEIGHT.match(answer)
+        if weight:
+            answer = answer[weight.end():]
+        try:
+            is_correct = mark == '=' or (weight is not None and float(weight.group(1)) > 0)
+        except ValueError:
+            raise ValueError(f'invalid answer weight {weight.group(1)!r}') from None
+        answers.append(ImportedAnswer(_gift_text(answer), is_correct))
+
+    return ImportedQuestion(_gift_text(text) or _gift_text(match.group('name') or ''), tuple(answers))
+
+
+def parse_gift(stream, title=None):
+    """
+        Reads a question bank in the GIFT format. Every ``$CATEGORY:`` line starts a new test named after the last part of
+        the category path, questions before the first category belong to a test called ``title``.
+
+        :param stream: A text stream or an iterable of lines.
+        :param title: Title of the test for questions outside of a category.
+        :return: A generator of ImportedTest items.
+    """
+
+    current = {'title': title, 'source': 'line 1', 'questions': [], 'errors': []}
+    block = []
+
+    def close_block(line_number):
+        if not block:
+            return
+        try:
+            current['questions'].append(_parse_gift_question('\n'.join(block)))
+        except ValueError as error:
+            current['errors'].append(f'Question before line {line_number}: {error}')
+        block.clear()
+
+    def finish():
+        if current['questions'] or current['errors']:
+            return ImportedTest(current['title'], tuple(current['questions']), source=current['source'],
+                                errors=tuple(current['errors']))
+        return None
+
+    line_number = 0
+    for line_number, line in enumerate(stream, start=1):
+        line = line.rstrip('\n')
+        stripped = line.strip()
+
+        if stripped.startswith('//'):
+            continue
+
+        if stripped.startswith('$CATEGORY:'):
+            close_block(line_number)
+            test = finish()
+            if test:
+                yield test
+            category = stripped[len('$CATEGORY:'):].strip().rstrip('/')
+            current = {'title': category.rsplit('/', 1)[-1] or title, 'source': f'line {line_number}', 'questions': [], 'errors': []}
+            continue
+
+        if not stripped:
+            close_block(line_number)
+            continue
+
+        block.append(line)
+
+    close_block(line_number + 1)
+    test = finish()
+    if test:
+        yield test
+
+
+def _xml_text(element, path):
+    node = element.find(path)
+    if node is None or node.text is None:
+        return ''
+    text = node.text
+    format_node = element.find(path.rsplit('/', 1)[0]) if '/' in path else element
+    if format_node is not None and format_node.get('format', 'html') == 'html':
+        text = html.unescape(strip_tags(text))
+    return text.strip()
+
+
+def parse_moodle_xml(stream, title=None):
+    """
+        Reads a question bank in the Moodle XML format with iterparse, so that only one question is held in memory at a
+        time. Every category question starts a new test named after the last part of the category path, multiple choice
+        questions before the first category belong to a test called ``title``. Answers with a positive fraction count as
+        correct ones, questions of other types are reported as errors.
+
+        :param stream: A binary stream.
+        :param title: Title of the test for questions outside of a category.
+        :return: A generator of ImportedTest items.
+    """
+
+    current = {'title': title, 'description': None, 'source': 'question 1', 'questions': [], 'errors': []}
+    root = None
+    position = 0
+
+    def finish():
+        if current['questions'] or current['errors']:
+            return ImportedTest(current['title'], tuple(current['questions']), current['description'],
+                                source=current['source'], errors=tuple(current['errors']))
+        return None
+
+    try:
+        for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+            if root is None:
+                root = element
+            if event != 'end' or element.tag != 'question':
+                continue
+
+            position += 1
+            question_type = element.get('type')
+            if question_type == 'category':
+                test = finish()
+                if test:
+                    yield test
+                category = _xml_text(element, 'category/text').rstrip('/')
+                category = category.split('$', 2)[-1].lstrip('/') if category.startswith('$') else category
+                current = {
+                    'title': category.rsplit('/', 1)[-1] or title,
+                    'description': _xml_text(element, 'info/text') or None,
+                    'source': f'question {position}',
+                    'questions': [],
+                    'errors': [],
+                }
+            elif question_type == 'multichoice':
+                try:
+                    answers = tuple(
+                        ImportedAnswer(_xml_text(answer, 'text'), float(answer.get('fraction', 0)) > 0)
+                        for answer in element.iterfind('answer')
+                    )
+                except ValueError as error:
+                    current['errors'].append(f'Question {position}: invalid answer fraction ({error})')
+                else:
+                    text = _xml_text(element, 'questiontext/text') or _xml_text(element, 'name/text')
+                    current['questions'].append(ImportedQuestion(text, answers))
+            else:
+                current['errors'].append(f'Question {position}: unsupported type {question_type!r}')
+
+            root.clear()
+    except ElementTree.ParseError as error:
+        current['errors'].append(f'Malformed XML: {error}')
+
+    test = finish()
+    if test:
+        yield test
+
+
+def guess_format(filename):
+    """
+        :param filename: Name of a question bank file.
+        :return: The import format matching the extension of the file, or None.
+    """
+
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return {'jsonl': 'jsonl', 'ndjson': 'jsonl', 'gift': 'gift', 'txt': 'gift', 'xml': 'xml'}.get(extension)
+
+
+def parse_question_bank(stream, import_format, title=None):
+    """
+        :param stream: A binary stream with the question bank.
+        :param import_format: One of IMPORT_FORMATS.
+        :param title: Title of the test for questions outside of a category (GIFT and Moodle XML).
+        :return: A generator of ImportedTest items.
+        :raises ValueError: If the format is not supported.
+    """
+
+    if import_format == 'xml':
+        return parse_moodle_xml(stream, title)
+
+    lines = (line.decode('utf-8-sig') if isinstance(line, bytes) else line for line in stream)
+    if import_format == 'jsonl':
+        return parse_jsonl(lines)
+    if import_format == 'gift':
+        return parse_gift(lines, title)
+    raise ValueError(f'Unsupported import format: {import_format}')
+
+
+def _level(value):
+    if value in (None, ''):
+        return Test.LEVEL_CHOICES.MIDDLE
+    for choice in Test.LEVEL_CHOICES:
+        if value == choice.value or str(value).lower() in (str(choice.value), choice.label.lower()):
+            return choice.value
+    raise ValueError(f'Unknown level {value!r}')
+
+
+def validate_test(imported):
+    """
+        Checks an imported test against the rules enforced when tests are edited: the number of questions (see
+        QuestionsInlineFormSet), the number of answers and at least one but not all answers being correct (see
+        AnswerInlineFormSet), and the types and lengths of the text fields. JSON lines may hold values of any type, they
+        are reported here instead of failing when the test is saved.
+
+        :param imported: An ImportedTest.
+        :return: A list of error messages, empty for a valid test.
+    """
+
+    errors = list(imported.errors)
+    if imported.errors:
+        return errors
+
+    if not imported.title:
+        errors.append('Test has no title')
+    elif not isinstance(imported.title, str):
+        errors.append('Title must be a string')
+    elif len(imported.title) > Test._meta.get_field('title').max_length:
+        errors.append('Title is too long')
+
+    for name in ('description', 'topic'):
+        if not isinstance(getattr(imported, name), (str, type(None))):
+            errors.append(f'{name.capitalize()} must be a string')
+
+    if not (Test.QUESTION_MIN_LIMIT <= len(imported.questions) <= Test.QUESTION_MAX_LIMIT):
+        errors.append(f'Quantity of Question is out of range ({Test.QUESTION_MIN_LIMIT}..{Test.QUESTION_MAX_LIMIT})')
+
+    try:
+        _level(imported.level)
+    except ValueError as error:
+        errors.append(str(error))
+
+    question_length = Question._meta.get_field('text').max_length
+    answer_length = Answer._meta.get_field('text').max_length
+    for order_number, question in enumerate(imported.questions, start=1):
+        prefix = f'Question {order_number}'
+        if not isinstance(question.text, str):
+            errors.append(f'{prefix}: text must be a string')
+        elif not question.text or len(question.text) > question_length:
+            errors.append(f'{prefix}: text is empty or too long')
+        if not isinstance(question.answers, (list, tuple)):
+            errors.append(f'{prefix}: answers must be a list')
+            continue
+        if not (Question.ANSWER_MIN_LIMIT <= len(question.answers) <= Question.ANSWER_MAX_LIMIT):
+            errors.append(f'{prefix}: quantity of Answer is out of range ({Question.ANSWER_MIN_LIMIT}..{Question.ANSWER_MAX_LIMIT})')
+        if any(not isinstance(answer.text, str) for answer in question.answers):
+            errors.append(f'{prefix}: answer text must be a string')
+        elif any(not answer.text or len(answer.text) > answer_length for answer in question.answers):
+            errors.append(f'{prefix}: answer text is empty or too long')
+
+        num_correct_answers = sum(1 for answer in question.answers if answer.is_correct)
+        if num_correct_answers == 0:
+            errors.append(f'{prefix}: at LEAST one answer must be correct')
+        elif num_correct_answers == len(question.answers):
+            errors.append(f'{prefix}: not allowed to select ALL answers')
+
+    return errors
+
+
+def _save_test(imported, topic, batch_size):
+    """
+        Saves a validated test with one INSERT for the test and batched INSERTs for its questions and answers, inside the
+        transaction of the caller. bulk_create() sends no signals, so the counters of the test are set directly; the plan
+        and catalogue invalidation scheduled by the post_save signal of the test runs once the transaction is committed.
+
+        :return: A (questions, answers) tuple with the number of saved rows.
+    """
+
+    test = Test.objects.create(
+        title=imported.title,
+        description=imported.description,
+        topic=topic,
+        level=_level(imported.level),
+    )
+
+    questions = Question.objects.bulk_create([
+        Question(test=test, order_number=order_number, text=question.text)
+        for order_number, question in enumerate(imported.questions, start=1)
+    ], batch_size=batch_size)
+
+    if any(question.pk is None for question in questions):
+        # Backends that cannot return the primary keys of bulk inserted rows.
+        questions = list(Question.objects.filter(test=test).order_by('order_number'))
+
+    answers = Answer.objects.bulk_create([
+        Answer(question=question, text=answer.text, is_correct=answer.is_correct)
+        for question, imported_question in zip(questions, imported.questions)
+        for answer in imported_question.answers
+    ], batch_size=batch_size)
+
+    Test.objects.filter(pk=test.pk).update(question_count=len(questions), answer_count=len(answers))
+    return len(questions), len(answers)
+
+
+def import_question_bank(tests, topic=None, dry_run=False, batch_size=None):
+    """
+        Validates and saves imported tests, each in its own transaction, so that an invalid test is reported and skipped
+        without losing the others.
+
+        :param tests: An iterable of ImportedTest items, e.g. from parse_question_bank().
+        :param topic: Optional Topic for tests that do not name their own topic.
+        :param dry_run: Only validate the tests, without saving them.
+        :param batch_size: Number of rows per INSERT, SMART_TEST_IMPORT_BATCH_SIZE or 1000 by default.
+        :return: An ImportReport.
+    """
+
+    batch_size = batch_size or getattr(settings, 'SMART_TEST_IMPORT_BATCH_SIZE', 1000)
+    topics = {}
+    created_tests = created_questions = created_answers = 0
+    errors = []
+
+    for imported in tests:
+        test_errors = validate_test(imported)
+        if test_errors:
+            errors.extend((imported.source, error) for error in test_errors)
+            continue
+
+        if dry_run:
+            created_tests += 1
+            created_questions += len(imported.questions)
+            created_answers += sum(len(question.answers) for question in imported.questions)
+            continue
+
+        test_topic = topic
+        if imported.topic:
+            if imported.topic not in topics:
+                topics[imported.topic] = Topic.objects.filter(name=imported.topic).first() or Topic.objects.create(name=imported.topic)
+            test_topic = topics[imported.topic]
+
+        with transaction.atomic():
+            num_questions, num_answers = _save_test(imported, test_topic, batch_size)
+        created_tests += 1
+        created_questions += num_questions
+        created_answers += num_answers
+
+    return ImportReport(created_tests, created_questions, created_answers, errors)
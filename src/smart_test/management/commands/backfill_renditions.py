@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import Profile
+from core.renditions import backfill_renditions
+from smart_test.cache import invalidate_catalogue
+from smart_test.models import Test
+
+
+class Command(BaseCommand):
+    """
+        Management command that generates the missing or outdated renditions of existing test covers and profile pictures
+        (see core.renditions), in batches.
+
+        Options:
+            --only: Limit the backfill to 'tests' or 'profiles'.
+            --batch-size: Rows read and updated at once.
+            --force: Regenerate current renditions as well, e.g. after RENDITION_QUALITY or the sizes changed.
+    """
+
+    help = 'Generates the resized variants of existing test covers and profile pictures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=('tests', 'profiles'), help='Only backfill tests or profiles.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per batch.')
+        parser.add_argument('--force', action='store_true', help='Regenerate current renditions as well.')
+
+    def handle(self, *args, **options):
+        if options['only'] in (None, 'tests'):
+            updated = backfill_renditions(Test.objects.all(), batch_size=options['batch_size'], force=options['force'])
+            if updated:
+                invalidate_catalogue()
+            self.stdout.write(self.style.SUCCESS(f'Updated the renditions of {updated} test(s).'))
+
+        if options['only'] in (None, 'profiles'):
+            updated = backfill_renditions(Profile.objects.all(), batch_size=options['batch_size'], force=options['force'])
+            self.stdout.write(self.style.SUCCESS(f'Updated the renditions of {updated} profile(s).'))
@@ -0,0 +1,85 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from smart_test.benchmark import seed_benchmark_data, cleanup_benchmark_data, run_benchmark, compare_with_baseline, \
+    unfinished_runs
+
+
+class Command(BaseCommand):
+    """
+        Management command that measures the throughput of the test-taking flow against the configured database.
+
+        Seeded users take seeded tests concurrently through tests:start, tests:next (GET and POST) and the finish page.
+        For every view the command reports requests per second, p50/p95/p99 latency and queries per request. It fails if a
+        run was not finished, as the numbers of its requests would not measure the flow.
+
+        Options:
+            --users, --tests, --questions, --answers: Size of the seeded data.
+            --concurrency: Number of simultaneous takers.
+            --runs-per-user: Number of tests taken by every user.
+            --seed: Seed of the generated data and answers.
+            --output: Path of a JSON file the results are written to, e.g. a baseline of a release.
+            --baseline: Path of a JSON baseline to compare with; regressions make the command fail.
+            --max-regression: Allowed increase of the p95 latency over the baseline, in percent.
+            --keep-data: Do not delete the seeded data afterwards.
+    """
+
+    help = 'Benchmarks the test-taking flow with concurrent simulated users.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Number of seeded users.')
+        parser.add_argument('--tests', type=int, default=2, help='Number of seeded tests.')
+        parser.add_argument('--questions', type=int, default=10, help='Questions per test.')
+        parser.add_argument('--answers', type=int, default=4, help='Answers per question.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Simultaneous takers.')
+        parser.add_argument('--runs-per-user', type=int, default=1, help='Tests taken by every user.')
+        parser.add_argument('--seed', type=int, help='Seed of the generated data.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare the results with this JSON file.')
+        parser.add_argument('--max-regression', type=float, default=20, help='Allowed p95 latency increase in percent.')
+        parser.add_argument('--keep-data', action='store_true', help='Keep the seeded data.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Cannot read the baseline: {error}')
+
+        cleanup_benchmark_data()
+        users, tests = seed_benchmark_data(options['users'], options['tests'], options['questions'], options['answers'],
+                                           seed=options['seed'])
+        try:
+            result = run_benchmark(users, tests, concurrency=options['concurrency'], runs_per_user=options['runs_per_user'],
+                                   seed=options['seed'])
+            result['unfinished_runs'] = unfinished_runs()
+        finally:
+            if not options['keep_data']:
+                cleanup_benchmark_data()
+
+        self.stdout.write(f'{"view":<10}{"requests":>10}{"errors":>8}{"rps":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"queries":>9}')
+        for view, row in result['views'].items():
+            self.stdout.write(
+                f'{view:<10}{row["requests"]:>10}{row["errors"]:>8}{row["rps"] or "-":>10}{row["p50_ms"] or "-":>10}'
+                f'{row["p95_ms"] or "-":>10}{row["p99_ms"] or "-":>10}{row["queries"] or "-":>9}'
+            )
+        self.stdout.write(f'Wall time: {result["wall_time_s"]} s, unfinished runs: {result["unfinished_runs"]}')
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(result, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}.'))
+
+        if result['unfinished_runs']:
+            raise CommandError(f'{result["unfinished_runs"]} run(s) were not finished, the results are not valid.')
+
+        if baseline is not None:
+            regressions = compare_with_baseline(result, baseline, options['max_regression'])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) compared with {options["baseline"]}.')
+            self.stdout.write(self.style.SUCCESS('No regressions compared with the baseline.'))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from smart_test.exports import filter_test_results, stream_export, EXPORT_FORMATS, EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    """
+        Management command that streams test results as CSV or NDJSON to a file or to the standard output.
+
+        Options:
+            --format: 'csv' (default) or 'ndjson'.
+            --test, --topic: Identifiers of the test or of the topic of the tests.
+            --school: School of the users.
+            --from, --to: Range of the last update of the results, as dates or ISO 8601 date and times.
+            --output: Path of the file to write, the standard output by default.
+            --chunk-size: Number of rows fetched from the database at once.
+    """
+
+    help = 'Exports test results as CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help='Output format.')
+        parser.add_argument('--test', type=int, help='Id of the test.')
+        parser.add_argument('--topic', type=int, help='Id of the topic.')
+        parser.add_argument('--school', help='School of the users.')
+        parser.add_argument('--from', dest='date_from', help='Only results updated at or after this date.')
+        parser.add_argument('--to', dest='date_to', help='Only results updated at or before this date.')
+        parser.add_argument('--output', help='File to write, the standard output by default.')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows fetched at once.')
+
+    def handle(self, *args, **options):
+        try:
+            test_results = filter_test_results(
+                test=options['test'],
+                topic=options['topic'],
+                school=options['school'],
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        lines = stream_export(test_results, options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            written = -1 if options['format'] == 'csv' else 0
+            for line in lines:
+                output.write(line)
+                written += 1
+        self.stderr.write(self.style.SUCCESS(f'Exported {max(written, 0)} test result(s) to {options["output"]}.'))
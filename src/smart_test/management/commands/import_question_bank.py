@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from smart_test.importers import guess_format, import_question_bank, parse_question_bank, IMPORT_FORMATS
+from smart_test.models import Topic
+
+
+class Command(BaseCommand):
+    """
+        Management command that imports tests with their questions and answers from a question bank file.
+
+        Arguments:
+            path: Path of the question bank.
+
+        Options:
+            --format: 'jsonl', 'gift' or 'xml' (Moodle XML), guessed from the file extension by default.
+            --topic: Id of the topic of tests that do not name their own topic.
+            --title: Title of the test for questions outside of a category (GIFT and Moodle XML).
+            --dry-run: Only validate the question bank.
+            --batch-size: Number of rows per INSERT.
+    """
+
+    help = 'Imports a question bank in the JSON lines, GIFT or Moodle XML format.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the question bank.')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Format of the question bank.')
+        parser.add_argument('--topic', type=int, help='Id of the default topic.')
+        parser.add_argument('--title', help='Title of the test for questions outside of a category.')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate, do not save anything.')
+        parser.add_argument('--batch-size', type=int, help='Rows per INSERT.')
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or guess_format(options['path'])
+        if import_format is None:
+            raise CommandError('Cannot guess the format of the question bank, use --format.')
+
+        topic = None
+        if options['topic']:
+            topic = Topic.objects.filter(pk=options['topic']).first()
+            if topic is None:
+                raise CommandError(f'Topic #{options["topic"]} does not exist.')
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = import_question_bank(
+                    parse_question_bank(stream, import_format, options['title']),
+                    topic=topic,
+                    dry_run=options['dry_run'],
+                    batch_size=options['batch_size'],
+                )
+        except OSError as error:
+            raise CommandError(error)
+
+        for source, error in report.errors:
+            self.stderr.write(f'{source}: {error}')
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {report.tests} test(s) with {report.questions} question(s) and {report.answers} answer(s).'))
+        if report.errors:
+            self.stdout.write(self.style.WARNING(f'{len(report.errors)} error(s), the affected tests were skipped.'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from smart_test.models import Test
+from smart_test.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    """
+        Management command that recomputes the TestStats rows from the stored test results.
+
+        Arguments:
+            test_ids: Optional ids of the tests to rebuild, all tests by default.
+    """
+
+    help = 'Recomputes the precomputed statistics of tests from their results.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_ids', nargs='*', type=int, help='Ids of the tests to rebuild.')
+
+    def handle(self, *args, **options):
+        tests = Test.objects.all()
+        if options['test_ids']:
+            tests = tests.filter(pk__in=options['test_ids'])
+
+        rebuilt = rebuild_stats(tests)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics of {rebuilt} test(s).'))
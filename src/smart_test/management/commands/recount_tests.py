@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+
+from smart_test.models import Test
+from smart_test.services import counted_tests, recount_tests
+
+
+class Command(BaseCommand):
+    """
+        Management command that verifies the denormalized question_count and answer_count of tests against the actual
+        number of questions and answers, and recomputes the drifted counters.
+
+        Options:
+            --check: Only report the drifted tests and fail if there are any, without fixing them.
+    """
+
+    help = 'Verifies and recomputes Test.question_count and Test.answer_count.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report drift, do not fix it.')
+
+    def handle(self, *args, **options):
+        drifted = counted_tests().filter(
+            ~Q(question_count=F('actual_question_count')) | ~Q(answer_count=F('actual_answer_count'))
+        )
+
+        drifted_ids = []
+        for test in drifted:
+            drifted_ids.append(test.id)
+            self.stdout.write(
+                f'Test #{test.id} "{test}": questions {test.question_count} -> {test.actual_question_count}, '
+                f'answers {test.answer_count} -> {test.actual_answer_count}'
+            )
+
+        if not drifted_ids:
+            self.stdout.write(self.style.SUCCESS('All counters are up to date.'))
+            return
+
+        if options['check']:
+            raise CommandError(f'{len(drifted_ids)} test(s) have drifted counters.')
+
+        with transaction.atomic():
+            updated = recount_tests(Test.objects.filter(pk__in=drifted_ids))
+
+        self.stdout.write(self.style.SUCCESS(f'Recounted {updated} test(s).'))
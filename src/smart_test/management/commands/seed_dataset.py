@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from smart_test.models import Test, Question
+from smart_test.seeding import DatasetSeeder
+from smart_test.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    """
+        Management command that fills the database with a large synthetic dataset using batched bulk inserts.
+
+        Options:
+            --users: Number of users, each with a profile.
+            --tests: Number of tests.
+            --questions, --answers: Questions per test and answers per question.
+            --results: Number of finished test runs.
+            --active-ratio: Share of the users with an unfinished run.
+            --days: Age in days of the oldest run.
+            --batch-size: Rows per INSERT and transaction.
+            --password: Password of all seeded users.
+            --seed: Seed of the random data.
+            --skip-stats: Do not rebuild the statistics of the seeded tests.
+    """
+
+    help = 'Seeds users, tests, questions, answers and test results in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of users.')
+        parser.add_argument('--tests', type=int, default=50, help='Number of tests.')
+        parser.add_argument('--questions', type=int, default=10, help='Questions per test.')
+        parser.add_argument('--answers', type=int, default=4, help='Answers per question.')
+        parser.add_argument('--results', type=int, default=10000, help='Number of finished test runs.')
+        parser.add_argument('--active-ratio', type=float, default=0.05, help='Share of users with an unfinished run.')
+        parser.add_argument('--days', type=int, default=365, help='Age in days of the oldest run.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT.')
+        parser.add_argument('--password', default='password', help='Password of the seeded users.')
+        parser.add_argument('--seed', type=int, help='Seed of the random data.')
+        parser.add_argument('--skip-stats', action='store_true', help='Do not rebuild the test statistics.')
+
+    def handle(self, *args, **options):
+        if not (Test.QUESTION_MIN_LIMIT <= options['questions'] <= Test.QUESTION_MAX_LIMIT):
+            raise CommandError(f'--questions must be within {Test.QUESTION_MIN_LIMIT}..{Test.QUESTION_MAX_LIMIT}.')
+        if not (Question.ANSWER_MIN_LIMIT <= options['answers'] <= Question.ANSWER_MAX_LIMIT):
+            raise CommandError(f'--answers must be within {Question.ANSWER_MIN_LIMIT}..{Question.ANSWER_MAX_LIMIT}.')
+        if options['results'] and not (options['users'] and options['tests']):
+            raise CommandError('Test results need at least one user and one test.')
+
+        seeder = DatasetSeeder(batch_size=options['batch_size'], seed=options['seed'], password=options['password'])
+
+        user_ids = seeder.create_users(options['users'])
+        self.stdout.write(f'Created {len(user_ids)} user(s) with profiles.')
+
+        test_ids = seeder.create_tests(options['tests'], options['questions'], options['answers'])
+        self.stdout.write(f'Created {len(test_ids)} test(s).')
+
+        created = seeder.create_test_results(options['results'], user_ids, test_ids, options['questions'],
+                                             days=options['days'], active_ratio=options['active_ratio'])
+        self.stdout.write(f'Created {created} test result(s).')
+
+        if not options['skip_stats'] and test_ids:
+            rebuild_stats(Test.objects.filter(pk__in=test_ids))
+            self.stdout.write('Rebuilt the statistics of the seeded tests.')
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
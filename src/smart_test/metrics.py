@@ -0,0 +1,6 @@
+from core.prometheus import Counter
+
+
+TESTS_STARTED = Counter('smart_test_tests_started_total', 'Started test runs.')
+TESTS_FINISHED = Counter('smart_test_tests_finished_total', 'Finished test runs.')
+ANSWERS = Counter('smart_test_answers_total', 'Answered questions by correctness, rate() gives the answers per second.', ('correct', ))
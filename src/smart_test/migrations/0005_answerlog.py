@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-17 19:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smart_test', '0004_alter_test_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_mask', models.PositiveSmallIntegerField()),
+                ('is_correct', models.BooleanField()),
+                ('latency', models.DurationField(null=True)),
+                ('answered_at', models.DateTimeField()),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_logs', to='smart_test.question')),
+                ('test_result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_logs', to='smart_test.testresult')),
+            ],
+        ),
+    ]
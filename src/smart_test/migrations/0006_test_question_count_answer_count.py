@@ -0,0 +1,41 @@
+# Generated by Django 5.1 on 2026-10-17 19:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_questions_and_answers(apps, schema_editor):
+    Test = apps.get_model('smart_test', 'Test')
+    Question = apps.get_model('smart_test', 'Question')
+    Answer = apps.get_model('smart_test', 'Answer')
+
+    questions = Question.objects.filter(test=OuterRef('pk')).order_by().values('test').annotate(total=Count('pk')).values('total')
+    answers = Answer.objects.filter(question__test=OuterRef('pk')).order_by().values('question__test').annotate(
+        total=Count('pk')).values('total')
+
+    Test.objects.update(
+        question_count=Coalesce(Subquery(questions), Value(0)),
+        answer_count=Coalesce(Subquery(answers), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smart_test', '0005_answerlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='answer_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='test',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_questions_and_answers, migrations.RunPython.noop),
+    ]
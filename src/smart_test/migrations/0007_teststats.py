@@ -0,0 +1,66 @@
+# Generated by Django 5.1 on 2026-10-17 19:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Q, Sum
+
+
+def build_test_stats(apps, schema_editor):
+    Test = apps.get_model('smart_test', 'Test')
+    TestResult = apps.get_model('smart_test', 'TestResult')
+    TestStats = apps.get_model('smart_test', 'TestStats')
+
+    finished = Q(test_results__state=1)
+    tests = Test.objects.annotate(
+        num_runs=Count('test_results'),
+        num_finishes=Count('test_results', filter=finished),
+        total_correct=Sum('test_results__num_correct_answers', filter=finished),
+        last_write_date=Max('test_results__write_date'),
+    ).filter(num_runs__gt=0)
+
+    for test in tests.iterator():
+        best = TestResult.objects.filter(test=test, state=1).annotate(
+            points_diff=F('num_correct_answers') - F('num_incorrect_answers'),
+            duration=ExpressionWrapper(F('write_date') - F('create_date'), output_field=DurationField()),
+        ).order_by('-points_diff', 'duration').first()
+
+        average_score = 0
+        if test.num_finishes and test.question_count:
+            average_score = test.total_correct / test.num_finishes / test.question_count * 100
+
+        TestStats.objects.create(
+            test=test,
+            runs=test.num_runs,
+            finishes=test.num_finishes,
+            last_run=test.last_write_date,
+            average_score=average_score,
+            best_user_id=best.user_id if best else None,
+            best_points=max(0, best.points_diff) if best else None,
+            best_duration=best.duration if best else None,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smart_test', '0006_test_question_count_answer_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestStats',
+            fields=[
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='smart_test.test')),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('finishes', models.PositiveIntegerField(default=0)),
+                ('best_points', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('best_duration', models.DurationField(blank=True, null=True)),
+                ('last_run', models.DateTimeField(blank=True, null=True)),
+                ('average_score', models.FloatField(default=0)),
+                ('best_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(build_test_stats, migrations.RunPython.noop),
+    ]
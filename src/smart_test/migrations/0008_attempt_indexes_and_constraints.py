@@ -0,0 +1,55 @@
+# Generated by Django 5.1 on 2026-10-17 19:36
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+        Keeps only the most recent NEW run per user and test, and renumbers questions sharing an order number within a test,
+        so that the unique constraints can be created on existing data.
+    """
+
+    TestResult = apps.get_model('smart_test', 'TestResult')
+    Question = apps.get_model('smart_test', 'Question')
+
+    duplicated_runs = TestResult.objects.filter(state=0).values('user', 'test').annotate(total=Count('pk')).filter(total__gt=1)
+    for duplicate in duplicated_runs:
+        runs = TestResult.objects.filter(state=0, user=duplicate['user'], test=duplicate['test']).order_by('-write_date', '-pk')
+        TestResult.objects.filter(pk__in=list(runs.values_list('pk', flat=True)[1:])).delete()
+
+    duplicated_tests = Question.objects.values('test', 'order_number').annotate(total=Count('pk')).filter(total__gt=1)
+    for test_id in set(duplicated_tests.values_list('test', flat=True)):
+        questions = list(Question.objects.filter(test_id=test_id).order_by('order_number', 'pk'))
+        for order_number, question in enumerate(questions, start=1):
+            question.order_number = order_number
+        Question.objects.bulk_update(questions, ['order_number'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smart_test', '0007_teststats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(condition=models.Q(('state', 0)), fields=['write_date'], name='testresult_new_write_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(fields=['test', 'state', 'write_date'], name='testresult_test_state_idx'),
+        ),
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='question',
+            constraint=models.UniqueConstraint(fields=('test', 'order_number'), name='unique_question_order_number'),
+        ),
+        migrations.AddConstraint(
+            model_name='testresult',
+            constraint=models.UniqueConstraint(condition=models.Q(('state', 0)), fields=('user', 'test'), name='unique_active_test_result'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-17 19:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smart_test', '0008_attempt_indexes_and_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestResultArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.SmallIntegerField()),
+                ('duration', models.DurationField()),
+                ('finished_at', models.DateTimeField()),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_results', to='smart_test.test')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['test', '-points', 'duration'], name='archive_test_best_idx')],
+            },
+        ),
+    ]
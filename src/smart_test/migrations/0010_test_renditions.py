@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smart_test', '0009_testresultarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
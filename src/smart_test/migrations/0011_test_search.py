@@ -0,0 +1,141 @@
+# Generated by Django 5.1 on 2026-10-17 20:07
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    CREATE FUNCTION smart_test_test_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce((SELECT name FROM smart_test_topic WHERE id = NEW.topic_id), '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER smart_test_test_search_vector
+    BEFORE INSERT OR UPDATE OF title, description, topic_id, search_vector ON smart_test_test
+    FOR EACH ROW EXECUTE FUNCTION smart_test_test_search_vector_update()
+    """,
+    """
+    CREATE FUNCTION smart_test_topic_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE smart_test_test SET topic_id = topic_id WHERE topic_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER smart_test_topic_search_vector
+    AFTER UPDATE OF name ON smart_test_topic
+    FOR EACH ROW EXECUTE FUNCTION smart_test_topic_search_vector_update()
+    """,
+    'UPDATE smart_test_test SET title = title',
+    'CREATE INDEX smart_test_test_search_vector_idx ON smart_test_test USING gin (search_vector)',
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS smart_test_test_search_vector_idx',
+    'DROP TRIGGER IF EXISTS smart_test_topic_search_vector ON smart_test_topic',
+    'DROP FUNCTION IF EXISTS smart_test_topic_search_vector_update()',
+    'DROP TRIGGER IF EXISTS smart_test_test_search_vector ON smart_test_test',
+    'DROP FUNCTION IF EXISTS smart_test_test_search_vector_update()',
+]
+
+SQLITE_DOCUMENT = """
+    coalesce(NEW.title, ''), coalesce(NEW.description, ''),
+    coalesce((SELECT name FROM smart_test_topic WHERE id = NEW.topic_id), '')
+"""
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE smart_test_test_fts USING fts5(title, description, topic, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""
+    CREATE TRIGGER smart_test_test_fts_insert AFTER INSERT ON smart_test_test BEGIN
+        INSERT INTO smart_test_test_fts (rowid, title, description, topic) VALUES (NEW.id, {SQLITE_DOCUMENT});
+    END
+    """,
+    f"""
+    CREATE TRIGGER smart_test_test_fts_update AFTER UPDATE OF title, description, topic_id ON smart_test_test BEGIN
+        DELETE FROM smart_test_test_fts WHERE rowid = OLD.id;
+        INSERT INTO smart_test_test_fts (rowid, title, description, topic) VALUES (NEW.id, {SQLITE_DOCUMENT});
+    END
+    """,
+    """
+    CREATE TRIGGER smart_test_test_fts_delete AFTER DELETE ON smart_test_test BEGIN
+        DELETE FROM smart_test_test_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER smart_test_topic_fts_update AFTER UPDATE OF name ON smart_test_topic BEGIN
+        UPDATE smart_test_test_fts SET topic = coalesce(NEW.name, '')
+        WHERE rowid IN (SELECT id FROM smart_test_test WHERE topic_id = NEW.id);
+    END
+    """,
+    """
+    INSERT INTO smart_test_test_fts (rowid, title, description, topic)
+    SELECT test.id, coalesce(test.title, ''), coalesce(test.description, ''), coalesce(topic.name, '')
+    FROM smart_test_test test LEFT JOIN smart_test_topic topic ON topic.id = test.topic_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS smart_test_topic_fts_update',
+    'DROP TRIGGER IF EXISTS smart_test_test_fts_delete',
+    'DROP TRIGGER IF EXISTS smart_test_test_fts_update',
+    'DROP TRIGGER IF EXISTS smart_test_test_fts_insert',
+    'DROP TABLE IF EXISTS smart_test_test_fts',
+]
+
+
+def _sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    """
+        Creates the full-text index of the catalogue used by smart_test.search: the search_vector column maintained by
+        triggers with a GIN index on PostgreSQL, an FTS5 table maintained by triggers on SQLite. Other databases fall back
+        to icontains lookups.
+
+        SQLite drops the triggers when a later migration rebuilds smart_test_test, such a migration has to create them again.
+    """
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    elif vendor == 'sqlite' and _sqlite_has_fts5(schema_editor):
+        statements = SQLITE_FORWARD
+    else:
+        return
+
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smart_test', '0010_test_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,5 +1,6 @@
 import datetime
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 
@@ -36,6 +37,7 @@ class Test(models.Model):
         Attributes:
             QUESTION_MIN_LIMIT (int): Minimum number of questions allowed in the test.
             QUESTION_MAX_LIMIT (int): Maximum number of questions allowed in the test.
+            IMAGE_RENDITION_SIZES (tuple): Edge lengths of the renditions of the image, for the list and details pages at 1x and 2x.
 
             LEVEL_CHOICES (class): A class to define level choices for the test.
                 BASIC (int): Represents the basic level.
@@ -47,6 +49,11 @@ class Test(models.Model):
             description (TextField): Description of the test, with a maximum length of 1024 characters.
             level (PositiveSmallIntegerField): Level of the test, selected from LEVEL_CHOICES.
             image (ImageField): An image associated with the test, with a default image if not provided.
+            renditions (JSONField): Resized variants of the image, see core.renditions, generated by smart_test.tasks.
+            search_vector (SearchVectorField): Weighted full-text document of the title, description and topic name, maintained
+                by a database trigger on PostgreSQL and unused elsewhere, see smart_test.search.
+            question_count (PositiveIntegerField): Number of questions in the test, maintained by smart_test.signals.
+            answer_count (PositiveIntegerField): Number of answers over all questions of the test, maintained by smart_test.signals.
 
         Methods:
             __str__: Returns the title of the test as its string representation.
@@ -57,6 +64,7 @@ class Test(models.Model):
 
     QUESTION_MIN_LIMIT = 3
     QUESTION_MAX_LIMIT = 20
+    IMAGE_RENDITION_SIZES = (100, 200, 300, 600)
 
     class LEVEL_CHOICES(models.IntegerChoices):
         """
@@ -82,6 +90,10 @@ class Test(models.Model):
     description = models.TextField(max_length=1024, null=True, blank=True)
     level = models.PositiveSmallIntegerField(choices=LEVEL_CHOICES.choices, default=LEVEL_CHOICES.MIDDLE)
     image = models.ImageField(upload_to="covers/", default="covers/default.png")
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+    question_count = models.PositiveIntegerField(default=0, editable=False)
+    answer_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.title}"
@@ -105,6 +117,9 @@ class Question(models.Model):
 
         Methods:
         - __str__(self): Returns a string representation of the question text.
+
+        Meta:
+        - constraints: The order number is unique within a test.
     """
 
     ANSWER_MIN_LIMIT = 3
@@ -118,6 +133,11 @@ class Question(models.Model):
     def __str__(self):
         return f"{self.text}"
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['test', 'order_number'], name='unique_question_order_number'),
+        ]
+
 
 class Answer(models.Model):
     """
@@ -159,6 +179,15 @@ class TestResult(BaseModel):
         current_order_number : PositiveSmallIntegerField
             The current order number of the question being answered, with validation.
 
+        Meta
+        ----
+        indexes
+            A partial index on write_date of NEW runs for the cleanup of outdated runs, and (test, state, write_date) for the
+            per-test statistics.
+        constraints
+            At most one NEW run per user and test, so concurrent starts cannot create duplicates. Its partial unique index
+            also serves the active run lookup by user and test.
+
         Methods
         -------
         time_spent()
@@ -199,6 +228,15 @@ class TestResult(BaseModel):
     current_order_number = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(Test.QUESTION_MAX_LIMIT)])
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['write_date'], condition=models.Q(state=0), name='testresult_new_write_date_idx'),
+            models.Index(fields=['test', 'state', 'write_date'], name='testresult_test_state_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'test'], condition=models.Q(state=0), name='unique_active_test_result'),
+        ]
+
     def time_spent(self):
         """
             Calculate the time spent from the object's creation date to its write date.
@@ -222,7 +260,7 @@ class TestResult(BaseModel):
          :return: The score as a percentage, calculated from the number of correct answers divided by the total number of questions in the test.
         """
 
-        return (self.num_correct_answers/self.test.questions.count())*100
+        return (self.num_correct_answers/self.test.question_count)*100
 
     def __str__(self):
         return f"{self.test}, run by {self.user.get_full_name()} at {self.write_date}"
@@ -234,16 +272,10 @@ class TestResult(BaseModel):
             :return: A string representing the user with the highest score and their points, or a message indicating that no one has completed the test.
         """
 
-        queryset = TestResult.objects.filter(test=test_id)
-        if queryset.count() > 0:
-            obj = queryset.extra(select={
-                'points': 'num_correct_answers - num_incorrect_answers', 'duration': 'write_date - create_date'},
-                order_by=['-points', 'duration'])[0]
-            result = f'{obj.user} scored {obj.num_correct_answers} points'
-            return result
-        else:
-            result = 'No one has done this test yet'
-            return result
+        stats = TestStats.objects.select_related('best_user').filter(test_id=test_id).first()
+        if stats is None:
+            return 'No one has done this test yet'
+        return stats.best_result()
 
     @staticmethod
     def last_run(test_id):
@@ -252,10 +284,117 @@ class TestResult(BaseModel):
             :return: The date of the last run of the specified test if it exists, otherwise a message stating no runs.
         """
 
-        if TestResult.objects.filter(test=test_id).count() > 0:
-            ob = TestResult.objects.filter(test=test_id).order_by('-write_date').first()
-            result = ob.write_date
-            return result
-        else:
-            result = 'No one has run this test yet'
-            return result
+        stats = TestStats.objects.filter(test_id=test_id).first()
+        if stats is None:
+            return 'No one has run this test yet'
+        return stats.last_run_display()
+
+
+class AnswerLog(models.Model):
+    """
+        Represents the submission of a single question within a test run.
+
+        Attributes:
+        - test_result: ForeignKey linking the submission to the test run it belongs to.
+        - question: ForeignKey linking the submission to the answered question.
+        - selected_mask: Bitmask of the selected answers, where bit ``i`` stands for the i-th answer of the question ordered by id.
+        - is_correct: A BooleanField indicating whether exactly the correct answers were selected.
+        - latency: Time passed since the previous question was answered, or since the test was started for the first question.
+        - answered_at: The date and time when the question was answered.
+
+        Rows are written in batches by smart_test.buffers.AnswerLogBuffer, not one by one.
+    """
+
+    test_result = models.ForeignKey(to=TestResult, related_name="answer_logs", on_delete=models.CASCADE)
+    question = models.ForeignKey(to=Question, related_name="answer_logs", on_delete=models.CASCADE)
+    selected_mask = models.PositiveSmallIntegerField()
+    is_correct = models.BooleanField()
+    latency = models.DurationField(null=True)
+    answered_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.question}, answered {'correctly' if self.is_correct else 'incorrectly'} at {self.answered_at}"
+
+
+class TestStats(models.Model):
+    """
+        Precomputed statistics and leaderboard of a test, updated incrementally by smart_test.stats when a test run is
+        started or finished.
+
+        Attributes:
+        - test: OneToOneField to the test, used as the primary key.
+        - runs: Number of started test runs.
+        - finishes: Number of finished test runs.
+        - best_user: The user holding the best result, or None if nobody has finished the test.
+        - best_points: Points of the best result.
+        - best_duration: Time spent on the best result. Among equal points the faster run wins, a run without a known
+          start never does.
+        - last_run: The date and time of the latest start or finish of a run.
+        - average_score: Average score in percent over the finished runs.
+
+        Methods:
+        - best_result(): Returns a string describing the best result.
+        - last_run_display(): Returns the date of the last run, or a message if the test has not been run yet.
+    """
+
+    test = models.OneToOneField(to=Test, related_name="stats", on_delete=models.CASCADE, primary_key=True)
+    runs = models.PositiveIntegerField(default=0)
+    finishes = models.PositiveIntegerField(default=0)
+    best_user = models.ForeignKey(to=User, related_name="+", null=True, blank=True, on_delete=models.SET_NULL)
+    best_points = models.PositiveSmallIntegerField(null=True, blank=True)
+    best_duration = models.DurationField(null=True, blank=True)
+    last_run = models.DateTimeField(null=True, blank=True)
+    average_score = models.FloatField(default=0)
+
+    def best_result(self):
+        """
+            :return: A string representing the user with the best result and their points, or a message indicating that no one
+            has completed the test.
+        """
+
+        if self.best_user_id is None:
+            return 'No one has done this test yet'
+        return f'{self.best_user} scored {self.best_points} points'
+
+    def last_run_display(self):
+        """
+            :return: The date of the last run of the test if it exists, otherwise a message stating no runs.
+        """
+
+        if self.last_run is None:
+            return 'No one has run this test yet'
+        return self.last_run
+
+    def __str__(self):
+        return f"Statistics of {self.test}"
+
+
+class TestResultArchive(models.Model):
+    """
+        Compact record of a finished test run moved out of the TestResult table by smart_test.archive, so that the table
+        of runs only holds recent ones.
+
+        Attributes:
+        - user: ForeignKey to the user who ran the test.
+        - test: ForeignKey to the test.
+        - points: Correct minus incorrect answers of the run. Unlike TestResult.points() it is not clamped at zero, so that
+          the number of correct answers can still be derived from it.
+        - duration: Time spent on the run.
+        - finished_at: The date and time the run was finished.
+
+        Archived runs are still counted by TestStats, including when it is rebuilt by smart_test.stats.rebuild_stats().
+    """
+
+    user = models.ForeignKey(to=User, related_name="archived_results", on_delete=models.CASCADE)
+    test = models.ForeignKey(to=Test, related_name="archived_results", on_delete=models.CASCADE)
+    points = models.SmallIntegerField()
+    duration = models.DurationField()
+    finished_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['test', '-points', 'duration'], name='archive_test_best_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} scored {self.points} points in {self.test} at {self.finished_at}"
@@ -0,0 +1,223 @@
+import logging
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F
+
+from accounts.models import User
+from smart_test.models import Test, TestResult, TestResultArchive
+
+
+logger = logging.getLogger('smart_test')
+
+# Ratings and difficulties share the 0-100 scale of User.rating. A user rated SCALE points above the difficulty of a test
+# is expected to score e times more correct than incorrect answers in it.
+INITIAL_RATING = 50.0
+SCALE = 10.0
+
+# Points a rating moves per unit of surprise (score minus expected score), larger for the first runs of a user so that a
+# new rating settles quickly.
+K = 4.0
+K_PROVISIONAL = 12.0
+PROVISIONAL_RUNS = 10
+
+# Difficulty of a test of each level with an average score of 50%, and how far the average score moves it.
+LEVEL_DIFFICULTY = {
+    Test.LEVEL_CHOICES.BASIC: 35.0,
+    Test.LEVEL_CHOICES.MIDDLE: 50.0,
+    Test.LEVEL_CHOICES.ADVANCED: 65.0,
+}
+DIFFICULTY_SPREAD = 30.0
+
+# Weight of a run in the rating by the level of the test.
+LEVEL_WEIGHT = {
+    Test.LEVEL_CHOICES.BASIC: 0.75,
+    Test.LEVEL_CHOICES.MIDDLE: 1.0,
+    Test.LEVEL_CHOICES.ADVANCED: 1.25,
+}
+
+_LEVELS = max(Test.LEVEL_CHOICES.values) + 1
+_LEVEL_DIFFICULTY = np.array([LEVEL_DIFFICULTY.get(level, INITIAL_RATING) for level in range(_LEVELS)])
+_LEVEL_WEIGHT = np.array([LEVEL_WEIGHT.get(level, 1.0) for level in range(_LEVELS)])
+
+
+def test_difficulty(level, average_score, finishes=1):
+    """
+        :param level: The level of the test, one of Test.LEVEL_CHOICES, or an array of them.
+        :param average_score: The average score of the test in percent, see TestStats.average_score.
+        :param finishes: The number of finished runs the average is computed from. Without any, the test is rated by its
+        level only.
+        :return: The difficulty of the test on the rating scale: its level, made harder by a low average score and easier
+        by a high one.
+    """
+
+    average_score = np.where(np.asarray(finishes) > 0, average_score, 50.0)
+    return _LEVEL_DIFFICULTY[level] + DIFFICULTY_SPREAD * (0.5 - average_score / 100)
+
+
+def expected_score(rating, difficulty):
+    """
+        :param rating: The rating of a user, or an array of them.
+        :param difficulty: The difficulty of a test, see test_difficulty().
+        :return: The expected share of correct answers of the user in the test, between 0 and 1.
+    """
+
+    return 1 / (1 + np.exp((difficulty - rating) / SCALE))
+
+
+def updated_rating(rating, runs, score, level, difficulty):
+    """
+        The Elo update of a rating with one finished test run. The rating moves towards the result by the surprise of the
+        result, weighted by the level of the test. All arguments may be arrays of the same length.
+
+        :param rating: The rating of the user before the run.
+        :param runs: The number of runs the rating was computed from.
+        :param score: The share of correct answers of the run, between 0 and 1.
+        :param level: The level of the test, one of Test.LEVEL_CHOICES.
+        :param difficulty: The difficulty of the test, see test_difficulty().
+        :return: The new rating, between 0 and 100.
+    """
+
+    k = np.where(np.asarray(runs) < PROVISIONAL_RUNS, K_PROVISIONAL, K) * _LEVEL_WEIGHT[level]
+    return np.clip(rating + k * (score - expected_score(rating, difficulty)), 0, 100)
+
+
+def _to_decimal(rating):
+    return Decimal(f'{float(rating):.2f}')
+
+
+def record_rating(test_result, stats):
+    """
+        Updates the rating of the user with a test run that was just finished. The user row is locked, so parallel runs of
+        the same user are applied one after the other.
+
+        :param test_result: The finished TestResult, with its test.
+        :param stats: The TestStats of the test, already updated with the run.
+        :return: The new rating, or None if the run has no answers.
+    """
+
+    answered = test_result.num_correct_answers + test_result.num_incorrect_answers
+    if not answered:
+        return None
+
+    level = test_result.test.level
+    difficulty = test_difficulty(level, stats.average_score, stats.finishes)
+
+    # Called within the transaction of record_finish(), a savepoint would only cost two more queries.
+    with transaction.atomic(savepoint=False):
+        user = User.objects.select_for_update().only('rating', 'rating_runs').get(pk=test_result.user_id)
+        rating = float(user.rating) if user.rating_runs else INITIAL_RATING
+        rating = _to_decimal(updated_rating(rating, user.rating_runs, test_result.num_correct_answers / answered, level, difficulty))
+        User.objects.filter(pk=user.pk).update(rating=rating, rating_runs=F('rating_runs') + 1)
+    return rating
+
+
+def _load_tests():
+    """
+        :return: A dictionary of arrays describing all tests, ordered by id: 'id', 'level', 'question_count' and
+        'difficulty'.
+    """
+
+    rows = list(Test.objects.values_list('id', 'level', 'question_count', 'stats__average_score', 'stats__finishes').order_by('id'))
+    tests = {
+        'id': np.array([row[0] for row in rows], dtype=np.int64),
+        'level': np.array([row[1] for row in rows], dtype=np.int64),
+        'question_count': np.array([row[2] for row in rows], dtype=np.float64),
+    }
+    tests['difficulty'] = test_difficulty(tests['level'], np.array([row[3] or 0.0 for row in rows]), np.array([row[4] or 0 for row in rows]))
+    return tests
+
+
+def _positions(tests, test_ids):
+    # Positions of the tests in the arrays of _load_tests(), and whether they are there (a test created in the meantime
+    # is not).
+    if not len(tests['id']):
+        return np.zeros(len(test_ids), dtype=np.int64), np.zeros(len(test_ids), dtype=bool)
+    positions = np.minimum(np.searchsorted(tests['id'], test_ids), len(tests['id']) - 1)
+    return positions, tests['id'][positions] == test_ids
+
+
+def _load_history(tests, chunk_size):
+    """
+        Reads all finished runs, live and archived, into arrays.
+
+        :param tests: The tests, see _load_tests().
+        :param chunk_size: Number of rows fetched at once.
+        :return: A tuple of arrays (user ids, positions of the tests in ``tests``, scores, finish timestamps).
+    """
+
+    row = np.dtype([('user', np.int64), ('test', np.int64), ('score', np.float64), ('time', np.float64)])
+
+    live = TestResult.objects.filter(state=TestResult.STATE.FINISHED).values_list(
+        'user_id', 'test_id', 'num_correct_answers', 'num_incorrect_answers', 'write_date')
+    live = np.fromiter((
+        (user_id, test_id, correct / (correct + incorrect) if correct + incorrect else np.nan, write_date.timestamp())
+        for user_id, test_id, correct, incorrect, write_date in live.iterator(chunk_size=chunk_size)
+    ), dtype=row)
+
+    # The archive keeps the points (correct minus incorrect answers) of runs in which every question was answered.
+    archived = np.fromiter((
+        (user_id, test_id, points, finished_at.timestamp())
+        for user_id, test_id, points, finished_at in TestResultArchive.objects.values_list(
+            'user_id', 'test_id', 'points', 'finished_at').iterator(chunk_size=chunk_size)
+    ), dtype=row)
+    positions, known = _positions(tests, archived['test'])
+    question_count = np.where(known, tests['question_count'][positions] if len(tests['id']) else 0, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        archived['score'] = np.where(question_count > 0, np.clip((archived['score'] + question_count) / (2 * question_count), 0, 1), np.nan)
+
+    history = np.concatenate([archived, live])
+    positions, known = _positions(tests, history['test'])
+    rated = known & ~np.isnan(history['score'])
+    return history['user'][rated], positions[rated], history['score'][rated], history['time'][rated]
+
+
+def recompute_ratings(chunk_size=10000, batch_size=1000):
+    """
+        Recomputes the ratings of all users from all their finished runs, live and archived. The history is replayed in
+        the order the runs were finished with the update of updated_rating(), so the result is the one of the incremental
+        updates, except that all runs are rated against the current difficulty of their test.
+
+        The replay is vectorized with NumPy: ratings of different users do not depend on each other, so the k-th runs of all
+        users are applied in one step, and the number of steps is the largest number of runs of a user.
+
+        Runs finished while the recompute is running are only counted by the next recompute.
+
+        :param chunk_size: Number of runs fetched at once.
+        :param batch_size: Number of users written per UPDATE.
+        :return: The number of rated users.
+    """
+
+    tests = _load_tests()
+    users, positions, scores, times = _load_history(tests, chunk_size)
+
+    # Group the runs by user, in the order they were finished within a user.
+    order = np.lexsort((times, users))
+    users, positions, scores = users[order], positions[order], scores[order]
+    levels, difficulties = tests['level'][positions], tests['difficulty'][positions]
+    user_ids, user_index, runs = np.unique(users, return_inverse=True, return_counts=True)
+
+    # The rank of each run among the runs of its user, and the runs sorted by rank: step k applies the k-th runs.
+    rank = np.arange(len(users)) - np.repeat(np.cumsum(runs) - runs, runs)
+    by_rank = np.argsort(rank, kind='stable')
+    steps = int(runs.max()) if len(runs) else 0
+    bounds = np.searchsorted(rank[by_rank], np.arange(steps + 1))
+
+    ratings = np.full(len(user_ids), INITIAL_RATING)
+    for step in range(steps):
+        selected = by_rank[bounds[step]:bounds[step + 1]]
+        index = user_index[selected]
+        ratings[index] = updated_rating(ratings[index], step, scores[selected], levels[selected], difficulties[selected])
+
+    # Users without runs any more (e.g. their runs were deleted) are reset in the same transaction.
+    with transaction.atomic():
+        User.objects.filter(rating_runs__gt=0).update(rating=0, rating_runs=0)
+        User.objects.bulk_update(
+            [User(pk=int(user_id), rating=_to_decimal(rating), rating_runs=int(count)) for user_id, rating, count in zip(user_ids, ratings, runs)],
+            ['rating', 'rating_runs'],
+            batch_size=batch_size,
+        )
+
+    logger.info(f'Ratings of {len(user_ids)} users recomputed from {len(users)} runs')
+    return len(user_ids)
@@ -0,0 +1,65 @@
+def encode_selection(answer_ids, selected_ids):
+    """
+        Encodes a selection as a bitmask over the question's answers, where bit ``i`` stands for ``answer_ids[i]``.
+
+        :param answer_ids: The ids of the question's answers, ordered by id.
+        :param selected_ids: The ids of the answers selected by the user.
+        :return: The selection bitmask.
+        :raises ValueError: If a selected id does not belong to the question, e.g. a form of another question submitted from
+        a stale page.
+    """
+
+    selected_ids = set(selected_ids)
+    unknown = selected_ids.difference(answer_ids)
+    if unknown:
+        raise ValueError(f'Answers {sorted(unknown)} do not belong to the question')
+    mask = 0
+    for index, answer_id in enumerate(answer_ids):
+        if answer_id in selected_ids:
+            mask |= 1 << index
+    return mask
+
+
+def count_mistakes(correct_mask, selected_mask):
+    """
+        :param correct_mask: The bitmask of the correct answers.
+        :param selected_mask: The bitmask of the selected answers.
+        :return: The number of answers whose selection differs from their correctness.
+    """
+
+    return bin(correct_mask ^ selected_mask).count('1')
+
+
+def is_correct(correct_mask, selected_mask):
+    """
+        :param correct_mask: The bitmask of the correct answers.
+        :param selected_mask: The bitmask of the selected answers.
+        :return: True if exactly the correct answers were selected.
+    """
+
+    return correct_mask ^ selected_mask == 0
+
+
+def correct_masks(plan):
+    """
+        :param plan: A CompiledTest instance.
+        :return: A dictionary mapping question ids to the bitmask of their correct answers.
+    """
+
+    return {question.id: question.correct_mask for question in plan.questions}
+
+
+def score_batch(masks, submissions):
+    """
+        Scores many stored submissions at once, e.g. to regrade a test after its answers were edited.
+
+        :param masks: A dictionary mapping question ids to the bitmask of their correct answers, see correct_masks().
+        :param submissions: An iterable of (question_id, selected_mask) pairs.
+        :return: A list of booleans, one per submission, True for a correct submission. Submissions for questions missing
+        from ``masks`` are scored as incorrect.
+    """
+
+    return [
+        question_id in masks and masks[question_id] ^ selected_mask == 0
+        for question_id, selected_mask in submissions
+    ]
@@ -0,0 +1,85 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+
+SEARCH_CONFIG = 'simple'
+FTS_TABLE = 'smart_test_test_fts'
+
+
+def _terms(query):
+    # Words only, so that user input never reaches the query syntax of the database.
+    return re.findall(r'\w+', query or '')
+
+
+def fts_available():
+    """
+        :return: Whether the SQLite FTS5 index of the catalogue exists, see migration 0011_test_search.
+    """
+
+    return connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+
+
+def search_tests(queryset, query):
+    """
+        Full-text search over the title, the description and the topic name of tests. Every word of the query must match
+        the beginning of a word of the test. The tests are annotated with ``search_rank`` (higher is better; title
+        matches weigh more than description matches, which weigh more than topic matches) and ordered by it.
+
+        On PostgreSQL the search uses the search_vector column, maintained by a trigger and indexed with GIN. On SQLite it
+        uses the FTS5 table smart_test_test_fts, maintained by triggers, ranked with bm25. Without either, the words are
+        matched with icontains and all matches have the same rank.
+
+        :param queryset: A queryset of Test objects.
+        :param query: The search text.
+        :return: The filtered, annotated and ordered queryset.
+    """
+
+    terms = _terms(query)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config=SEARCH_CONFIG, search_type='raw')
+        queryset = queryset.filter(search_vector=search_query).annotate(search_rank=SearchRank(F('search_vector'), search_query))
+
+    elif fts_available():
+        match = ' '.join(f'"{term}"*' for term in terms)
+        queryset = queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match, ))).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, 10.0, 4.0, 2.0) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = smart_test_test.id',
+                (match, ),
+                output_field=FloatField(),
+            )
+        )
+
+    else:
+        for term in terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term) | Q(topic__name__icontains=term))
+        queryset = queryset.annotate(search_rank=Value(1.0, output_field=FloatField()))
+
+    return queryset.order_by('-search_rank', 'id')
+
+
+def filter_catalogue(queryset, search=None, level=None, topic=None):
+    """
+        Applies the catalogue filters. All of them are optional and combined.
+
+        :param queryset: A queryset of Test objects.
+        :param search: Search text, see search_tests().
+        :param level: One of Test.LEVEL_CHOICES.
+        :param topic: A Topic or its identifier.
+        :return: The filtered queryset, ordered by rank when searching.
+    """
+
+    if level is not None and level != '':
+        queryset = queryset.filter(level=level)
+    if topic:
+        queryset = queryset.filter(topic=topic)
+    if search:
+        queryset = search_tests(queryset, search)
+    return queryset
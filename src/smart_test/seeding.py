@@ -0,0 +1,208 @@
+import datetime
+import itertools
+import logging
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from accounts.models import User, Profile
+from smart_test.cache import invalidate_catalogue
+from smart_test.models import Test, Question, Answer, TestResult
+
+
+logger = logging.getLogger('smart_test')
+
+SEED_PREFIX = 'seed_'
+NAME_POOL_SIZE = 500
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class DatasetSeeder:
+    """
+        Fills the database with a large synthetic dataset, for reproducing production scale locally.
+
+        Rows are generated lazily and written with batched bulk_create, one transaction per batch, so memory use does not
+        depend on the size of the dataset. bulk_create() sends no post_save signals, so the profiles that
+        accounts.signals.save_profile would create one by one are inserted in bulk as well, and the counters of the tests
+        are set directly. Faker only fills small pools of names that are combined at random, as calling it per row would
+        dominate the run time.
+
+        :param batch_size: Number of rows per INSERT and transaction.
+        :type batch_size: int
+        :param seed: Optional seed of the random data, for repeatable datasets.
+        :type seed: int, optional
+        :param password: Password of all seeded users, hashed once.
+        :type password: str
+    """
+
+    def __init__(self, batch_size=5000, seed=None, password='password'):
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        fake = Faker()
+        if seed is not None:
+            Faker.seed(seed)
+
+        self.first_names = [fake.first_name() for _ in range(NAME_POOL_SIZE)]
+        self.last_names = [fake.last_name() for _ in range(NAME_POOL_SIZE)]
+        self.schools = [fake.company()[:255] for _ in range(NAME_POOL_SIZE // 10)]
+        self.words = [fake.word()[:64] for _ in range(NAME_POOL_SIZE)]
+        self.sentences = [fake.sentence()[:512] for _ in range(NAME_POOL_SIZE)]
+        self.password = make_password(password)
+        self.run = timezone.now().strftime('%Y%m%d%H%M%S')
+
+    def _bulk_create(self, model, objects):
+        """
+            Writes the objects in batches and returns the ones that were saved, with their primary keys.
+        """
+
+        created = []
+        for batch in _batches(objects, self.batch_size):
+            with transaction.atomic():
+                created.extend(model.objects.bulk_create(batch, batch_size=self.batch_size))
+        return created
+
+    def create_users(self, count):
+        """
+            :param count: Number of users to create, each with a profile.
+            :return: The list of primary keys of the created users.
+        """
+
+        users = (
+            User(
+                username=f'{SEED_PREFIX}{self.run}_{index}',
+                first_name=self.random.choice(self.first_names),
+                last_name=self.random.choice(self.last_names),
+                email=f'{SEED_PREFIX}{self.run}_{index}@example.com',
+                school=self.random.choice(self.schools),
+                user_class=f'{self.random.randint(1, 11)}-{self.random.choice("ABC")}',
+                password=self.password,
+            )
+            for index in range(count)
+        )
+
+        user_ids = []
+        for batch in _batches(users, self.batch_size):
+            with transaction.atomic():
+                created = User.objects.bulk_create(batch, batch_size=self.batch_size)
+                ids = [user.pk for user in created]
+                if None in ids:
+                    # Backends that cannot return the primary keys of bulk inserted rows.
+                    ids = list(User.objects.filter(username__in=[user.username for user in batch]).values_list('pk', flat=True))
+                Profile.objects.bulk_create([Profile(user_id=user_id) for user_id in ids], batch_size=self.batch_size)
+            user_ids.extend(ids)
+            logger.info(f'Seeded {len(user_ids)} users')
+        return user_ids
+
+    def create_tests(self, count, num_questions=10, num_answers=4):
+        """
+            :param count: Number of tests to create.
+            :param num_questions: Number of questions per test, within the limits of Test.
+            :param num_answers: Number of answers per question, within the limits of Question, one of them correct.
+            :return: The list of primary keys of the created tests.
+        """
+
+        tests = self._bulk_create(Test, (
+            Test(
+                title=f'{SEED_PREFIX}{self.run}_{index} {self.random.choice(self.words)}'[:128],
+                description=self.random.choice(self.sentences),
+                level=self.random.choice(Test.LEVEL_CHOICES.values),
+                question_count=num_questions,
+                answer_count=num_questions * num_answers,
+            )
+            for index in range(count)
+        ))
+        test_ids = [test.pk for test in tests]
+        if None in test_ids:
+            test_ids = list(Test.objects.filter(title__startswith=f'{SEED_PREFIX}{self.run}_').values_list('pk', flat=True))
+
+        self._bulk_create(Question, (
+            Question(test_id=test_id, order_number=order_number, text=self.random.choice(self.sentences))
+            for test_id in test_ids
+            for order_number in range(1, num_questions + 1)
+        ))
+
+        question_ids = Question.objects.filter(test_id__in=test_ids).values_list('pk', flat=True).iterator(chunk_size=self.batch_size)
+        answers = (
+            Answer(question_id=question_id, text=self.random.choice(self.words), is_correct=index == correct)
+            for question_id, correct in ((question_id, self.random.randrange(num_answers)) for question_id in question_ids)
+            for index in range(num_answers)
+        )
+        for batch in _batches(answers, self.batch_size):
+            with transaction.atomic():
+                Answer.objects.bulk_create(batch, batch_size=self.batch_size)
+
+        invalidate_catalogue()
+        logger.info(f'Seeded {len(test_ids)} tests')
+        return test_ids
+
+    def create_test_results(self, count, user_ids, test_ids, num_questions=10, days=365, active_ratio=0.05):
+        """
+            Creates finished test runs of random users and tests, spread over the last ``days`` days, and a NEW run for a
+            share of the users.
+
+            create_date and write_date are set with one UPDATE per batch, as bulk_create() fills them with the current time;
+            all runs of a batch therefore share their dates.
+
+            :param count: Number of finished runs.
+            :param user_ids: Primary keys of the users.
+            :param test_ids: Primary keys of the tests.
+            :param num_questions: Number of questions of the tests.
+            :param days: Age in days of the oldest run.
+            :param active_ratio: Share of the users that get an unfinished run, if there are tests.
+            :return: The number of created runs.
+        """
+
+        def finished_runs():
+            for _ in range(count):
+                correct = self.random.randint(0, num_questions)
+                yield TestResult(
+                    user_id=self.random.choice(user_ids),
+                    test_id=self.random.choice(test_ids),
+                    state=TestResult.STATE.FINISHED,
+                    num_correct_answers=correct,
+                    num_incorrect_answers=num_questions - correct,
+                    current_order_number=num_questions,
+                )
+
+        def active_runs():
+            if not test_ids:
+                return
+            for index, user_id in enumerate(user_ids[:int(len(user_ids) * active_ratio)]):
+                # One NEW run per user, see the unique_active_test_result constraint.
+                answered = self.random.randint(0, num_questions - 1)
+                correct = self.random.randint(0, answered)
+                yield TestResult(
+                    user_id=user_id,
+                    test_id=test_ids[index % len(test_ids)],
+                    state=TestResult.STATE.NEW,
+                    num_correct_answers=correct,
+                    num_incorrect_answers=answered - correct,
+                    current_order_number=answered + 1,
+                )
+
+        now = timezone.now()
+        created = 0
+        for batch in _batches(itertools.chain(finished_runs(), active_runs()), self.batch_size):
+            started = now - datetime.timedelta(seconds=self.random.randint(0, days * 24 * 3600))
+            with transaction.atomic():
+                test_results = TestResult.objects.bulk_create(batch, batch_size=self.batch_size)
+                pks = [test_result.pk for test_result in test_results]
+                if None not in pks:
+                    TestResult.objects.filter(pk__in=pks).update(
+                        create_date=started,
+                        write_date=started + datetime.timedelta(seconds=self.random.randint(60, 1800)),
+                    )
+            created += len(batch)
+            logger.info(f'Seeded {created} test results')
+        return created
@@ -1,6 +1,19 @@
+import datetime
 import logging
+import time
 
-from smart_test.models import TestResult, Question
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from smart_test import attempt_state, metrics, scoring
+from smart_test.buffers import AnswerLogBuffer
+from smart_test.cache import get_compiled_test
+from smart_test.models import TestResult, Test, Question, Answer, AnswerLog
+from smart_test.stats import record_finish, record_run
 
 
 logger = logging.getLogger('smart_test')
@@ -15,12 +28,16 @@ class TestRunner:
         :type test_result: TestResult
         :param on_next: Optional function to call after handling the current state.
         :type on_next: callable, optional
+
+        Answers are applied with a conditional UPDATE (see submit()), or kept in the attempt state cache with
+        SMART_TEST_WRITE_BEHIND, so the test result is never saved as a whole while the test is in progress.
     """
 
     def __init__(self, test_result, on_next=None):
         self.test_result = test_result
         self.on_next = on_next
         self.points = 0
+        self.rejected = False
 
     def next(self, context):
         """
@@ -39,37 +56,128 @@ class TestRunner:
 
     def on_new(self, context):
         """
-            :param context: Dictionary containing the user's selected choices for the current question.
+            :param context: Dictionary containing the user's selection for the current question as 'selected_answers', the ids
+            of the selected answers.
             :return: Updates the test result metrics based on the user's answers. Finishes the test if all questions are answered,
-            otherwise moves to the next question.
+            otherwise moves to the next question. A selection of answers of another question (e.g. from a stale page) is
+            rejected and sets ``rejected``.
         """
 
-        selected_choices = context['selected_choices']
-        question = Question.objects.get(
-            test=self.test_result.test,
-            order_number=self.test_result.current_order_number
-        )
+        plan = get_compiled_test(self.test_result.test_id)
+        question = plan.question(self.test_result.current_order_number)
+
+        try:
+            selected_mask = scoring.encode_selection(question.answer_ids, context['selected_answers'])
+        except ValueError as error:
+            logger.warning(f'Submission for test result {self.test_result.pk} rejected: {error}')
+            self.rejected = True
+            return
+
+        self.points = int(scoring.is_correct(question.correct_mask, selected_mask))
+        finished = self.test_result.current_order_number >= plan.question_count
+
+        if not self.submit(self.points, finished):
+            logger.warning(f'Stale submission for test result {self.test_result.pk} ignored')
+            self.points = 0
+            self.test_result.refresh_from_db()
+            if attempt_state.enabled() and self.test_result.state == TestResult.STATE.NEW:
+                attempt_state.apply(self.test_result)
+            return
+
+        answer_log = AnswerLogBuffer(self.test_result)
+        answer_log.add(question.id, selected_mask, bool(self.points))
+        metrics.ANSWERS.inc(correct=bool(self.points))
+
+        if finished:
+            answer_log.flush()
+            record_finish(self.test_result)
+
+    def submit(self, points, finished):
+        """
+            Applies an answer to the test result with a single conditional UPDATE. The row is only changed if it is still NEW
+            and still expects the answered question, so a double submit or a parallel request cannot count the same question twice.
+
+            With SMART_TEST_WRITE_BEHIND the progress is kept in the attempt state cache instead, see submit_write_behind().
+
+            :param points: 1 if the question was answered correctly, otherwise 0.
+            :param finished: Whether the answered question is the last one of the test.
+            :return: True if the answer was applied, False if the test result had already moved on.
+        """
+
+        if attempt_state.enabled():
+            return self.submit_write_behind(points, finished)
+
+        expected_order_number = self.test_result.current_order_number
+        now = timezone.now()
+        changes = {
+            'num_correct_answers': F('num_correct_answers') + points,
+            'num_incorrect_answers': F('num_incorrect_answers') + (1 - points),
+            'write_date': now,
+        }
+        if finished:
+            changes['state'] = TestResult.STATE.FINISHED
+        else:
+            changes['current_order_number'] = F('current_order_number') + 1
+
+        updated = TestResult.objects.filter(
+            pk=self.test_result.pk,
+            state=TestResult.STATE.NEW,
+            current_order_number=expected_order_number,
+        ).update(**changes)
+
+        if not updated:
+            return False
+
+        self.apply(points, finished, now)
+        return True
+
+    def submit_write_behind(self, points, finished):
+        """
+            Applies an answer to the progress kept in the attempt state cache. The database row is only written when the test
+            is finished; in between, the checkpoint_attempt_states task persists the cached progress periodically.
+
+            :param points: 1 if the question was answered correctly, otherwise 0.
+            :param finished: Whether the answered question is the last one of the test.
+            :return: True if the answer was applied, False if the question was already answered by a parallel request.
+        """
+
+        if not attempt_state.claim(self.test_result):
+            return False
+
+        self.apply(points, finished, timezone.now())
 
-        answers = question.answers.all()
+        if not finished:
+            attempt_state.save(self.test_result)
+            return True
 
-        current_choices = sum(
-            answer.is_correct == choice
-            for answer, choice in zip(answers, selected_choices)
+        updated = TestResult.objects.filter(pk=self.test_result.pk, state=TestResult.STATE.NEW).update(
+            num_correct_answers=self.test_result.num_correct_answers,
+            num_incorrect_answers=self.test_result.num_incorrect_answers,
+            current_order_number=self.test_result.current_order_number,
+            state=TestResult.STATE.FINISHED,
+            write_date=self.test_result.write_date,
         )
+        attempt_state.discard(self.test_result)
+        return bool(updated)
 
-        self.points = int(current_choices == len(answers))
+    def apply(self, points, finished, now):
+        """
+            Mirrors an applied answer on the in-memory test result.
 
-        self.test_result.num_correct_answers += self.points
-        self.test_result.num_incorrect_answers += (1 - self.points)
+            :param points: 1 if the question was answered correctly, otherwise 0.
+            :param finished: Whether the answered question is the last one of the test.
+            :param now: The time the answer was applied.
+            :return: None
+        """
 
-        if self.test_result.current_order_number == self.test_result.test.questions.count():
+        self.test_result.num_correct_answers += points
+        self.test_result.num_incorrect_answers += (1 - points)
+        self.test_result.write_date = now
+        if finished:
             self.test_result.state = TestResult.STATE.FINISHED
-
         else:
             self.test_result.current_order_number += 1
 
-        self.test_result.save()
-
     def on_finish(self, context):
         """
             :param context: The context object containing information about the execution state.
@@ -78,3 +186,185 @@ class TestRunner:
 
         self.test_result.state = TestResult.STATE.FINISHED
         self.test_result.save()
+        AnswerLogBuffer(self.test_result).flush()
+
+
+START_TOKEN_SALT = 'smart_test.start_token'
+
+
+def issue_start_token(user, plan):
+    """
+        Issues the token a batch submission of a test is sent back with. The token is signed with SECRET_KEY and carries the
+        time it was issued, so the time spent on the test is measured by the server and not reported by the client.
+
+        :param user: The user who takes the test.
+        :param plan: The CompiledTest of the test.
+        :return: The token.
+    """
+
+    return signing.dumps({'user': user.pk, 'test': plan.id, 'issued_at': timezone.now().timestamp()}, salt=START_TOKEN_SALT)
+
+
+def read_start_token(token, user, plan):
+    """
+        :param token: A token of issue_start_token().
+        :param user: The user who submits the test.
+        :param plan: The CompiledTest of the submitted test.
+        :return: The time the token was issued, that is the time the user started the test.
+        :raises ValueError: If the token is forged, older than SMART_TEST_START_TOKEN_MAX_AGE (1 day by default) or was
+        issued to another user or for another test.
+    """
+
+    max_age = getattr(settings, 'SMART_TEST_START_TOKEN_MAX_AGE', datetime.timedelta(days=1))
+    try:
+        data = signing.loads(token, salt=START_TOKEN_SALT, max_age=max_age)
+    except signing.BadSignature as error:
+        raise ValueError('The start token is invalid or expired.') from error
+
+    if data['user'] != user.pk or data['test'] != plan.id:
+        raise ValueError('The start token was issued for another test.')
+    return datetime.datetime.fromtimestamp(data['issued_at'], tz=datetime.timezone.utc)
+
+
+def submit_test(user, plan, selections, started_at, latencies=None):
+    """
+        Scores a whole test submitted at once and stores it as a finished run with its answer log, in one transaction.
+
+        :param user: The user who took the test.
+        :param plan: The CompiledTest of the taken test.
+        :param selections: A dictionary mapping question ids to the ids of the selected answers. Questions missing from it
+        are scored as answered incorrectly.
+        :param started_at: The time the user started the test, used for the time spent, see read_start_token().
+        :param latencies: Optional dictionary mapping question ids to the seconds spent on them.
+        :return: The finished TestResult.
+    """
+
+    latencies = latencies or {}
+    now = timezone.now()
+
+    logs = []
+    num_correct_answers = 0
+    for question in plan.questions:
+        selected_mask = scoring.encode_selection(question.answer_ids, selections.get(question.id, ()))
+        correct = scoring.is_correct(question.correct_mask, selected_mask)
+        num_correct_answers += correct
+        latency = latencies.get(question.id)
+        logs.append(AnswerLog(
+            question_id=question.id,
+            selected_mask=selected_mask,
+            is_correct=correct,
+            latency=datetime.timedelta(seconds=latency) if latency is not None else None,
+            answered_at=now,
+        ))
+
+    with transaction.atomic():
+        test_result = TestResult.objects.create(
+            user=user,
+            test_id=plan.id,
+            state=TestResult.STATE.FINISHED,
+            num_correct_answers=num_correct_answers,
+            num_incorrect_answers=plan.question_count - num_correct_answers,
+            current_order_number=max(plan.question_count, 1),
+        )
+        if started_at < test_result.create_date:
+            TestResult.objects.filter(pk=test_result.pk).update(create_date=started_at)
+            test_result.create_date = started_at
+
+        for log in logs:
+            log.test_result = test_result
+        AnswerLog.objects.bulk_create(logs)
+
+        record_run(test_result)
+        record_finish(test_result)
+
+    metrics.ANSWERS.inc(num_correct_answers, correct=True)
+    metrics.ANSWERS.inc(plan.question_count - num_correct_answers, correct=False)
+
+    return test_result
+
+
+def _actual_counts():
+    """
+        :return: Subquery expressions counting the questions and answers of the outer Test, keyed by the counter field name.
+    """
+
+    questions = Question.objects.filter(test=OuterRef('pk')).order_by().values('test').annotate(
+        total=Count('pk')).values('total')
+    answers = Answer.objects.filter(question__test=OuterRef('pk')).order_by().values('question__test').annotate(
+        total=Count('pk')).values('total')
+
+    return {
+        'question_count': Coalesce(Subquery(questions), Value(0)),
+        'answer_count': Coalesce(Subquery(answers), Value(0)),
+    }
+
+
+def counted_tests(tests=None):
+    """
+        :param tests: Optional queryset of Test objects, all tests by default.
+        :return: The queryset annotated with the actual number of questions and answers as 'actual_question_count' and
+        'actual_answer_count'.
+    """
+
+    if tests is None:
+        tests = Test.objects.all()
+
+    return tests.annotate(**{f'actual_{field}': expression for field, expression in _actual_counts().items()})
+
+
+def recount_tests(tests=None):
+    """
+        Recomputes the denormalized question_count and answer_count of tests with a single UPDATE.
+
+        :param tests: Optional queryset of Test objects, all tests by default.
+        :return: The number of updated tests.
+    """
+
+    if tests is None:
+        tests = Test.objects.all()
+
+    return tests.update(**_actual_counts())
+
+
+def purge_outdated_test_results(outdated_after=None, chunk_size=None, pause=None):
+    """
+        Deletes NEW test runs that have not been updated for a while, in chunks of primary keys so that no single statement
+        loads or locks the whole set. Every chunk is deleted in its own transaction, so an interrupted purge keeps what it
+        has done and the next one resumes with the remaining rows.
+
+        :param outdated_after: Age (timedelta) of the last update after which a NEW run is outdated,
+        SMART_TEST_OUTDATED_AFTER or 7 days by default.
+        :param chunk_size: Number of runs deleted per transaction, SMART_TEST_PURGE_CHUNK_SIZE or 1000 by default.
+        :param pause: Seconds to sleep between two chunks, SMART_TEST_PURGE_PAUSE or 0.1 by default.
+        :return: A tuple (deleted runs, duration in seconds).
+    """
+
+    if outdated_after is None:
+        outdated_after = getattr(settings, 'SMART_TEST_OUTDATED_AFTER', datetime.timedelta(days=7))
+    chunk_size = chunk_size or getattr(settings, 'SMART_TEST_PURGE_CHUNK_SIZE', 1000)
+    pause = getattr(settings, 'SMART_TEST_PURGE_PAUSE', 0.1) if pause is None else pause
+
+    started = time.monotonic()
+    outdated = TestResult.objects.filter(state=TestResult.STATE.NEW, write_date__lte=timezone.now() - outdated_after)
+    deleted = 0
+    last_pk = 0
+
+    while True:
+        pks = list(outdated.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            break
+        last_pk = pks[-1]
+
+        with transaction.atomic():
+            # The condition is checked again, a run may have been continued since the chunk was selected.
+            _, per_model = outdated.filter(pk__in=pks).delete()
+        deleted += per_model.get(TestResult._meta.label, 0)
+        logger.info(f'Purged {deleted} outdated test results so far, up to pk {last_pk}')
+
+        if len(pks) < chunk_size:
+            break
+        time.sleep(pause)
+
+    duration = time.monotonic() - started
+    logger.info(f'Purged {deleted} outdated test results in {duration:.2f}s')
+    return deleted, duration
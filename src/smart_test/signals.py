@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.renditions import schedule_renditions
+from smart_test.cache import invalidate_test, invalidate_catalogue
+from smart_test.models import Test, Question, Answer, Topic
+from smart_test.services import recount_tests
+from smart_test.tasks import generate_test_renditions
+
+
+def _invalidate(test_id):
+    """
+        Invalidates the compiled plan right away and once more after the transaction commits, so that a plan compiled
+        by another process from not yet committed data is not kept.
+    """
+
+    if test_id is None:
+        return
+    invalidate_test(test_id)
+    transaction.on_commit(lambda: invalidate_test(test_id))
+
+
+@receiver([post_save, post_delete], sender=Test)
+def invalidate_test_plan(sender, instance, **kwargs):
+    """
+        Invalidates the compiled plan of a test after the test is saved or deleted.
+    """
+
+    _invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Test)
+@receiver([post_save, post_delete], sender=Topic)
+def invalidate_test_catalogue(sender, instance, **kwargs):
+    """
+        Marks the test catalogue as changed after a test or a topic is saved or deleted.
+    """
+
+    invalidate_catalogue()
+    transaction.on_commit(invalidate_catalogue)
+
+
+@receiver(post_save, sender=Test)
+def generate_test_image_renditions(sender, instance, raw=False, **kwargs):
+    """
+        Generates the renditions of the image of a test after a new image is saved.
+    """
+
+    if not raw:
+        schedule_renditions(instance, generate_test_renditions)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question_plan(sender, instance, **kwargs):
+    """
+        Invalidates the compiled plan of the test a question belongs to after the question is saved or deleted.
+    """
+
+    _invalidate(instance.test_id)
+
+
+@receiver([post_save, post_delete], sender=Answer)
+def invalidate_answer_plan(sender, instance, **kwargs):
+    """
+        Invalidates the compiled plan of the test an answer belongs to after the answer is saved or deleted.
+    """
+
+    _invalidate(_answer_test_id(instance))
+
+
+@receiver(post_save, sender=Question)
+def increment_question_count(sender, instance, created, raw=False, **kwargs):
+    """
+        Increments the question_count of the test when a question is created. Rows loaded from fixtures are recounted
+        instead, as the fixture may or may not carry the counters already.
+    """
+
+    if raw:
+        recount_tests(Test.objects.filter(pk=instance.test_id))
+    elif created:
+        Test.objects.filter(pk=instance.test_id).update(question_count=F('question_count') + 1)
+
+
+@receiver(post_delete, sender=Question)
+def decrement_question_count(sender, instance, **kwargs):
+    """
+        Decrements the question_count of the test when a question is deleted. The answer_count is decremented by the
+        post_delete of every cascaded answer.
+    """
+
+    Test.objects.filter(pk=instance.test_id, question_count__gt=0).update(question_count=F('question_count') - 1)
+
+
+@receiver(post_save, sender=Answer)
+def increment_answer_count(sender, instance, created, raw=False, **kwargs):
+    """
+        Increments the answer_count of the test when an answer is created, or recounts it for rows loaded from fixtures.
+    """
+
+    if raw:
+        recount_tests(Test.objects.filter(questions=instance.question_id))
+    elif created:
+        Test.objects.filter(questions=instance.question_id).update(answer_count=F('answer_count') + 1)
+
+
+@receiver(post_delete, sender=Answer)
+def decrement_answer_count(sender, instance, **kwargs):
+    """
+        Decrements the answer_count of the test when an answer is deleted.
+    """
+
+    Test.objects.filter(pk=_answer_test_id(instance), answer_count__gt=0).update(answer_count=F('answer_count') - 1)
+
+
+def _answer_test_id(answer):
+    if Answer.question.is_cached(answer):
+        return answer.question.test_id
+    return Question.objects.filter(pk=answer.question_id).values_list('test_id', flat=True).first()
@@ -0,0 +1,133 @@
+import datetime
+
+from django.db import transaction
+from django.db.models import BooleanField, Count, ExpressionWrapper, DurationField, F, Max, Q, Sum
+
+from smart_test import metrics
+from smart_test.rating import record_rating
+from smart_test.models import TestStats, TestResult, TestResultArchive, Test
+
+
+def _duration_key(duration):
+    # A run without a known start (created and finished at once, as batch submissions without a start token were) takes
+    # no time at all: among equal points it never beats a run with a known start.
+    return not duration, duration
+
+
+def record_run(test_result):
+    """
+        Counts a newly started test run in the statistics of its test.
+
+        :param test_result: The TestResult that was just created.
+        :return: None
+    """
+
+    with transaction.atomic():
+        stats, _ = TestStats.objects.select_for_update().get_or_create(test_id=test_result.test_id)
+        stats.runs += 1
+        stats.last_run = test_result.write_date
+        stats.save(update_fields=['runs', 'last_run'])
+    transaction.on_commit(metrics.TESTS_STARTED.inc)
+
+
+def record_finish(test_result):
+    """
+        Updates the statistics of a test with a test run that was just finished: the number of finishes, the average score,
+        the date of the last run and the best result. Then updates the rating of the user, see smart_test.rating.
+
+        :param test_result: The finished TestResult.
+        :return: None
+    """
+
+    points = test_result.points()
+    duration = test_result.write_date - test_result.create_date
+    question_count = test_result.test.question_count
+    score = test_result.num_correct_answers / question_count * 100 if question_count else 0
+
+    with transaction.atomic():
+        stats, _ = TestStats.objects.select_for_update().get_or_create(test_id=test_result.test_id)
+        stats.finishes += 1
+        stats.average_score += (score - stats.average_score) / stats.finishes
+        stats.last_run = test_result.write_date
+
+        if (stats.best_points is None or points > stats.best_points
+                or (points == stats.best_points and _duration_key(duration) < _duration_key(stats.best_duration))):
+            stats.best_user_id = test_result.user_id
+            stats.best_points = points
+            stats.best_duration = duration
+
+        stats.save()
+        record_rating(test_result, stats)
+    transaction.on_commit(metrics.TESTS_FINISHED.inc)
+
+
+def rebuild_stats(tests=None):
+    """
+        Recomputes the statistics of tests from their TestResult rows and archived runs, e.g. after results were imported
+        in bulk.
+
+        :param tests: Optional queryset of Test objects, all tests by default.
+        :return: The number of rebuilt TestStats rows.
+    """
+
+    if tests is None:
+        tests = Test.objects.all()
+
+    archived = TestResultArchive.objects.filter(test__in=tests)
+    finished = Q(test_results__state=TestResult.STATE.FINISHED)
+    tests = tests.annotate(
+        num_runs=Count('test_results'),
+        num_finishes=Count('test_results', filter=finished),
+        total_correct=Sum('test_results__num_correct_answers', filter=finished),
+        last_write_date=Max('test_results__write_date'),
+    )
+
+    archives = {
+        row['test_id']: row
+        for row in archived.values('test_id').annotate(
+            count=Count('id'), total_points=Sum('points'), last_finished_at=Max('finished_at'))
+    }
+
+    rebuilt = 0
+    for test in tests.iterator():
+        candidates = []
+        best = TestResult.objects.filter(test=test, state=TestResult.STATE.FINISHED).annotate(
+            points_diff=F('num_correct_answers') - F('num_incorrect_answers'),
+            duration=ExpressionWrapper(F('write_date') - F('create_date'), output_field=DurationField()),
+            unknown_start=ExpressionWrapper(Q(write_date__lte=F('create_date')), output_field=BooleanField()),
+        ).order_by('-points_diff', 'unknown_start', 'duration').first()
+        if best:
+            candidates.append((best.points(), best.duration, best.user_id))
+
+        runs, finishes, total_correct, last_run = test.num_runs, test.num_finishes, test.total_correct or 0, test.last_write_date
+        archive = archives.get(test.pk)
+        if archive:
+            best_archived = TestResultArchive.objects.filter(test=test).annotate(
+                unknown_start=ExpressionWrapper(Q(duration__lte=datetime.timedelta(0)), output_field=BooleanField()),
+            ).order_by('-points', 'unknown_start', 'duration').first()
+            candidates.append((max(0, best_archived.points), best_archived.duration, best_archived.user_id))
+            runs += archive['count']
+            finishes += archive['count']
+            # Every question of a finished run is answered, so its correct answers follow from its points.
+            total_correct += (archive['total_points'] + archive['count'] * test.question_count) / 2
+            last_run = max(filter(None, (last_run, archive['last_finished_at'])))
+
+        average_score = 0
+        if finishes and test.question_count:
+            average_score = total_correct / finishes / test.question_count * 100
+
+        best_points, best_duration, best_user_id = min(
+            candidates, key=lambda candidate: (-candidate[0], _duration_key(candidate[1])), default=(None, None, None))
+
+        TestStats.objects.update_or_create(test=test, defaults={
+            'runs': runs,
+            'finishes': finishes,
+            'last_run': last_run,
+            'average_score': average_score,
+            'best_user_id': best_user_id,
+            'best_points': best_points,
+            'best_duration': best_duration,
+        })
+        rebuilt += 1
+
+    return rebuilt
@@ -1,25 +1,133 @@
-import datetime
+import logging
+from contextlib import contextmanager
 
 from celery.app import shared_task
+from django.core.cache import cache
 
-from smart_test.models import TestResult
+from core.renditions import update_renditions
+from smart_test import attempt_state
+from smart_test.archive import archive_finished_test_results
+from smart_test.cache import invalidate_catalogue
+from smart_test.models import Test
+from smart_test.rating import recompute_ratings
+from smart_test.services import purge_outdated_test_results
+
+
+logger = logging.getLogger('smart_test')
+
+CLEANUP_LOCK_KEY = 'smart_test:cleanup_outdated_test_results:lock'
+CLEANUP_LOCK_TIMEOUT = 4 * 3600
+ARCHIVE_LOCK_KEY = 'smart_test:archive_finished_test_results:lock'
+ARCHIVE_LOCK_TIMEOUT = 12 * 3600
+RATING_LOCK_KEY = 'smart_test:recompute_ratings:lock'
+RATING_LOCK_TIMEOUT = 6 * 3600
+
+
+@contextmanager
+def single_run(lock_key, timeout):
+    """
+        Lets only one run of a periodic task proceed at a time: the first run takes a lock in the cache and releases it when
+        it is done, runs started in the meantime are skipped. The lock expires after ``timeout`` seconds in case its run
+        was killed.
+
+        :param lock_key: The cache key of the lock.
+        :param timeout: Seconds after which the lock expires.
+        :return: A context manager yielding True if the lock was taken, False if another run holds it.
+    """
+
+    if not cache.add(lock_key, 1, timeout=timeout):
+        yield False
+        return
+
+    try:
+        yield True
+    finally:
+        cache.delete(lock_key)
 
 
 @shared_task
 def cleanup_outdated_test_results():
     """
         Celery shared task to clean up outdated test results.
-        It filters and deletes `TestResult` objects which are in the 'NEW' state
-        and have not been updated within the last 7 days.
+        It deletes `TestResult` objects which are in the 'NEW' state and have not been updated within the last 7 days,
+        in throttled chunks (see purge_outdated_test_results), one run at a time (see single_run).
+
+        :return: The number of deleted test results, or None if another cleanup is running.
+    """
+
+    with single_run(CLEANUP_LOCK_KEY, CLEANUP_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            logger.info('Cleanup of outdated test results is already running, skipped')
+            return None
+        deleted, duration = purge_outdated_test_results()
+
+    logger.info(f'Outdated test_results deleted: {deleted} in {duration:.2f}s')
+    return deleted
+
+
+@shared_task
+def checkpoint_attempt_states():
+    """
+        Celery shared task persisting the progress of test runs kept in the attempt state cache (SMART_TEST_WRITE_BEHIND)
+        to the database.
+
+        :return: The number of updated TestResult rows.
+    """
 
-        :return: None
+    if not attempt_state.enabled():
+        return 0
+
+    return attempt_state.checkpoint()
+
+
+@shared_task
+def archive_finished_test_results_task():
+    """
+        Celery shared task moving old finished test runs into the archive table (see archive_finished_test_results), one
+        run at a time (see single_run).
+
+        :return: The number of archived test results, or None if another archival is running.
+    """
+
+    with single_run(ARCHIVE_LOCK_KEY, ARCHIVE_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            logger.info('Archival of finished test results is already running, skipped')
+            return None
+        archived = archive_finished_test_results()
+
+    logger.info(f'Finished test_results archived: {archived}')
+    return archived
+
+
+@shared_task
+def recompute_ratings_task():
+    """
+        Celery shared task recomputing the ratings of all users from their whole history (see recompute_ratings), which
+        rates all runs against the current difficulty of the tests.
+
+        :return: The number of rated users, or None if another recompute is running, see single_run.
+    """
+
+    with single_run(RATING_LOCK_KEY, RATING_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            logger.info('Recompute of the ratings is already running, skipped')
+            return None
+        return recompute_ratings()
+
+
+@shared_task
+def generate_test_renditions(test_id):
     """
+        Celery shared task generating the resized variants of the image of a test (see core.renditions) after it was
+        uploaded. The catalogue is invalidated, so that API clients receive the new renditions.
 
-    outdated_tests = TestResult.objects.filter(
-        state=TestResult.STATE.NEW,
-        write_date__lte=datetime.datetime.now() - datetime.timedelta(seconds=7*24*3600),
-    )
+        :param test_id: The identifier of the test.
+        :return: True if the renditions were updated.
+    """
 
-    outdated_tests.delete()
+    test = Test.objects.filter(pk=test_id).only('pk', 'image', 'renditions').first()
+    if test is None or not update_renditions(test):
+        return False
 
-    print('Outdated test_results deleted!')
+    invalidate_catalogue()
+    return True
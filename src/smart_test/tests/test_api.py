@@ -0,0 +1,224 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from smart_test.models import Test, TestResult, TestStats
+
+
+class TestCatalogueApiTests(TestCase):
+    """
+        Tests for the REST test catalogue.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_cursor_pagination_and_fields:
+            Checks that the catalogue is paginated with a cursor and that ``?fields=`` limits the serialized fields.
+
+        test_not_modified:
+            Checks that a conditional request is answered with 304 until a test is changed.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Clears the shared cache and authenticates the API client as the admin user.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(username='admin'))
+        self.url = reverse('api_smart_test:test_list')
+
+    def test_cursor_pagination_and_fields(self):
+        """
+            Requests one test per page with only the id and title fields.
+
+            :return: None
+        """
+
+        response = self.client.get(self.url, {'page_size': 1, 'fields': 'id,title'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+        self.assertEqual(response.data['results'][0]['title'], Test.objects.order_by('title', 'id').first().title)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_not_modified(self):
+        """
+            Repeats a request with the received ETag before and after a test is renamed.
+
+            :return: None
+        """
+
+        response = self.client.get(self.url)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        test = Test.objects.first()
+        test.title = 'Renamed'
+        test.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class TestBatchApiTests(TestCase):
+    """
+        Tests for the full test payload and the batch submission endpoints.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_payload_hides_correctness:
+            Checks that the payload lists all questions and answers without telling which answers are correct.
+
+        test_submit_scores_all_answers:
+            Checks that a submission with all correct answers is stored as a finished run with full points.
+
+        test_submit_outdated_version:
+            Checks that a submission for an outdated version of the test is rejected with 409.
+
+        test_submit_foreign_answer:
+            Checks that a submission selecting an answer of another question is rejected with 400.
+
+        test_submit_without_start_token:
+            Checks that a submission without a start token of the server, which would have no measured duration, is
+            rejected and cannot take over the best result.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Clears the shared cache and authenticates the API client as the admin user.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(username='admin'))
+        self.test = Test.objects.first()
+
+    def test_payload_hides_correctness(self):
+        """
+            Fetches the payload of a test.
+
+            :return: None
+        """
+
+        response = self.client.get(reverse('api_smart_test:test_payload', kwargs={'pk': self.test.id}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['questions']), self.test.question_count)
+        self.assertEqual(set(response.data['questions'][0]['answers'][0]), {'id', 'text'})
+
+    def test_submit_scores_all_answers(self):
+        """
+            Submits the correct answers of every question at once.
+
+            :return: None
+        """
+
+        payload = self.client.get(reverse('api_smart_test:test_payload', kwargs={'pk': self.test.id})).data
+        answers = [
+            {
+                'question': question.id,
+                'selected': list(question.answers.filter(is_correct=True).values_list('id', flat=True)),
+            }
+            for question in self.test.questions.all()
+        ]
+
+        response = self.client.post(
+            reverse('api_smart_test:test_submit', kwargs={'pk': self.test.id}),
+            data={'version': payload['version'], 'start_token': payload['start_token'], 'answers': answers},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['points'], self.test.question_count)
+        test_result = TestResult.objects.get(pk=response.data['id'])
+        self.assertEqual(test_result.state, TestResult.STATE.FINISHED)
+        self.assertEqual(test_result.answer_logs.count(), self.test.question_count)
+
+    def test_submit_outdated_version(self):
+        """
+            Submits answers with a version the test no longer has.
+
+            :return: None
+        """
+
+        payload = self.client.get(reverse('api_smart_test:test_payload', kwargs={'pk': self.test.id})).data
+
+        response = self.client.post(
+            reverse('api_smart_test:test_submit', kwargs={'pk': self.test.id}),
+            data={'version': payload['version'] - 1, 'start_token': payload['start_token'], 'answers': []},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 409)
+
+    def test_submit_foreign_answer(self):
+        """
+            Submits the first question with an answer of the second question.
+
+            :return: None
+        """
+
+        first, second = self.test.questions.order_by('order_number')[:2]
+        runs = TestResult.objects.count()
+
+        response = self.client.post(
+            reverse('api_smart_test:test_submit', kwargs={'pk': self.test.id}),
+            data={'answers': [{'question': first.id, 'selected': [second.answers.first().id]}]},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown answers', str(response.data['answers']))
+        self.assertEqual(TestResult.objects.count(), runs)
+
+    def test_submit_without_start_token(self):
+        """
+            Lets another user hold the best result, then submits a perfect run without a start token and with the token of
+            another test.
+
+            :return: None
+        """
+
+        other = User.objects.create(username='best_user')
+        TestStats.objects.update_or_create(test=self.test, defaults={
+            'best_user': other,
+            'best_points': self.test.question_count,
+            'best_duration': datetime.timedelta(minutes=1),
+        })
+        answers = [
+            {'question': question.id, 'selected': list(question.answers.filter(is_correct=True).values_list('id', flat=True))}
+            for question in self.test.questions.all()
+        ]
+        another_test = Test.objects.exclude(pk=self.test.pk).first()
+        foreign_token = self.client.get(reverse('api_smart_test:test_payload', kwargs={'pk': another_test.id})).data['start_token']
+
+        for data in ({'answers': answers}, {'start_token': foreign_token, 'answers': answers}, {'start_token': 'forged', 'answers': answers}):
+            response = self.client.post(reverse('api_smart_test:test_submit', kwargs={'pk': self.test.id}), data=data, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('start_token', response.data)
+
+        self.assertEqual(TestStats.objects.get(test=self.test).best_user, other)
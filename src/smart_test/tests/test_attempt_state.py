@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from smart_test import attempt_state
+from smart_test.models import Test, TestResult
+from smart_test.services import TestRunner
+from smart_test.tasks import checkpoint_attempt_states
+from smart_test.tests.test_views import answer_form
+
+
+@override_settings(SMART_TEST_WRITE_BEHIND=True)
+class WriteBehindAttemptStateTests(TestCase):
+    """
+        Tests for the write-behind attempt state store, using the local in-memory cache in place of Redis.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_progress_kept_in_cache:
+            Checks that answering questions does not write the run to the database until it is checkpointed or finished.
+
+        test_double_submit_counted_once:
+            Checks that answering the same question from two stale copies of a run counts it only once.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    TEST_ID = 1
+
+    def setUp(self):
+        """
+            Clears the shared cache and logs in with the credentials of the 'admin' user.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.client = Client()
+        self.client.login(username='admin', password='admin')
+
+    def answer(self):
+        url = reverse('tests:next', kwargs={'id': self.TEST_ID})
+        return self.client.post(path=url, data=answer_form(self.client.get(url)))
+
+    def test_progress_kept_in_cache(self):
+        """
+            Answers the first question, checkpoints the progress and finishes the test.
+
+            :return: None
+        """
+
+        self.client.get(reverse('tests:start', kwargs={'id': self.TEST_ID}))
+        test_result = TestResult.objects.get(user__username='admin', test_id=self.TEST_ID, state=TestResult.STATE.NEW)
+
+        self.answer()
+        test_result.refresh_from_db()
+        self.assertEqual(test_result.current_order_number, 1)
+
+        response = self.client.get(reverse('tests:next', kwargs={'id': self.TEST_ID}))
+        self.assertEqual(response.context['question'].order_number, 2)
+
+        self.assertEqual(checkpoint_attempt_states(), 1)
+        test_result.refresh_from_db()
+        self.assertEqual(test_result.current_order_number, 2)
+
+        for _ in range(Test.objects.get(id=self.TEST_ID).question_count - 1):
+            response = self.answer()
+
+        self.assertContains(response, 'Congratulations!!!')
+        test_result.refresh_from_db()
+        self.assertEqual(test_result.state, TestResult.STATE.FINISHED)
+        self.assertEqual(test_result.num_correct_answers + test_result.num_incorrect_answers,
+                         Test.objects.get(id=self.TEST_ID).question_count)
+
+    def test_double_submit_counted_once(self):
+        """
+            Answers the first question with two copies of the same run, as two parallel requests would.
+
+            :return: None
+        """
+
+        test = Test.objects.get(id=self.TEST_ID)
+        user = User.objects.get(username='admin')
+        TestResult.objects.filter(user=user, test=test, state=TestResult.STATE.NEW).delete()
+        test_result = TestResult.objects.create(user=user, test=test, current_order_number=1)
+        question = test.questions.get(order_number=1)
+        context = {
+            'selected_answers': [answer.id for answer in question.answers.filter(is_correct=True)]
+        }
+
+        copies = [attempt_state.apply(TestResult.objects.get(pk=test_result.pk)) for _ in range(2)]
+        for copy in copies:
+            TestRunner(test_result=copy).next(context=context)
+
+        attempt_state.apply(test_result)
+        self.assertEqual(test_result.current_order_number, 2)
+        self.assertEqual(test_result.num_correct_answers + test_result.num_incorrect_answers, 1)
@@ -0,0 +1,125 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase
+
+from smart_test.benchmark import BenchmarkRecorder, compare_with_baseline, percentile, run_benchmark, seed_benchmark_data, \
+    take_test, unfinished_runs
+from smart_test.models import TestResult
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class BenchmarkReportTests(SimpleTestCase):
+    """
+        Tests for the reporting helpers of the benchmark harness.
+
+        test_percentile:
+            Checks the nearest-rank percentiles.
+
+        test_recorder_report:
+            Checks that the recorder counts failed requests as errors and reports the successful ones.
+
+        test_compare_with_baseline:
+            Checks that more queries per request or a slower p95 than allowed are reported as regressions.
+    """
+
+    def test_percentile(self):
+        """
+            Computes percentiles of 1..100, of a single value and of no values.
+
+            :return: None
+        """
+
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_recorder_report(self):
+        """
+            Records a redirect and a server error for the start view.
+
+            :return: None
+        """
+
+        recorder = BenchmarkRecorder()
+        recorder.request('start', lambda: FakeResponse(302))
+        recorder.request('start', lambda: FakeResponse(500))
+
+        report = recorder.report(wall_time=2)
+        self.assertEqual(report['start']['requests'], 1)
+        self.assertEqual(report['start']['errors'], 1)
+        self.assertEqual(report['start']['rps'], 0.5)
+        self.assertEqual(report['finish']['requests'], 0)
+
+    def test_compare_with_baseline(self):
+        """
+            Compares a slightly slower and a clearly worse result with the same baseline.
+
+            :return: None
+        """
+
+        baseline = {'views': {'answer': {'requests': 10, 'p95_ms': 10.0, 'queries': 4.0}}}
+        same = {'views': {'answer': {'requests': 10, 'p95_ms': 11.0, 'queries': 4.0}}}
+        worse = {'views': {'answer': {'requests': 10, 'p95_ms': 13.0, 'queries': 5.0}}}
+
+        self.assertEqual(compare_with_baseline(same, baseline, max_regression=20), [])
+        self.assertEqual(len(compare_with_baseline(worse, baseline, max_regression=20)), 2)
+
+
+class BenchmarkFlowTests(TransactionTestCase):
+    """
+        End-to-end tests of the simulated test-taking flow. The takers run in their own threads and close their database
+        connections, so the data is committed instead of being rolled back after every test.
+
+        test_take_test_finishes:
+            Checks that a taker answers every question and finishes the test, without errors.
+
+        test_run_benchmark:
+            Checks that all runs of a benchmark are finished and every request is recorded as a success.
+    """
+
+    def setUp(self):
+        """
+            Clears the shared cache and seeds two users and a test of 3 questions with 3 answers each.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.users, self.tests = seed_benchmark_data(2, 1, num_questions=3, num_answers=3, seed=1)
+
+    def test_take_test_finishes(self):
+        """
+            Lets the first user take the test.
+
+            :return: None
+        """
+
+        recorder = BenchmarkRecorder()
+
+        self.assertTrue(take_test(recorder, self.users[0], self.tests[0].id))
+
+        test_result = TestResult.objects.get(user=self.users[0], test=self.tests[0])
+        self.assertEqual(test_result.state, TestResult.STATE.FINISHED)
+        self.assertEqual(test_result.num_correct_answers + test_result.num_incorrect_answers, 3)
+        self.assertEqual(sum(recorder.errors.values()), 0)
+        self.assertEqual([len(recorder.samples[view]) for view in ('start', 'question', 'answer', 'finish')], [1, 3, 2, 1])
+
+    def test_run_benchmark(self):
+        """
+            Runs a benchmark of both users with one taker at a time.
+
+            :return: None
+        """
+
+        result = run_benchmark(self.users, self.tests, concurrency=1, seed=1)
+
+        self.assertEqual(unfinished_runs(), 0)
+        self.assertEqual(TestResult.objects.filter(state=TestResult.STATE.FINISHED).count(), 2)
+        self.assertEqual({view: row['errors'] for view, row in result['views'].items()},
+                         {'start': 0, 'question': 0, 'answer': 0, 'finish': 0})
+        self.assertEqual(result['views']['finish']['requests'], 2)
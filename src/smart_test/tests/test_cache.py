@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from smart_test.cache import get_compiled_test
+from smart_test.models import Test, Answer
+
+
+class CompiledTestCacheTests(TestCase):
+    """
+        Tests for the compiled test plan cache.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_plan_matches_database:
+            Checks that the compiled plan holds the questions in order with their answer ids and correctness bitmask.
+
+        test_warm_plan_needs_no_queries:
+            Checks that a compiled plan is served from memory without touching the database.
+
+        test_answer_save_invalidates_plan:
+            Checks that saving an answer produces a new plan version with the updated correctness bitmask.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Clears the shared cache and picks the first Test from the database.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.test = Test.objects.first()
+
+    def test_plan_matches_database(self):
+        """
+            Compares the compiled plan with the questions and answers stored in the database.
+
+            :return: None
+        """
+
+        plan = get_compiled_test(self.test.id)
+        questions = self.test.questions.order_by('order_number')
+
+        self.assertEqual(plan.question_count, questions.count())
+        for compiled, question in zip(plan.questions, questions):
+            answers = list(question.answers.order_by('id'))
+            self.assertEqual(compiled.order_number, question.order_number)
+            self.assertEqual(compiled.answer_ids, tuple(answer.id for answer in answers))
+            for index, answer in enumerate(answers):
+                self.assertEqual(bool(compiled.correct_mask >> index & 1), answer.is_correct)
+
+    def test_warm_plan_needs_no_queries(self):
+        """
+            Checks that the second lookup of a plan does not run any query.
+
+            :return: None
+        """
+
+        get_compiled_test(self.test.id)
+        with self.assertNumQueries(0):
+            get_compiled_test(self.test.id)
+
+    def test_answer_save_invalidates_plan(self):
+        """
+            Flips the correctness of an answer and checks that the plan is recompiled.
+
+            :return: None
+        """
+
+        plan = get_compiled_test(self.test.id)
+        answer = Answer.objects.filter(question__test=self.test).order_by('question__order_number', 'id').first()
+        answer.is_correct = not answer.is_correct
+        answer.save()
+
+        new_plan = get_compiled_test(self.test.id)
+        self.assertNotEqual(plan.version, new_plan.version)
+        self.assertNotEqual(plan.questions[0].correct_mask, new_plan.questions[0].correct_mask)
@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from smart_test.models import Test, Question, Answer
+
+
+class TestCountersTests(TestCase):
+    """
+        Tests for the denormalized question_count and answer_count of Test.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_counters_follow_questions_and_answers:
+            Checks that creating and deleting questions and answers keeps the counters in sync.
+
+        test_recount_command:
+            Checks that the recount_tests command detects drift with --check and fixes it otherwise.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Picks the first Test from the database.
+
+            :return: None
+        """
+
+        self.test = Test.objects.first()
+
+    def assertCountersMatch(self):
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.question_count, self.test.questions.count())
+        self.assertEqual(self.test.answer_count, Answer.objects.filter(question__test=self.test).count())
+
+    def test_counters_follow_questions_and_answers(self):
+        """
+            Adds a question with answers, then deletes an answer and the question.
+
+            :return: None
+        """
+
+        self.assertCountersMatch()
+
+        question = Question.objects.create(test=self.test, order_number=self.test.question_count + 1, text='New')
+        answers = [Answer.objects.create(question=question, text=str(index), is_correct=index == 0) for index in range(3)]
+        self.assertCountersMatch()
+
+        answers[0].delete()
+        self.assertCountersMatch()
+
+        question.delete()
+        self.assertCountersMatch()
+
+    def test_recount_command(self):
+        """
+            Corrupts the counters and runs the command in check and fix modes.
+
+            :return: None
+        """
+
+        Test.objects.filter(pk=self.test.pk).update(question_count=0, answer_count=0)
+
+        with self.assertRaises(CommandError):
+            call_command('recount_tests', '--check', stdout=StringIO())
+
+        call_command('recount_tests', stdout=StringIO())
+        self.assertCountersMatch()
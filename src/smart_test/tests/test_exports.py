@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from accounts.models import User
+from smart_test.exports import EXPORT_FIELDS
+from smart_test.models import Test, TestResult
+
+
+class TestResultExportTests(TestCase):
+    """
+        Tests for the streaming export of test results.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_csv_export:
+            Checks that the view streams a CSV file with a header and one row per test result.
+
+        test_ndjson_filtered_export:
+            Checks that the NDJSON export only contains the results of the requested test.
+
+        test_export_requires_permission:
+            Checks that users without access to test results cannot export them and that invalid filters are rejected.
+
+        test_export_command:
+            Checks that the management command writes the same rows as the view.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Logs in with the credentials of the 'admin' user.
+
+            :return: None
+        """
+
+        self.client = Client()
+        self.client.login(username='admin', password='admin')
+
+    def test_csv_export(self):
+        """
+            Downloads all results as CSV and parses the streamed content.
+
+            :return: None
+        """
+
+        response = self.client.get(reverse('tests:results_export'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(tuple(rows[0]), EXPORT_FIELDS)
+        self.assertEqual(len(rows) - 1, TestResult.objects.count())
+
+    def test_ndjson_filtered_export(self):
+        """
+            Downloads the results of the first test as NDJSON.
+
+            :return: None
+        """
+
+        test = Test.objects.first()
+        response = self.client.get(reverse('tests:results_export'), {'format': 'ndjson', 'test': test.id, 'date_from': '2000-01-01'})
+        self.assertEqual(response.status_code, 200)
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), TestResult.objects.filter(test=test).count())
+        self.assertTrue(all(row['test_id'] == test.id for row in rows))
+
+    def test_export_requires_permission(self):
+        """
+            Requests the export with invalid parameters, then as a user without permissions.
+
+            :return: None
+        """
+
+        self.assertEqual(self.client.get(reverse('tests:results_export'), {'date_to': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('tests:results_export'), {'format': 'xlsx'}).status_code, 400)
+
+        User.objects.create_user(username='student', password='student')
+        self.client.login(username='student', password='student')
+        self.assertEqual(self.client.get(reverse('tests:results_export')).status_code, 403)
+
+    def test_export_command(self):
+        """
+            Runs the command with NDJSON output and compares the exported ids with the database.
+
+            :return: None
+        """
+
+        stdout = io.StringIO()
+        call_command('export_test_results', '--format', 'ndjson', stdout=stdout)
+
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([row['id'] for row in rows], list(TestResult.objects.order_by('id').values_list('id', flat=True)))
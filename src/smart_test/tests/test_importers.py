@@ -0,0 +1,259 @@
+import io
+import json
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from smart_test.cache import get_compiled_test
+from smart_test.importers import import_question_bank, parse_question_bank
+from smart_test.models import Test, Topic
+
+
+def jsonl_test(title, questions=3, answers=3, correct=1):
+    return json.dumps({
+        'title': title,
+        'topic': 'Imported',
+        'level': 'basic',
+        'questions': [
+            {
+                'text': f'{title} question {number}',
+                'answers': [{'text': f'Answer {index}', 'is_correct': index < correct} for index in range(answers)],
+            }
+            for number in range(questions)
+        ],
+    })
+
+
+GIFT_BANK = """// A comment
+$CATEGORY: $course$/Geography/Capitals
+
+::Q1:: The capital of France {=Paris ~London ~Berlin}
+
+::Q2:: The capital of Spain {
+    ~Lisbon
+    =Madrid # Correct!
+    ~Rome
+}
+
+The capitals of Germany {~%50%Berlin ~%50%Bonn ~%-100%Paris}
+"""
+
+MOODLE_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<quiz>
+  <question type="category"><category><text>$course$/top/Physics</text></category></question>
+  <question type="multichoice">
+    <name><text>Q1</text></name>
+    <questiontext format="html"><text><![CDATA[<p>Unit of force</p>]]></text></questiontext>
+    <answer fraction="100" format="html"><text>Newton</text></answer>
+    <answer fraction="0" format="html"><text>Joule</text></answer>
+    <answer fraction="0" format="html"><text>Watt</text></answer>
+  </question>
+  <question type="multichoice">
+    <name><text>Q2</text></name>
+    <questiontext format="html"><text>Unit of energy</text></questiontext>
+    <answer fraction="0"><text>Newton</text></answer>
+    <answer fraction="100"><text>Joule</text></answer>
+    <answer fraction="0"><text>Pascal</text></answer>
+  </question>
+  <question type="multichoice">
+    <name><text>Q3</text></name>
+    <questiontext format="plain_text"><text>Unit of power &lt;P&gt;</text></questiontext>
+    <answer fraction="0"><text>Newton</text></answer>
+    <answer fraction="0"><text>Joule</text></answer>
+    <answer fraction="100"><text>Watt</text></answer>
+  </question>
+</quiz>
+"""
+
+
+class QuestionBankImportTests(TestCase):
+    """
+        Tests for importing question banks.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_jsonl_import:
+            Checks that valid tests are saved with their counters and compiled plan, and that invalid ones are reported and skipped.
+
+        test_gift_and_moodle_xml:
+            Checks that GIFT and Moodle XML banks are parsed into tests named after their categories.
+
+        test_import_api:
+            Checks that staff users can upload a question bank and other users cannot.
+
+        test_jsonl_wrong_types:
+            Checks that JSON values of the wrong type are reported as errors of their test.
+
+        test_gift_invalid_weight:
+            Checks that an answer weight that is not a number is reported as an error of its test.
+
+        test_moodle_invalid_fraction:
+            Checks that an answer fraction that is not a number is reported as an error of its test, and that the other
+            tests of the bank are still imported through the API.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Clears the shared cache.
+
+            :return: None
+        """
+
+        cache.clear()
+
+    def test_jsonl_import(self):
+        """
+            Imports a bank with one valid test, one test with all answers correct, one with too few questions and a malformed line.
+
+            :return: None
+        """
+
+        bank = '\n'.join([
+            jsonl_test('Valid', questions=4),
+            jsonl_test('All correct', correct=3),
+            jsonl_test('Too short', questions=2),
+            '{"title": "Broken", "questions": [{"text": "No answers"}]}',
+        ])
+
+        report = import_question_bank(parse_question_bank(io.BytesIO(bank.encode()), 'jsonl'), batch_size=5)
+
+        self.assertEqual((report.tests, report.questions, report.answers), (1, 4, 12))
+        self.assertEqual({source for source, _ in report.errors}, {'line 2', 'line 3', 'line 4'})
+
+        test = Test.objects.get(title='Valid')
+        self.assertEqual((test.question_count, test.answer_count), (4, 12))
+        self.assertEqual(test.topic, Topic.objects.get(name='Imported'))
+        self.assertEqual(test.level, Test.LEVEL_CHOICES.BASIC)
+        self.assertEqual(list(test.questions.values_list('order_number', flat=True).order_by('order_number')), [1, 2, 3, 4])
+        self.assertEqual(get_compiled_test(test.id).question_count, 4)
+        self.assertFalse(Test.objects.filter(title__in=['All correct', 'Too short', 'Broken']).exists())
+
+    def test_gift_and_moodle_xml(self):
+        """
+            Parses the sample banks and imports the GIFT one in dry-run mode.
+
+            :return: None
+        """
+
+        gift, = parse_question_bank(io.BytesIO(GIFT_BANK.encode()), 'gift')
+        self.assertEqual(gift.title, 'Capitals')
+        self.assertEqual([question.text for question in gift.questions],
+                         ['The capital of France', 'The capital of Spain', 'The capitals of Germany'])
+        self.assertEqual([answer.is_correct for answer in gift.questions[1].answers], [False, True, False])
+        self.assertEqual([answer.is_correct for answer in gift.questions[2].answers], [True, True, False])
+
+        tests_before = Test.objects.count()
+        report = import_question_bank([gift], dry_run=True)
+        self.assertEqual((report.tests, report.errors), (1, []))
+        self.assertEqual(Test.objects.count(), tests_before)
+
+        xml, = parse_question_bank(io.BytesIO(MOODLE_XML), 'xml')
+        self.assertEqual(xml.title, 'Physics')
+        self.assertEqual([question.text for question in xml.questions], ['Unit of force', 'Unit of energy', 'Unit of power <P>'])
+        self.assertEqual([answer.text for answer in xml.questions[0].answers if answer.is_correct], ['Newton'])
+
+    def test_import_api(self):
+        """
+            Uploads the Moodle XML bank as a staff user, then as a regular user.
+
+            :return: None
+        """
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='admin'))
+        url = reverse('api_smart_test:test_import')
+
+        response = client.post(url, {'file': SimpleUploadedFile('bank.xml', MOODLE_XML)}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['tests'], 1)
+        self.assertEqual(Test.objects.get(title='Physics').question_count, 3)
+
+        client.force_authenticate(User.objects.create_user(username='student', password='student'))
+        response = client.post(url, {'file': SimpleUploadedFile('bank.xml', MOODLE_XML)}, format='multipart')
+        self.assertEqual(response.status_code, 403)
+
+    def test_jsonl_wrong_types(self):
+        """
+            Imports a valid test and tests with a number as title, question text, answer text and description, and a
+            string as answers.
+
+            :return: None
+        """
+
+        valid = json.loads(jsonl_test('Valid'))
+        wrong_question_text = json.loads(jsonl_test('Question text'))
+        wrong_question_text['questions'][0]['text'] = 5
+        wrong_answer_text = json.loads(jsonl_test('Answer text'))
+        wrong_answer_text['questions'][1]['answers'][0]['text'] = ['Answer']
+        bank = '\n'.join(json.dumps(test) for test in [
+            valid,
+            {**valid, 'title': 5},
+            wrong_question_text,
+            wrong_answer_text,
+            {**valid, 'title': 'Description', 'description': {'text': 'Description'}},
+            {**valid, 'title': 'Answers', 'questions': [{'text': 'Question', 'answers': 'abc'}]},
+        ])
+
+        report = import_question_bank(parse_question_bank(io.BytesIO(bank.encode()), 'jsonl'))
+
+        self.assertEqual(report.tests, 1)
+        self.assertEqual(report.errors, [
+            ('line 2', 'Title must be a string'),
+            ('line 3', 'Question 1: text must be a string'),
+            ('line 4', 'Question 2: answer text must be a string'),
+            ('line 5', 'Description must be a string'),
+            ('line 6', report.errors[-1][1]),
+        ])
+        self.assertTrue(report.errors[-1][1].startswith('Malformed test'))
+
+    def test_gift_invalid_weight(self):
+        """
+            Parses a GIFT bank with the weight %1.2.3% in its second category.
+
+            :return: None
+        """
+
+        bank = GIFT_BANK + '$CATEGORY: Broken\n\nThe capital of Italy {~%1.2.3%Rome ~Milan}\n'
+
+        capitals, broken = parse_question_bank(io.BytesIO(bank.encode()), 'gift')
+        report = import_question_bank([capitals, broken], dry_run=True)
+
+        self.assertEqual(report.tests, 1)
+        self.assertEqual(report.errors, [('line 13', "Question before line 16: invalid answer weight '1.2.3'")])
+
+    def test_moodle_invalid_fraction(self):
+        """
+            Uploads the Moodle XML bank followed by a category with the fraction "abc".
+
+            :return: None
+        """
+
+        broken = b"""
+  <question type="category"><category><text>$course$/top/Broken</text></category></question>
+  <question type="multichoice">
+    <questiontext format="plain_text"><text>Unit of pressure</text></questiontext>
+    <answer fraction="abc"><text>Pascal</text></answer>
+    <answer fraction="0"><text>Watt</text></answer>
+  </question>
+</quiz>
+"""
+        bank = MOODLE_XML.replace(b'</quiz>\n', broken)
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='admin'))
+        response = client.post(reverse('api_smart_test:test_import'), {'file': SimpleUploadedFile('bank.xml', bank)}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['tests'], 1)
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertTrue(response.data['errors'][0]['message'].startswith('Question 6: invalid answer fraction'))
+        self.assertFalse(Test.objects.filter(title='Broken').exists())
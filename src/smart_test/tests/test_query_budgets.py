@@ -0,0 +1,198 @@
+import os
+import time
+from typing import Callable, NamedTuple
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from smart_test.cache import get_compiled_test
+from smart_test.models import Test, Question, TestResult, TestStats
+from smart_test.seeding import DatasetSeeder
+from smart_test.services import issue_start_token
+
+
+class Budget(NamedTuple):
+    """
+        The query and latency budget of one URL.
+
+        Attributes:
+            url_name (str): Name of the URL, e.g. 'tests:details'.
+            queries (int): Maximum number of database queries of a request.
+            latency_ms (int): Maximum latency of a request in milliseconds, the best of LATENCY_RUNS runs.
+            method (str): HTTP method of the request.
+            kwargs (callable): Returns the URL kwargs for the test case, optional.
+            data (callable): Returns the request data for the test case, optional.
+            status (int): Expected status code.
+    """
+
+    url_name: str
+    queries: int
+    latency_ms: int
+    method: str = 'get'
+    kwargs: Callable = None
+    data: Callable = None
+    status: int = 200
+
+
+def _answer_form(case):
+    # Selects the first answer of the current question, as the browser form of tests:next does.
+    question = get_compiled_test(case.test.id).question(1)
+    data = {
+        'form-TOTAL_FORMS': str(len(question.answer_ids)),
+        'form-INITIAL_FORMS': str(len(question.answer_ids)),
+        'form-MIN_NUM_FORMS': '0',
+        'form-MAX_NUM_FORMS': '1000',
+        'form-0-is_selected': 'on',
+    }
+    for index, answer_id in enumerate(question.answer_ids):
+        data[f'form-{index}-id'] = str(answer_id)
+    return data
+
+
+def _submission(case):
+    plan = get_compiled_test(case.test.id)
+    return {
+        'start_token': issue_start_token(case.user, plan),
+        'answers': [{'question': question.id, 'selected': []} for question in plan.questions],
+    }
+
+
+# Budgets of all pages and API endpoints. Requests are sent in this order, the ones that change data (start, answer,
+# submit) always see the same state: the user has no unfinished run of the test when the sequence starts.
+BUDGETS = (
+    Budget('core:index', 3, 300),
+    Budget('tests:list', 5, 300),
+    Budget('tests:list', 6, 300, data=lambda case: {'search': 'seed quiz', 'level': Test.LEVEL_CHOICES.MIDDLE}),
+    Budget('tests:details', 5, 300, kwargs=lambda case: {'id': case.test.id}),
+    Budget('tests:start', 11, 300, kwargs=lambda case: {'id': case.test.id}, status=302),
+    Budget('tests:next', 5, 300, kwargs=lambda case: {'id': case.test.id}),
+    Budget('tests:next', 5, 300, method='post', kwargs=lambda case: {'id': case.test.id}, data=_answer_form, status=302),
+    Budget('tests:test_create', 4, 300),
+    Budget('tests:test_edit', 6, 300, kwargs=lambda case: {'id': case.test.id}),
+    Budget('tests:results_export', 4, 300, data=lambda case: {'test': case.test.id}),
+    Budget('accounts:registration', 3, 300),
+    Budget('accounts:login', 3, 300),
+    Budget('accounts:profile', 3, 300),
+    Budget('accounts:list', 4, 300),
+    Budget('accounts:list', 4, 300, data=lambda case: {'first_name': 'a', 'email': 'example', 'after': case.user.id}),
+    Budget('accounts:contact_us', 3, 300),
+    Budget('accounts:password_reset', 3, 300),
+    Budget('api_registration:accounts_list', 1, 300),
+    Budget('api_registration:accounts_list', 1, 300, data=lambda case: {'last_name': 'a', 'page_size': 100}),
+    Budget('api_smart_test:test_list', 1, 300),
+    Budget('api_smart_test:test_list', 3, 300, data=lambda case: {'search': 'seed quiz', 'topic': case.test.topic_id or ''}),
+    Budget('api_smart_test:test_detail', 2, 300, kwargs=lambda case: {'pk': case.test.id}),
+    Budget('api_smart_test:test_payload', 4, 300, kwargs=lambda case: {'pk': case.test.id}),
+    Budget('api_smart_test:test_submit', 17, 300, method='post', kwargs=lambda case: {'pk': case.test.id}, data=_submission,
+           status=201),
+)
+
+# Dataset sizes, i.e. number of users, tests and test results, e.g. QUERY_BUDGET_SIZES=10,1000,100000 for a full run.
+SIZES = tuple(int(size) for size in os.environ.get('QUERY_BUDGET_SIZES', '10,1000').split(','))
+LATENCY_RUNS = 3
+
+
+class QueryBudgetTests(TestCase):
+    """
+        Performance regression suite: every page and API endpoint is requested with datasets of growing size (SIZES),
+        and must stay within the query and latency budget declared in BUDGETS. The number of queries of a request must
+        not depend on the size of the dataset, which catches N+1 queries in views, serializers and templates.
+
+        The datasets are seeded with DatasetSeeder. The default sizes keep the suite fast, set QUERY_BUDGET_SIZES to run it
+        with larger datasets, e.g. before a release.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_budgets:
+            Checks the query count and latency of every request of BUDGETS for every dataset size, and that the query
+            counts are the same for all sizes.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Authenticates a client as the admin user, for both the pages and the API.
+
+            :return: None
+        """
+
+        self.user = User.objects.get(username='admin')
+        self.test = Test.objects.order_by('id').first()
+        self.client = APIClient()
+        self.client.force_login(self.user)
+        self.client.force_authenticate(self.user)
+        # The first run of a test creates its statistics, later runs only update them.
+        TestStats.objects.get_or_create(test=self.test)
+
+    def seed(self, count):
+        """
+            Adds ``count`` users, tests with the minimum number of questions and answers, and finished test runs.
+
+            :param count: Number of rows of each kind.
+            :return: None
+        """
+
+        seeder = DatasetSeeder(seed=count)
+        user_ids = seeder.create_users(count)
+        test_ids = seeder.create_tests(count, num_questions=Test.QUESTION_MIN_LIMIT, num_answers=Question.ANSWER_MIN_LIMIT)
+        seeder.create_test_results(count, user_ids, test_ids, num_questions=Test.QUESTION_MIN_LIMIT, active_ratio=0)
+
+    def measure(self, budget):
+        """
+            Sends the request of a budget with an empty cache.
+
+            :param budget: The Budget.
+            :return: A tuple (response, number of queries, latency in milliseconds).
+        """
+
+        url = reverse(budget.url_name, kwargs=budget.kwargs(self) if budget.kwargs else None)
+        data = budget.data(self) if budget.data else None
+        send = getattr(self.client, budget.method)
+        options = {'format': 'json'} if budget.method == 'post' and budget.url_name.startswith('api_') else {}
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = send(url, data, **options)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            latency = (time.perf_counter() - started) * 1000
+        return response, len(queries), latency
+
+    def test_budgets(self):
+        """
+            Seeds the datasets of growing size and requests every URL of BUDGETS for each of them.
+
+            :return: None
+        """
+
+        counts = {}
+        seeded = 0
+        for size in SIZES:
+            self.seed(size - seeded)
+            seeded = size
+            TestResult.objects.filter(user=self.user, state=TestResult.STATE.NEW).delete()
+
+            for index, budget in enumerate(BUDGETS):
+                response, queries, latency = self.measure(budget)
+                if budget.method == 'get':
+                    latency = min([latency] + [self.measure(budget)[2] for _ in range(LATENCY_RUNS - 1)])
+                counts.setdefault(index, []).append(queries)
+
+                with self.subTest(url=budget.url_name, method=budget.method, size=size):
+                    self.assertEqual(response.status_code, budget.status)
+                    self.assertLessEqual(queries, budget.queries)
+                    self.assertLessEqual(latency, budget.latency_ms)
+
+        for index, budget in enumerate(BUDGETS):
+            with self.subTest(url=budget.url_name, method=budget.method):
+                self.assertEqual(len(set(counts[index])), 1, f'Query count grows with the dataset: {dict(zip(SIZES, counts[index]))}')
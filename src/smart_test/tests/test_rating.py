@@ -0,0 +1,144 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from smart_test.archive import archive_finished_test_results
+from smart_test.cache import get_compiled_test
+from smart_test.models import Test, TestResult, TestStats
+from smart_test.rating import INITIAL_RATING, recompute_ratings, test_difficulty, updated_rating
+from smart_test.services import submit_test
+from smart_test.stats import rebuild_stats
+
+
+class RatingTests(TestCase):
+    """
+        Tests for the user ratings of smart_test.rating.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_update_rule:
+            Checks that a rating moves towards the result, further for surprising results and for harder levels.
+
+        test_finish_updates_rating:
+            Checks that finishing a run updates the rating of the user with the Elo update.
+
+        test_recompute_replays_history:
+            Checks that the recompute replays the runs of every user in order, including archived runs, and resets users
+            without runs.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Clears the shared cache and picks the first Test and the admin user.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.test = Test.objects.order_by('id').first()
+        self.user = User.objects.get(username='admin')
+        self.other = User.objects.create(username='rated_user')
+        rebuild_stats()
+
+    def submit(self, user, correct):
+        """
+            Submits the test with every answer selected correctly or incorrectly.
+
+            :param user: The user who takes the test.
+            :param correct: Whether to answer correctly.
+            :return: The finished TestResult.
+        """
+
+        plan = get_compiled_test(self.test.id)
+        selections = {
+            question.id: [answer_id for index, answer_id in enumerate(question.answer_ids) if bool(question.correct_mask >> index & 1) == correct]
+            for question in plan.questions
+        }
+        return submit_test(user, plan, selections, started_at=timezone.now() - datetime.timedelta(minutes=1))
+
+    def test_update_rule(self):
+        """
+            Applies single runs to a rating equal to the difficulty of the test.
+
+            :return: None
+        """
+
+        middle = Test.LEVEL_CHOICES.MIDDLE
+        difficulty = test_difficulty(middle, 50.0)
+        self.assertEqual(difficulty, 50.0)
+        self.assertEqual(updated_rating(50.0, 0, 0.5, middle, difficulty), 50.0)
+
+        perfect = updated_rating(50.0, 20, 1.0, middle, difficulty)
+        self.assertGreater(perfect, 50.0)
+        self.assertLess(updated_rating(50.0, 20, 0.0, middle, difficulty), 50.0)
+        self.assertGreater(updated_rating(50.0, 0, 1.0, middle, difficulty), perfect)
+
+        advanced = Test.LEVEL_CHOICES.ADVANCED
+        self.assertGreater(test_difficulty(advanced, 50.0), difficulty)
+        self.assertGreater(test_difficulty(middle, 20.0), test_difficulty(middle, 80.0))
+        self.assertGreater(updated_rating(50.0, 20, 1.0, advanced, difficulty), perfect)
+        self.assertEqual(updated_rating(99.0, 0, 1.0, middle, 100.0), 100.0)
+        self.assertEqual(updated_rating(1.0, 0, 0.0, middle, 0.0), 0.0)
+
+    def test_finish_updates_rating(self):
+        """
+            Submits a perfect run, then a failed one.
+
+            :return: None
+        """
+
+        self.submit(self.user, correct=True)
+        self.user.refresh_from_db()
+        stats = TestStats.objects.get(test=self.test)
+        expected = updated_rating(INITIAL_RATING, 0, 1.0, self.test.level, test_difficulty(self.test.level, stats.average_score))
+        self.assertEqual(self.user.rating_runs, 1)
+        self.assertAlmostEqual(float(self.user.rating), expected, places=2)
+        self.assertGreater(self.user.rating, INITIAL_RATING)
+
+        rating = self.user.rating
+        self.submit(self.user, correct=False)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.rating_runs, 2)
+        self.assertLess(self.user.rating, rating)
+
+    def test_recompute_replays_history(self):
+        """
+            Submits runs of two users, recomputes the ratings, archives the runs and recomputes again.
+
+            :return: None
+        """
+
+        TestResult.objects.filter(state=TestResult.STATE.FINISHED).delete()
+        User.objects.update(rating=0, rating_runs=0)
+        for user, correct in ((self.user, True), (self.other, False), (self.user, False), (self.user, True)):
+            self.submit(user, correct)
+        unrated = User.objects.create(username='unrated_user', rating=42, rating_runs=3)
+
+        # The replay rates all runs against the current difficulty of the test.
+        stats = TestStats.objects.get(test=self.test)
+        difficulty = test_difficulty(self.test.level, stats.average_score)
+        expected = INITIAL_RATING
+        for runs, score in enumerate((1.0, 0.0, 1.0)):
+            expected = updated_rating(expected, runs, score, self.test.level, difficulty)
+
+        self.assertEqual(recompute_ratings(chunk_size=2, batch_size=1), 2)
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        unrated.refresh_from_db()
+        self.assertEqual(self.user.rating_runs, 3)
+        self.assertAlmostEqual(float(self.user.rating), expected, places=2)
+        self.assertAlmostEqual(float(self.other.rating), updated_rating(INITIAL_RATING, 0, 0.0, self.test.level, difficulty), places=2)
+        self.assertEqual((unrated.rating, unrated.rating_runs), (0, 0))
+
+        archive_finished_test_results(archive_after=datetime.timedelta(0))
+        recompute_ratings()
+        self.assertEqual(User.objects.get(pk=self.user.pk).rating, self.user.rating)
+        self.assertEqual(User.objects.get(pk=self.other.pk).rating, self.other.rating)
@@ -0,0 +1,121 @@
+import io
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from smart_test.models import Test
+
+
+def _upload(name='cover.png', size=(800, 600)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 40, 40)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class RenditionTests(TestCase):
+    """
+        Tests for the resized variants of test covers.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_upload_generates_renditions:
+            Checks that saving a new cover generates square WebP and JPEG variants in all sizes and that the template tag
+            serves them.
+
+        test_backfill:
+            Checks that the backfill command generates missing renditions and renders a shared image once.
+
+        test_api_renditions:
+            Checks that the catalogue API lists the absolute URLs of the renditions.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Stores the media of the test in a temporary directory.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.test = Test.objects.order_by('id').first()
+
+    def test_upload_generates_renditions(self):
+        """
+            Uploads a cover and renders it with the picture tag.
+
+            :return: None
+        """
+
+        self.test.image = _upload()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test.save()
+
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.renditions['source'], self.test.image.name)
+        self.assertEqual(set(self.test.renditions) - {'source'}, {str(size) for size in Test.IMAGE_RENDITION_SIZES})
+        with self.test.image.storage.open(self.test.renditions['100']['webp']) as webp:
+            image = Image.open(webp)
+            self.assertEqual((image.format, image.size), ('WEBP', (100, 100)))
+        self.assertTrue(self.test.renditions['100']['fallback'].endswith('.jpg'))
+
+        html = Template('{% load renditions %}{% picture test.image test.renditions 100 alt="Cover" %}').render(
+            Context({'test': self.test}))
+        self.assertIn('<source type="image/webp" srcset=', html)
+        self.assertIn('-200.webp 2x', html)
+        self.assertIn('alt="Cover"', html)
+
+    def test_backfill(self):
+        """
+            Gives two tests the same cover without renditions and runs the backfill command.
+
+            :return: None
+        """
+
+        self.test.image = _upload()
+        self.test.save()
+        Test.objects.filter(pk__in=Test.objects.order_by('id').values_list('pk', flat=True)[:2]).update(
+            image=self.test.image.name, renditions={})
+
+        call_command('backfill_renditions', only='tests', batch_size=1, stdout=io.StringIO())
+
+        first, second = Test.objects.order_by('id')[:2]
+        self.assertEqual(first.renditions, second.renditions)
+        self.assertEqual(first.renditions['source'], self.test.image.name)
+
+    def test_api_renditions(self):
+        """
+            Requests the catalogue with the renditions of one test.
+
+            :return: None
+        """
+
+        self.test.image = _upload()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test.save()
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='admin'))
+        response = client.get(reverse('api_smart_test:test_list'), {'fields': 'id,image_renditions', 'page_size': 100})
+
+        renditions = next(test['image_renditions'] for test in response.data['results'] if test['id'] == self.test.id)
+        self.assertTrue(renditions['300']['webp'].startswith('http://testserver/media/renditions/'))
+        self.assertTrue(renditions['300']['fallback'].endswith('-300.jpg'))
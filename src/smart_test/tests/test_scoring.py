@@ -0,0 +1,59 @@
+from django.test import SimpleTestCase
+
+from smart_test import scoring
+
+
+class ScoringTests(SimpleTestCase):
+    """
+        Tests for the bitmask based scoring engine.
+
+        test_encode_selection:
+            Checks that selections are encoded by answer id, independently of the order of the selected ids, and that ids of
+            other questions are rejected.
+
+        test_is_correct:
+            Checks that only the exact set of correct answers is scored as correct.
+
+        test_score_batch:
+            Checks that stored submissions are regraded against the given correct masks.
+    """
+
+    ANSWER_IDS = (11, 12, 15, 20)
+
+    def test_encode_selection(self):
+        """
+            Encodes the same selection in different orders, and rejects an id of another question.
+
+            :return: None
+        """
+
+        self.assertEqual(scoring.encode_selection(self.ANSWER_IDS, [15, 11]), 0b0101)
+        self.assertEqual(scoring.encode_selection(self.ANSWER_IDS, [11, 15, 15]), 0b0101)
+        with self.assertRaises(ValueError):
+            scoring.encode_selection(self.ANSWER_IDS, [11, 15, 99])
+
+    def test_is_correct(self):
+        """
+            Compares exact, partial and excessive selections with the correct mask.
+
+            :return: None
+        """
+
+        correct_mask = scoring.encode_selection(self.ANSWER_IDS, [12, 20])
+
+        self.assertTrue(scoring.is_correct(correct_mask, 0b1010))
+        self.assertFalse(scoring.is_correct(correct_mask, 0b0010))
+        self.assertFalse(scoring.is_correct(correct_mask, 0b1011))
+        self.assertEqual(scoring.count_mistakes(correct_mask, 0b0011), 2)
+
+    def test_score_batch(self):
+        """
+            Regrades several submissions, including one for an unknown question.
+
+            :return: None
+        """
+
+        masks = {1: 0b001, 2: 0b110}
+        submissions = [(1, 0b001), (1, 0b011), (2, 0b110), (3, 0b001)]
+
+        self.assertEqual(scoring.score_batch(masks, submissions), [True, False, True, False])
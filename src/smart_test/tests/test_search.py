@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from smart_test.models import Test, Topic
+from smart_test.search import search_tests
+
+
+class CatalogueSearchTests(TestCase):
+    """
+        Tests for the full-text search of the test catalogue.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_ranking:
+            Checks that matches in the title rank above matches in the description, which rank above matches in the topic,
+            and that words match by prefix.
+
+        test_index_follows_changes:
+            Checks that renamed topics, edited and deleted tests are reflected in the search.
+
+        test_list_page:
+            Checks the search and filters of the list page.
+
+        test_api:
+            Checks the search of the catalogue API with cursor pagination and the validation of the filters.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Creates three tests mentioning "Photosynthesis" in their title, description and topic.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.topic = Topic.objects.create(name='Photosynthesis')
+        # Created in the reverse order of their rank, so that the ranking cannot come from the ids.
+        self.by_topic = Test.objects.create(title='Chlorophyll', description='Leaves', topic=self.topic)
+        self.by_description = Test.objects.create(title='Plants', description='Light and photosynthesis',
+                                                  level=Test.LEVEL_CHOICES.ADVANCED)
+        self.by_title = Test.objects.create(title='Photosynthesis quiz', description='Plants', level=Test.LEVEL_CHOICES.BASIC)
+
+    def test_ranking(self):
+        """
+            Searches a prefix of the common word, then two words.
+
+            :return: None
+        """
+
+        found = list(search_tests(Test.objects.all(), 'photosynth'))
+        self.assertEqual(found, [self.by_title, self.by_description, self.by_topic])
+
+        self.assertEqual(list(search_tests(Test.objects.all(), 'light photo')), [self.by_description])
+        self.assertEqual(list(search_tests(Test.objects.all(), '"*')), [])
+
+    def test_index_follows_changes(self):
+        """
+            Renames the topic, edits one test and deletes another.
+
+            :return: None
+        """
+
+        self.topic.name = 'Botany'
+        self.topic.save()
+        self.by_title.title = 'Respiration quiz'
+        self.by_title.save()
+        self.by_description.delete()
+
+        self.assertEqual(list(search_tests(Test.objects.all(), 'botany')), [self.by_topic])
+        self.assertEqual(list(search_tests(Test.objects.all(), 'photosynthesis')), [])
+        self.assertEqual(list(search_tests(Test.objects.all(), 'respiration')), [self.by_title])
+
+    def test_list_page(self):
+        """
+            Searches the list page with and without a level filter.
+
+            :return: None
+        """
+
+        response = self.client.get(reverse('tests:list'), {'search': 'photosynthesis'})
+        self.assertEqual(list(response.context['tests']), [self.by_title, self.by_description, self.by_topic])
+        self.assertEqual(response.context['query_params'], 'search=photosynthesis')
+
+        response = self.client.get(reverse('tests:list'), {'search': 'photosynthesis', 'level': Test.LEVEL_CHOICES.ADVANCED})
+        self.assertEqual(list(response.context['tests']), [self.by_description])
+
+    def test_api(self):
+        """
+            Pages through the search results one test at a time and filters by an unknown topic.
+
+            :return: None
+        """
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='admin'))
+
+        found = []
+        response = client.get(reverse('api_smart_test:test_list'), {'search': 'photosynthesis', 'page_size': 1})
+        while True:
+            found.extend(test['id'] for test in response.data['results'])
+            if not response.data['next']:
+                break
+            cache.clear()
+            response = client.get(response.data['next'])
+        self.assertEqual(found, [self.by_title.id, self.by_description.id, self.by_topic.id])
+
+        response = client.get(reverse('api_smart_test:test_list'), {'topic': self.topic.id})
+        self.assertEqual([test['id'] for test in response.data['results']], [self.by_topic.id])
+
+        response = client.get(reverse('api_smart_test:test_list'), {'topic': 0})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,57 @@
+import io
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from accounts.models import Profile
+from smart_test.models import Test, TestResult
+from smart_test.seeding import DatasetSeeder
+from smart_test.services import counted_tests
+
+
+class DatasetSeederTests(TestCase):
+    """
+        Tests for the bulk dataset seeder.
+
+        test_seed_dataset:
+            Checks that users get profiles, that the test counters match the seeded questions and answers, and that the
+            runs respect the single active run constraint.
+
+        test_seed_users_only:
+            Checks that the seed_dataset command seeds users without tests and runs.
+    """
+
+    def test_seed_dataset(self):
+        """
+            Seeds a small dataset with batches smaller than every table.
+
+            :return: None
+        """
+
+        seeder = DatasetSeeder(batch_size=7, seed=1)
+        user_ids = seeder.create_users(30)
+        test_ids = seeder.create_tests(3, num_questions=5, num_answers=4)
+        created = seeder.create_test_results(100, user_ids, test_ids, num_questions=5, active_ratio=0.5)
+
+        self.assertEqual(Profile.objects.filter(user_id__in=user_ids).count(), 30)
+        self.assertEqual(created, 115)
+        self.assertEqual(TestResult.objects.filter(state=TestResult.STATE.NEW).count(), 15)
+
+        tests = counted_tests(Test.objects.filter(pk__in=test_ids))
+        self.assertEqual(tests.filter(question_count=F('actual_question_count'), answer_count=F('actual_answer_count')).count(), 3)
+        self.assertTrue(all(test.question_count == 5 and test.answer_count == 20 for test in tests))
+        self.assertFalse(TestResult.objects.filter(create_date__gt=F('write_date')).exists())
+
+    def test_seed_users_only(self):
+        """
+            Runs the command with users, but without tests and results, at the default share of active runs.
+
+            :return: None
+        """
+
+        runs = TestResult.objects.count()
+        call_command('seed_dataset', users=20, tests=0, results=0, skip_stats=True, stdout=io.StringIO())
+
+        self.assertGreaterEqual(Profile.objects.count(), 20)
+        self.assertEqual(TestResult.objects.count(), runs)
@@ -1,7 +1,9 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 
 from accounts.models import User
-from smart_test.models import TestResult, Test
+from smart_test.models import TestResult, Test, AnswerLog
 from smart_test.services import TestRunner
 
 
@@ -92,6 +94,15 @@ class TestResultModelServicesTests(TestCase):
             Validates the success flow of a test where every selected choice is correct. It creates or retrieves a TestResult instance in a NEW state,
             iterates through all questions and simulates answering them correctly. It asserts that the final test state is FINISHED, the score is 100,
              and the total points equal the number of questions.
+
+        test_answer_log_flushed_on_finish:
+            Validates that the per-question answer log is buffered and written in bulk when the test is finished.
+
+        test_single_active_run:
+            Validates that a user cannot have two NEW runs of the same test.
+
+        test_double_submit_counted_once:
+            Validates that submitting the same question twice from stale copies of the test result counts it only once.
     """
 
     fixtures = [
@@ -135,14 +146,14 @@ class TestResultModelServicesTests(TestCase):
 
         result = None
         for question in self.test.questions.all():
-            selected_choices = [
-                True
-                for _ in question.answers.all()
+            selected_answers = [
+                answer.id
+                for answer in question.answers.all()
             ]
 
             result = test_runner.next(
                 context={
-                    'selected_choices': selected_choices
+                    'selected_answers': selected_answers
                 }
             )
 
@@ -182,17 +193,84 @@ class TestResultModelServicesTests(TestCase):
 
         result = None
         for question in self.test.questions.all():
-            selected_choices = [
-                answer.is_correct
+            selected_answers = [
+                answer.id
                 for answer in question.answers.all()
+                if answer.is_correct
             ]
 
             result = test_runner.next(
                 context={
-                    'selected_choices': selected_choices
+                    'selected_answers': selected_answers
                 }
             )
 
         self.assertEqual(result, TestResult.STATE.FINISHED)
         self.assertEqual(test_result.score(), 100)
         self.assertEqual(test_result.points(), self.test.questions.count())
+
+    def test_answer_log_flushed_on_finish(self):
+        """
+            Runs a test to the end and checks that one AnswerLog row per question is written, and only once the test is finished.
+
+            :return: None
+        """
+
+        cache.clear()
+        test_result = TestResult.objects.create(
+            user=self.user,
+            test=self.test,
+            current_order_number=1
+        )
+
+        test_runner = TestRunner(
+            on_next=on_next_callback,
+            test_result=test_result
+        )
+
+        questions = list(self.test.questions.order_by('order_number'))
+        for question in questions:
+            self.assertEqual(AnswerLog.objects.filter(test_result=test_result).count(), 0)
+            test_runner.next(
+                context={
+                    'selected_answers': [answer.id for answer in question.answers.filter(is_correct=True)]
+                }
+            )
+
+        logs = AnswerLog.objects.filter(test_result=test_result).order_by('answered_at')
+        self.assertEqual([log.question_id for log in logs], [question.id for question in questions])
+        self.assertTrue(all(log.is_correct for log in logs))
+
+    def test_single_active_run(self):
+        """
+            Creates a NEW run and checks that a second NEW run of the same test is rejected by the database.
+
+            :return: None
+        """
+
+        TestResult.objects.filter(user=self.user, test=self.test, state=TestResult.STATE.NEW).delete()
+        TestResult.objects.create(user=self.user, test=self.test, current_order_number=1)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TestResult.objects.create(user=self.user, test=self.test, current_order_number=1)
+
+    def test_double_submit_counted_once(self):
+        """
+            Loads the same test result twice, as two parallel requests would, and answers the first question with both copies.
+
+            :return: None
+        """
+
+        TestResult.objects.filter(user=self.user, test=self.test, state=TestResult.STATE.NEW).delete()
+        test_result = TestResult.objects.create(user=self.user, test=self.test, current_order_number=1)
+        question = self.test.questions.get(order_number=1)
+        context = {
+            'selected_answers': [answer.id for answer in question.answers.filter(is_correct=True)]
+        }
+
+        for copy in (TestResult.objects.get(pk=test_result.pk), TestResult.objects.get(pk=test_result.pk)):
+            TestRunner(test_result=copy).next(context=context)
+
+        test_result.refresh_from_db()
+        self.assertEqual(test_result.current_order_number, 2)
+        self.assertEqual(test_result.num_correct_answers + test_result.num_incorrect_answers, 1)
@@ -0,0 +1,131 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from accounts.models import User
+from smart_test.archive import archive_finished_test_results
+from smart_test.models import Test, TestResult, TestResultArchive, TestStats
+from smart_test.services import TestRunner
+from smart_test.stats import rebuild_stats
+
+
+class TestStatsTests(TestCase):
+    """
+        Tests for the precomputed per-test statistics.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        test_finish_updates_stats:
+            Checks that finishing a run updates the number of finishes, the best result and the average score.
+
+        test_rebuild_matches_incremental:
+            Checks that rebuilding the statistics from the results gives the same numbers as the incremental updates.
+
+        test_archive_keeps_stats:
+            Checks that archiving finished runs keeps them in the rebuilt statistics.
+
+        test_details_reads_stats:
+            Checks that the details page shows the precomputed statistics.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Clears the shared cache and picks the first Test and the admin user.
+
+            :return: None
+        """
+
+        cache.clear()
+        self.test = Test.objects.first()
+        self.user = User.objects.get(username='admin')
+        rebuild_stats()
+
+    def run_test(self, correct):
+        test_result = TestResult.objects.create(user=self.user, test=self.test, current_order_number=1)
+        test_runner = TestRunner(test_result=test_result)
+        for question in self.test.questions.order_by('order_number'):
+            test_runner.next(context={
+                'selected_answers': [answer.id for answer in question.answers.filter(is_correct=correct)]
+            })
+        return test_result
+
+    def test_finish_updates_stats(self):
+        """
+            Finishes a perfect run and checks that it becomes the best result.
+
+            :return: None
+        """
+
+        before = TestStats.objects.get(test=self.test)
+        self.run_test(correct=True)
+        after = TestStats.objects.get(test=self.test)
+
+        self.assertEqual(after.finishes, before.finishes + 1)
+        self.assertEqual(after.best_user, self.user)
+        self.assertEqual(after.best_points, self.test.question_count)
+        self.assertIn(str(self.user), after.best_result())
+
+    def test_rebuild_matches_incremental(self):
+        """
+            Finishes two runs and compares the incremental statistics with a full rebuild.
+
+            :return: None
+        """
+
+        self.run_test(correct=True)
+        self.run_test(correct=False)
+        incremental = TestStats.objects.get(test=self.test)
+
+        rebuild_stats(Test.objects.filter(pk=self.test.pk))
+        rebuilt = TestStats.objects.get(test=self.test)
+
+        self.assertEqual(rebuilt.finishes, incremental.finishes)
+        self.assertEqual(rebuilt.best_points, incremental.best_points)
+        self.assertAlmostEqual(rebuilt.average_score, incremental.average_score)
+
+    def test_archive_keeps_stats(self):
+        """
+            Finishes two runs, archives every finished run and compares the rebuilt statistics with the incremental ones.
+
+            :return: None
+        """
+
+        self.run_test(correct=False)
+        self.run_test(correct=True)
+        incremental = TestStats.objects.get(test=self.test)
+        finished = TestResult.objects.filter(state=TestResult.STATE.FINISHED).count()
+
+        self.assertEqual(archive_finished_test_results(archive_after=datetime.timedelta(0), chunk_size=2), finished)
+        self.assertFalse(TestResult.objects.filter(state=TestResult.STATE.FINISHED).exists())
+        self.assertEqual(TestResultArchive.objects.count(), finished)
+
+        rebuild_stats(Test.objects.filter(pk=self.test.pk))
+        rebuilt = TestStats.objects.get(test=self.test)
+
+        self.assertEqual(rebuilt.finishes, incremental.finishes)
+        self.assertEqual(rebuilt.best_user, self.user)
+        self.assertEqual(rebuilt.best_points, incremental.best_points)
+        self.assertAlmostEqual(rebuilt.average_score, incremental.average_score)
+
+    def test_details_reads_stats(self):
+        """
+            Renders the details page and checks that the statistics are shown.
+
+            :return: None
+        """
+
+        client = Client()
+        client.login(username='admin', password='admin')
+        stats = TestStats.objects.get(test=self.test)
+
+        response = client.get(reverse('tests:details', kwargs={'id': self.test.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['stats'], stats)
+        self.assertEqual(response.context['best_result'], stats.best_result())
@@ -0,0 +1,99 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from smart_test.models import Test, TestResult
+from smart_test.services import purge_outdated_test_results
+from smart_test.tasks import cleanup_outdated_test_results, single_run, CLEANUP_LOCK_KEY
+
+
+class CleanupOutdatedTestResultsTests(TestCase):
+    """
+        Tests for the chunked cleanup of outdated test runs.
+
+        fixtures:
+            Specifies the initial data to load from 'dump.json' to the database before test cases are executed.
+
+        setUp:
+            Replaces the test runs with one recent and five outdated NEW runs and one outdated FINISHED run.
+
+        test_purge_in_chunks:
+            Checks that only outdated NEW runs are deleted when the purge works in chunks smaller than the set.
+
+        test_cleanup_locked:
+            Checks that the task skips its run while the cleanup lock is held.
+
+        test_single_run_releases_lock:
+            Checks that the lock of single_run is released when the run fails, and kept while it is held by another run.
+    """
+
+    fixtures = [
+        'dump.json'
+    ]
+
+    def setUp(self):
+        """
+            Creates the test runs, back-dating the outdated ones with an UPDATE as write_date is set on save.
+
+            :return: None
+        """
+
+        cache.clear()
+        TestResult.objects.all().delete()
+        test = Test.objects.first()
+        users = list(User.objects.all()[:1]) + [User.objects.create_user(username=f'purge_{i}', password='x') for i in range(5)]
+        outdated = timezone.now() - datetime.timedelta(days=8)
+
+        self.recent = TestResult.objects.create(user=users[0], test=test, current_order_number=1)
+        self.finished = TestResult.objects.create(user=users[0], test=test, current_order_number=1,
+                                                  state=TestResult.STATE.FINISHED)
+        stale = [TestResult.objects.create(user=user, test=test, current_order_number=1) for user in users[1:]]
+        TestResult.objects.filter(pk__in=[test_result.pk for test_result in stale] + [self.finished.pk]).update(
+            write_date=outdated)
+
+    def test_purge_in_chunks(self):
+        """
+            Purges with a chunk size of two and checks what is left.
+
+            :return: None
+        """
+
+        deleted, _ = purge_outdated_test_results(chunk_size=2, pause=0)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(set(TestResult.objects.values_list('pk', flat=True)), {self.recent.pk, self.finished.pk})
+
+    def test_cleanup_locked(self):
+        """
+            Holds the lock, runs the task, then releases the lock and runs it again.
+
+            :return: None
+        """
+
+        cache.add(CLEANUP_LOCK_KEY, 1)
+        self.assertIsNone(cleanup_outdated_test_results())
+        self.assertEqual(TestResult.objects.count(), 7)
+
+        cache.delete(CLEANUP_LOCK_KEY)
+        self.assertEqual(cleanup_outdated_test_results(), 5)
+        self.assertIsNone(cache.get(CLEANUP_LOCK_KEY))
+
+    def test_single_run_releases_lock(self):
+        """
+            Fails a run inside the lock, then nests a second run inside a first one.
+
+            :return: None
+        """
+
+        with self.assertRaises(RuntimeError), single_run('smart_test:test:lock', 60) as acquired:
+            self.assertTrue(acquired)
+            raise RuntimeError
+        self.assertIsNone(cache.get('smart_test:test:lock'))
+
+        with single_run('smart_test:test:lock', 60) as first, single_run('smart_test:test:lock', 60) as second:
+            self.assertEqual((first, second), (True, False))
+            self.assertIsNotNone(cache.get('smart_test:test:lock'))
+        self.assertIsNone(cache.get('smart_test:test:lock'))
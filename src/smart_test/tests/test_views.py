@@ -1,7 +1,31 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 
-from smart_test.models import Test
+from smart_test.models import Test, TestResult
+
+
+def answer_form(response, selected=(0, )):
+    """
+        Builds the POST data of the question page as the browser sends it: the answer ids rendered with the formset and the
+        checked answers.
+
+        :param response: The response of the question page.
+        :param selected: Positions of the answers to check.
+        :return: The POST data.
+    """
+
+    forms = response.context['form_set'].forms
+    data = {
+        'form-TOTAL_FORMS': str(len(forms)),
+        'form-INITIAL_FORMS': str(len(forms)),
+        'form-MIN_NUM_FORMS': '0',
+        'form-MAX_NUM_FORMS': '1000',
+    }
+    for index, form in enumerate(forms):
+        data[f'form-{index}-id'] = str(form.instance.id)
+        if index in selected:
+            data[f'form-{index}-is_selected'] = 'on'
+    return data
 
 
 class TestDetailsViews(TestCase):
@@ -19,10 +43,18 @@ class TestDetailsViews(TestCase):
                 Initializes the test environment by creating a test client and logging in with admin credentials.
 
             test_details(self):
-                Tests that the details view for a specific test id returns a 200 status code and contains test context information.
+                Tests that the details view for a specific test id returns a 200 status code and contains test context information,
+                and that it offers to continue only once the test was started.
 
             test_basic_flow(self):
                 Tests the entire flow of taking a test from start to finish, ensuring proper redirections and form submissions are handled correctly.
+
+            test_question_queries(self):
+                Tests that the question page loads the run, the question and its answers with two queries.
+
+            test_stale_answer_rejected(self):
+                Tests that answers posted from the page of a question that was answered meanwhile are not applied to the
+                current question.
     """
 
     fixtures = [
@@ -48,9 +80,15 @@ class TestDetailsViews(TestCase):
             :return: None
         """
 
+        TestResult.objects.filter(test_id=1, state=TestResult.STATE.NEW).delete()
         response = self.client.get(reverse('tests:details', kwargs={'id': 1}))
         self.assertEqual(response.status_code, 200)
         self.assertIsNotNone(response.context_data.get('test'))
+        self.assertFalse(response.context_data['continue_flag'])
+
+        self.client.get(reverse('tests:start', kwargs={'id': 1}))
+        response = self.client.get(reverse('tests:details', kwargs={'id': 1}))
+        self.assertTrue(response.context_data['continue_flag'])
 
     def test_basic_flow(self):
         """
@@ -73,17 +111,7 @@ class TestDetailsViews(TestCase):
             self.assertEqual(response.status_code, 200)
             self.assertContains(response, 'Next')
 
-            response = self.client.post(
-                path=next_url,
-                data={
-                    'form-TOTAL_FORMS': '3',
-                    'form-INITIAL_FORMS': '3',
-                    'form-MIN_NUM_FORMS': '0',
-                    'form-MUX_NUM_FORMS': '1000',
-                    'form-0-is_selected': 'on',
-
-                }
-            )
+            response = self.client.post(path=next_url, data=answer_form(response))
 
             if step < questions_count:
                 self.assertRedirects(response, next_url)
@@ -92,6 +120,42 @@ class TestDetailsViews(TestCase):
 
         self.assertContains(response, 'Congratulations!!!')
 
+    def test_question_queries(self):
+        """
+            Starts a test and counts the queries of the question page: the session, the user and the user's profile for the
+            base template, plus the run with its test and the current question with its answers.
+
+            :return: None
+        """
+
+        self.client.get(reverse('tests:start', kwargs={'id': self.TEST_ID}))
+
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('tests:next', kwargs={'id': self.TEST_ID}))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_answer_rejected(self):
+        """
+            Answers the first question twice from the same page, as a second browser tab would.
+
+            :return: None
+        """
+
+        self.client.get(reverse('tests:start', kwargs={'id': self.TEST_ID}))
+        next_url = reverse('tests:next', kwargs={'id': self.TEST_ID})
+        stale = answer_form(self.client.get(next_url))
+
+        self.client.post(next_url, stale)
+        test_result = TestResult.objects.get(user__username='admin', test_id=self.TEST_ID, state=TestResult.STATE.NEW)
+        self.assertEqual(test_result.current_order_number, 2)
+
+        response = self.client.post(next_url, stale, follow=True)
+        self.assertIn('ERROR: The question has changed, please answer again', [str(message) for message in response.context['messages']])
+        test_result.refresh_from_db()
+        self.assertEqual(test_result.current_order_number, 2)
+        self.assertEqual(test_result.num_correct_answers + test_result.num_incorrect_answers, 1)
+
 
 class TestQuestionView(TestCase):
     """
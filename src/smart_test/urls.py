@@ -1,7 +1,7 @@
 from django.urls import path
 
 from smart_test.views import TestListView, TestDetailView, TestStartView, TestQuestionView, TestCreateView, \
-    TestUpdateView
+    TestUpdateView, TestResultExportView
 
 app_name = "tests"
 
@@ -19,4 +19,6 @@ urlpatterns = [
 
     path('<int:id>/edit/', TestUpdateView.as_view(), name='test_edit'),
 
+    path('results/export/', TestResultExportView.as_view(), name='results_export'),
+
 ]
@@ -1,15 +1,61 @@
-from smart_test.models import TestResult, Test
+from typing import NamedTuple, Optional
 
+from django.db.models import QuerySet
 
-def test_result_for_user(user, id):
+from smart_test import attempt_state
+from smart_test.models import TestResult, Question, Answer
+
+
+class Attempt(NamedTuple):
+    """
+        The active run of a test by a user, loaded together with its test and, optionally, the current question.
+
+        Attributes:
+            test_result (TestResult): The NEW run, with its test already loaded.
+            question (Question): The current question with its test set, or None if it was not requested.
+            answers (QuerySet): The answers of the current question ordered by id, already evaluated, or None.
+    """
+
+    test_result: TestResult
+    question: Optional[Question]
+    answers: Optional[QuerySet]
+
+
+def load_attempt(user, test_id, with_question=False):
     """
+        Loads the active run of a test with one query, and its current question with answers with one more query.
+        With SMART_TEST_WRITE_BEHIND the progress kept in the attempt state cache is applied to the run.
+
         :param user: User object to filter test results.
-        :param id: Identifier for the Test object.
-        :return: Queryset of TestResult objects that match the given user and test ID, and have the state NEW.
+        :param test_id: Identifier of the Test object.
+        :param with_question: Whether to load the current question and its answers as well.
+        :return: An Attempt instance, or None if the user has no NEW run of the test.
     """
 
-    return TestResult.objects.filter(
+    test_result = TestResult.objects.select_related('test').filter(
         user=user,
         state=TestResult.STATE.NEW,
-        test=Test.objects.get(id=id)
-    )
+        test_id=test_id,
+    ).first()
+
+    if test_result is None:
+        return None
+
+    if attempt_state.enabled():
+        attempt_state.apply(test_result)
+
+    if not with_question:
+        return Attempt(test_result, None, None)
+
+    answers = Answer.objects.select_related('question').filter(
+        question__test_id=test_id,
+        question__order_number=test_result.current_order_number,
+    ).order_by('id')
+
+    if answers:
+        question = answers[0].question
+    else:
+        question = Question.objects.get(test_id=test_id, order_number=test_result.current_order_number)
+    question.test = test_result.test
+
+    return Attempt(test_result, question, answers)
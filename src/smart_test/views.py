@@ -1,34 +1,62 @@
 from django.contrib import messages
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import redirect, render, HttpResponse
 from django.urls import reverse
 from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.db import transaction
 
-from smart_test.forms import AnswerFormSet, TestForm, QuestionFormSet
-from smart_test.models import Test, Question, TestResult
+from core.paginator import CountlessPaginator
+from smart_test.exports import filter_test_results, stream_export, EXPORT_FORMATS
+from smart_test.forms import AnswerFormSet, TestForm, TestSearchForm, QuestionFormSet
+from smart_test.models import Answer, Test, TestResult, TestStats
+from smart_test.search import filter_catalogue
 from smart_test.services import TestRunner
-from smart_test.utils import test_result_for_user
+from smart_test.stats import record_run
+from smart_test.utils import load_attempt
 
 
 # Create your views here.
 
 class TestListView(ListView):
     """
-        A view for displaying a list of Test objects.
+        A view for displaying a list of Test objects, searched and filtered with TestSearchForm. Search results are
+        ordered by relevance, see smart_test.search.
 
         Attributes:
             model (Test): Specifies the model to use for the list view.
             template_name (str): The template to use for rendering the list.
             context_object_name (str): The context variable name for the list of objects.
             paginate_by (int): The number of items to display per page.
+            paginator_class (Paginator): Pages without counting the matching tests, see core.paginator.CountlessPaginator.
+
+        Methods:
+            get_queryset(self):
+                Applies the valid filters of the search form.
+
+            get_context_data(self, **kwargs):
+                Adds the search form and the query string of the filters, for the pagination links.
     """
 
     model = Test
     template_name = 'list.html'
     context_object_name = 'tests'
     paginate_by = 10
+    paginator_class = CountlessPaginator
+
+    def get_queryset(self):
+        self.search_form = TestSearchForm(self.request.GET)
+        self.search_form.is_valid()
+        return filter_catalogue(super().get_queryset(), **self.search_form.cleaned_data)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query_params = self.request.GET.copy()
+        query_params.pop('page', None)
+        context['search_form'] = self.search_form
+        context['query_params'] = query_params.urlencode()
+        return context
 
 
 class TestDetailView(LoginRequiredMixin, DetailView):
@@ -45,8 +73,11 @@ class TestDetailView(LoginRequiredMixin, DetailView):
             pk_url_kwarg: The URL keyword argument that will be used to retrieve the primary key of the model instance.
 
         Methods:
+            get_queryset(self):
+                Loads the test together with its precomputed statistics and the best result holder.
+
             get_context_data(self, **kwargs):
-                Adds additional context to the template, including the best result,
+                Adds additional context to the template, including the statistics, the best result,
                 the last run, and a continue flag based on the current user and test state.
     """
 
@@ -55,21 +86,26 @@ class TestDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'test'
     pk_url_kwarg = 'id'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('stats', 'stats__best_user')
+
     def get_context_data(self, **kwargs):
         """
             :param kwargs: Additional keyword arguments passed to the method.
-            :return: A context dictionary containing the best test result, the last run of the test, and the count of new test results for the current user.
+            :return: A context dictionary containing the precomputed statistics of the test, its best result, the last run of
+            the test, and whether the current user has an unfinished run of it.
         """
 
         context = super().get_context_data(**kwargs)
-        test_id = self.kwargs['id']
-        context['best_result'] = TestResult.best_result(test_id)
-        context['last_run'] = TestResult.last_run(test_id)
+        stats = getattr(self.object, 'stats', None) or TestStats(test=self.object)
+        context['stats'] = stats
+        context['best_result'] = stats.best_result()
+        context['last_run'] = stats.last_run_display()
         context['continue_flag'] = TestResult.objects.filter(
             user=self.request.user,
+            test=self.object,
             state=TestResult.STATE.NEW,
-            test=self.get_object(),
-        ).count()
+        ).exists()
 
         return context
 
@@ -105,7 +141,7 @@ class TestStartView(LoginRequiredMixin, View):
         except Test.DoesNotExist:
             return HttpResponse("Test not found", status=404)
 
-        TestResult.objects.get_or_create(
+        test_result, created = TestResult.objects.get_or_create(
             user=request.user,
             state=TestResult.STATE.NEW,
             test=test,
@@ -116,6 +152,9 @@ class TestStartView(LoginRequiredMixin, View):
             }
         )
 
+        if created:
+            record_run(test_result)
+
         return redirect(reverse('tests:next', args=(id, )))
 
     @staticmethod
@@ -131,7 +170,7 @@ class TestStartView(LoginRequiredMixin, View):
 
         request = context['request']
         if test_result.state == TestResult.STATE.NEW:
-            return redirect(reverse('tests:next', args=(test_result.test.id,)))
+            return redirect(reverse('tests:next', args=(test_result.test_id,)))
 
         elif test_result.state == TestResult.STATE.FINISHED:
             return render(
@@ -139,7 +178,7 @@ class TestStartView(LoginRequiredMixin, View):
                 template_name='finish.html',
                 context={
                     'test_result': test_result,
-                    'test_result_score': (test_result.num_correct_answers / test_result.test.questions.count()) * 100
+                    'test_result_score': test_result.score()
                 }
             )
 
@@ -178,24 +217,18 @@ class TestQuestionView(LoginRequiredMixin, View):
             :return: An HTTP response, redirecting to the test details if no results are found or rendering the question page with its answers otherwise
         """
 
-        test_result = test_result_for_user(request.user, id)
+        attempt = load_attempt(request.user, id, with_question=True)
 
-        if test_result.count() == 0:
+        if attempt is None:
             return redirect(reverse('tests:details', args=(id,)))
 
-        test_result = test_result.first()
-
-        order_number = test_result.current_order_number
-        question = Question.objects.get(test__id=id, order_number=order_number)
-        answers = question.answers.all()
-
-        form_set = AnswerFormSet(queryset=answers)
+        form_set = AnswerFormSet(queryset=attempt.answers)
 
         return render(
             request=request,
             template_name='question.html',
             context={
-                'question': question,
+                'question': attempt.question,
                 'form_set': form_set,
             }
         )
@@ -207,22 +240,27 @@ class TestQuestionView(LoginRequiredMixin, View):
             :return: Redirects to different views based on the test results and selected choices.
         """
 
-        test_result = test_result_for_user(request.user, id)
+        attempt = load_attempt(request.user, id)
 
-        if test_result.count() == 0:
+        if attempt is None:
             return redirect(reverse('tests:details', args=(id,)))
 
-        test_result = test_result.first()
-
-        form_set = AnswerFormSet(data=request.POST)
+        # The answers are identified by the ids rendered with them, never by their position: a stale page or a question
+        # edited in the meantime cannot be mapped onto the current question (TestRunner rejects foreign ids). The ids are
+        # only read, so the formset does not look the answers up.
+        form_set = AnswerFormSet(data=request.POST, queryset=Answer.objects.none())
+        try:
+            selected_answers = [
+                int(form.data[form.add_prefix('id')])
+                for form in form_set.forms
+                if 'is_selected' in form.changed_data
+            ]
+        except (KeyError, ValueError):
+            messages.error(request, extra_tags='danger', message='ERROR: The question has changed, please answer again')
+            return redirect(reverse('tests:next', args=(id, )))
 
         possible_choices = len(form_set.forms)
-        selected_choices = [
-            'is_selected' in form.changed_data
-            for form in form_set.forms
-        ]
-
-        num_selected_choices = sum(selected_choices)
+        num_selected_choices = len(selected_answers)
 
         if num_selected_choices == 0:
             messages.error(request, extra_tags='danger', message='ERROR: You should select at least 1 answer')
@@ -234,16 +272,19 @@ class TestQuestionView(LoginRequiredMixin, View):
 
         test_runner = TestRunner(
             on_next=TestStartView.on_next,
-            test_result=test_result
+            test_result=attempt.test_result
         )
 
         result = test_runner.next(
             context={
                 'request': request,
-                'selected_choices': selected_choices
+                'selected_answers': selected_answers
             }
         )
 
+        if test_runner.rejected:
+            messages.error(request, extra_tags='danger', message='ERROR: The question has changed, please answer again')
+
         return result
 
 
@@ -358,3 +399,46 @@ class TestUpdateView(LoginRequiredMixin, UpdateView):
                 questions.instance = self.object
                 questions.save()
         return response
+
+
+class TestResultExportView(PermissionRequiredMixin, View):
+    """
+        Streams test results as CSV or NDJSON, for users allowed to view test results (e.g. teachers with admin access).
+
+        Query parameters:
+            format: 'csv' (default) or 'ndjson'.
+            test, topic: Identifiers of the test or of the topic of the tests.
+            school: School of the users.
+            date_from, date_to: Range of the last update of the results, as dates or ISO 8601 date and times.
+
+        The rows are read with QuerySet.iterator() and sent with a StreamingHttpResponse, so the first row is sent at once
+        and memory use does not depend on the number of results.
+    """
+
+    permission_required = 'smart_test.view_testresult'
+
+    def get(self, request):
+        """
+            :param request: The HTTP request object with the filters in its query string.
+            :return: A StreamingHttpResponse with the export as an attachment, or a 400 response for invalid parameters.
+        """
+
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f'Unsupported format: {export_format}')
+
+        try:
+            test_results = filter_test_results(
+                test=request.GET.get('test'),
+                topic=request.GET.get('topic'),
+                school=request.GET.get('school'),
+                date_from=request.GET.get('date_from'),
+                date_to=request.GET.get('date_to'),
+            )
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+
+        content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(stream_export(test_results, export_format), content_type=f'{content_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="test_results.{export_format}"'
+        return response